@@ -0,0 +1,82 @@
+"""Compare the compiled antilink LinkMatcher to per-domain regex and substring checks.
+
+Run from the repository root: python benchmarks/antilink_domains.py
+"""
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.domains import LinkMatcher, URL_PATTERN
+
+DOMAINS = 1000
+MESSAGES = 20000
+
+
+def random_domain(rng):
+    name = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+    return f"{name}.{rng.choice(['com', 'net', 'org', 'io', 'gg'])}"
+
+
+def build_messages(rng, allowed):
+    messages = []
+    for _ in range(MESSAGES):
+        roll = rng.random()
+        if roll < 0.5:
+            messages.append("just a normal message without any links in it at all")
+        elif roll < 0.75:
+            messages.append(f"check this https://www.{rng.choice(allowed)}/page?id={rng.randrange(1000)}")
+        else:
+            messages.append(f"free nitro at https://{random_domain(rng)}/claim now")
+    return messages
+
+
+def main():
+    rng = random.Random(7)
+    allowed = [random_domain(rng) for _ in range(DOMAINS)]
+    messages = build_messages(rng, allowed)
+
+    regexes = [re.compile(rf"https?://(?:[a-z0-9-]+\.)*{re.escape(domain)}(?:[/:]|$)", re.IGNORECASE) for domain in allowed]
+
+    def per_domain_regex(content):
+        hosts = URL_PATTERN.findall(content)
+        if not hosts:
+            return None
+        for host in hosts:
+            if not any(regex.search(f"https://{host}") for regex in regexes):
+                return host
+        return None
+
+    def per_domain_substring(content):
+        for host in URL_PATTERN.findall(content):
+            host = host.lower()
+            if not any(host == domain or host.endswith('.' + domain) for domain in allowed):
+                return host
+        return None
+
+    start = time.perf_counter()
+    matcher = LinkMatcher(allowed, (), block_invites=False)
+    build = time.perf_counter() - start
+
+    results = {}
+    for label, check in (
+        ("per-domain regex", per_domain_regex),
+        ("per-domain substring", per_domain_substring),
+        ("LinkMatcher trie", matcher.violation),
+    ):
+        start = time.perf_counter()
+        flagged = sum(1 for content in messages if check(content))
+        elapsed = time.perf_counter() - start
+        results[label] = flagged
+        print(f"{label:<22} {elapsed / MESSAGES * 1e6:9.2f} us/message  flagged={flagged}")
+
+    assert len(set(results.values())) == 1
+    print(f"{DOMAINS} allowed domains, trie built in {build * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
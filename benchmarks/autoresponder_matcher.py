@@ -0,0 +1,63 @@
+"""Per-message cost of the compiled autoresponder matcher versus checking triggers one by one.
+
+Run from the repository root: python benchmarks/autoresponder_matcher.py
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.autoresponder_matcher import AutoresponderMatcher
+
+MESSAGES = 5000
+MODES = ('exact', 'contains', 'startswith', 'endswith')
+
+
+def random_word(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+
+def linear_match(entries, content):
+    """Check every trigger in turn"""
+    text = content.lower()
+    matched = []
+    for trigger, mode, payload in entries:
+        trigger = trigger.lower()
+        if mode == 'exact' and text.strip() == trigger:
+            matched.append(payload)
+        elif mode == 'contains' and trigger in text:
+            matched.append(payload)
+        elif mode == 'startswith' and text.startswith(trigger):
+            matched.append(payload)
+        elif mode == 'endswith' and text.endswith(trigger):
+            matched.append(payload)
+    return matched
+
+
+def main():
+    rng = random.Random(11)
+    vocabulary = [random_word(rng) for _ in range(3000)]
+    messages = [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(3, 20))) for _ in range(MESSAGES)]
+
+    for count in (5, 15, 30, 50, 500):
+        entries = [(' '.join(rng.sample(vocabulary, rng.randint(1, 2))), rng.choice(MODES), index) for index in range(count)]
+        matcher = AutoresponderMatcher(entries)
+
+        start = time.perf_counter()
+        linear = [linear_match(entries, content) for content in messages]
+        linear_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compiled = [matcher.match(content) for content in messages]
+        compiled_time = time.perf_counter() - start
+
+        assert linear == compiled
+        print(f"{count:>4} responders  linear {linear_time / MESSAGES * 1e6:7.2f} us/message  "
+              f"compiled {compiled_time / MESSAGES * 1e6:7.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Render throughput of compiled embed templates during a simulated join burst.
+
+The baseline re-parses the whole saved embed for every member the way
+parse_variables does (one replace per known variable per text field). The
+compiled path is timed end to end: EmbedTemplate.resolve() for the member,
+then render(). utils.variables.parse_variables is modelled by the same
+replace parser, so slots without a compiled lookup cost what they would.
+
+Run from the repository root: python benchmarks/embed_render.py
+"""
+import asyncio
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embed_templates import EmbedTemplate
+
+MEMBERS = 10000
+
+EMBED = {
+    'title': "Welcome to {server.name}!",
+    'description': "Hey {user.mention}, you are member #{server.member_count}.\nRead the rules in {channel.mention} and enjoy your stay!",
+    'footer': "{user.name} joined at {user.joined_at}",
+    'thumbnail': "{user.avatar}",
+    'author': "{server.name}",
+    'fields': [
+        {'name': "Account created", 'value': "{user.created_at}", 'inline': True},
+        {'name': "Invited by", 'value': "{inviter.mention}", 'inline': True},
+        {'name': "Rules", 'value': "Be nice. No spam. Have fun.", 'inline': False},
+    ],
+}
+
+
+def member_objects(index):
+    """Member, guild and channel of one join"""
+    member = types.SimpleNamespace(
+        id=100000 + index, mention=f"<@{100000 + index}>", name=f"member{index}",
+        avatar=f"https://cdn.discordapp.com/avatars/{100000 + index}/a.png",
+        joined_at="2025-09-03 12:00", created_at="2021-01-01", tag=f"member{index}#0001",
+    )
+    guild = types.SimpleNamespace(id=123456789, name="Test Server", member_count=5000 + index,
+                                  icon="https://cdn.discordapp.com/icons/1/a.png")
+    channel = types.SimpleNamespace(id=42, mention="<#42>", name="rules")
+    return member, guild, channel
+
+
+def member_variables(member, guild, channel):
+    """Variable table parse_variables builds for one member"""
+    return {
+        '{user.mention}': member.mention,
+        '{user.name}': member.name,
+        '{user.avatar}': member.avatar,
+        '{user.joined_at}': member.joined_at,
+        '{user.created_at}': member.created_at,
+        '{user.id}': str(member.id),
+        '{user.tag}': member.tag,
+        '{server.name}': guild.name,
+        '{server.member_count}': str(guild.member_count),
+        '{server.id}': str(guild.id),
+        '{server.icon}': guild.icon,
+        '{channel.mention}': channel.mention,
+        '{channel.name}': channel.name,
+        '{inviter.mention}': "<@1>",
+        '{inviter.name}': "inviter",
+    }
+
+
+async def parse_variables(data, member, guild, channel):
+    """Model of utils.variables.parse_variables: rebuild the table and replace every variable in every text"""
+    variables = member_variables(member, guild, channel)
+
+    def parse(text):
+        if not text:
+            return text
+        for token, value in variables.items():
+            text = text.replace(token, value)
+        return text
+
+    parsed = {key: parse(value) if isinstance(value, str) else value for key, value in data.items()}
+    if 'fields' in data:
+        parsed['fields'] = [
+            {'name': parse(field['name']), 'value': parse(field['value']), 'inline': field.get('inline', False)}
+            for field in data['fields']
+        ]
+    return parsed
+
+
+async def main():
+    sys.modules['utils.variables'] = types.SimpleNamespace(parse_variables=parse_variables)
+    joins = [member_objects(index) for index in range(MEMBERS)]
+
+    start = time.perf_counter()
+    for member, guild, channel in joins:
+        await parse_variables(EMBED, member, guild, channel)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = EmbedTemplate(EMBED)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for member, guild, channel in joins:
+        template.render(await template.resolve(member, guild, channel))
+    compiled = time.perf_counter() - start
+
+    first = joins[0]
+    expected = await parse_variables(EMBED, *first)
+    rendered = template.render(await template.resolve(*first))
+    assert {key: expected.get(key) for key in rendered} == rendered
+
+    print(f"join burst of {MEMBERS} members, {len(template.slots)} slots "
+          f"({len(template.getters)} compiled lookups), compiled in {compile_time * 1e6:.0f} us")
+    print(f"{'re-parse per member':<24} {MEMBERS / naive:>10,.0f} renders/s  {naive / MEMBERS * 1e6:6.2f} us/render")
+    print(f"{'resolve() + render()':<24} {MEMBERS / compiled:>10,.0f} renders/s  {compiled / MEMBERS * 1e6:6.2f} us/render")
+    print(f"speedup: {naive / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
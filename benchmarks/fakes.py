@@ -0,0 +1,328 @@
+"""Offline stand-ins for the Discord objects, HTTP layer and database used by the replay benchmark.
+
+The fakes implement only what the bot's handlers touch. Anything that would
+reach Discord goes through StubHTTP, which counts calls per route and can
+add artificial latency.
+"""
+import asyncio
+import itertools
+from collections import Counter
+
+import discord
+from discord.ext import commands
+
+_ids = itertools.count(10 ** 17)
+
+
+def snowflake():
+    return next(_ids)
+
+
+class StubHTTP:
+    """Counts outgoing API calls instead of sending them"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+
+    async def call(self, route):
+        self.calls[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def request(self, route, **kwargs):
+        """Drop-in for discord.http.HTTPClient.request so stray library calls never leave the process"""
+        await self.call(f"{route.method} {route.path}")
+        return None
+
+
+class FakeAsset:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeClientUser:
+    """The bot's own user"""
+
+    def __init__(self, name="ReplayBot"):
+        self.id = snowflake()
+        self.name = name
+        self.bot = True
+        self.mention = f"<@{self.id}>"
+        self.display_avatar = FakeAsset("https://cdn.discordapp.com/embed/avatars/0.png")
+        self.avatar = None
+        self.default_avatar = self.display_avatar
+
+    def mentioned_in(self, message):
+        return any(user.id == self.id for user in message.mentions)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeRole:
+    def __init__(self, guild, name, role_id=None, position=1):
+        self.guild = guild
+        self.id = role_id or snowflake()
+        self.name = name
+        self.position = position
+        self.managed = False
+        self.mention = f"<@&{self.id}>"
+
+    def is_default(self):
+        return self.id == self.guild.id
+
+    def __lt__(self, other):
+        return self.position < other.position
+
+    def __ge__(self, other):
+        return self.position >= other.position
+
+
+class FakeActivity:
+    """Presence activity exposing the attributes vanity/activity roles read"""
+
+    def __init__(self, activity_type, name=None, state=None):
+        self.type = activity_type
+        self.name = name
+        self.state = state
+
+
+class FakeMember:
+    def __init__(self, guild, name, bot=False, member_id=None):
+        self.guild = guild
+        self.id = member_id or snowflake()
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.mention = f"<@{self.id}>"
+        self.display_avatar = FakeAsset(f"https://cdn.discordapp.com/avatars/{self.id}.png")
+        self.avatar = None
+        self.default_avatar = self.display_avatar
+        self.activities = ()
+        self.guild_permissions = discord.Permissions.none()
+        self._roles = {guild.default_role.id: guild.default_role}
+
+    @property
+    def roles(self):
+        return list(self._roles.values())
+
+    @property
+    def top_role(self):
+        return max(self._roles.values(), key=lambda role: role.position)
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def copy(self):
+        clone = FakeMember.__new__(FakeMember)
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    async def edit(self, roles=None, reason=None, **kwargs):
+        await self.guild.http.call("PATCH /guilds/{guild_id}/members/{user_id}")
+        if roles is not None:
+            default = self.guild.default_role
+            self._roles = {default.id: default}
+            for role in roles:
+                resolved = self.guild.get_role(role.id)
+                if resolved:
+                    self._roles[resolved.id] = resolved
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content, state, attachments=(), mentions=()):
+        self.id = snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.attachments = list(attachments)
+        self.mentions = list(mentions)
+        self.mention_everyone = False
+        self.embeds = []
+        self._state = state
+
+    async def delete(self, delay=None):
+        await self.guild.http.call("DELETE /channels/{channel_id}/messages/{message_id}")
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, reference=self, **kwargs)
+
+
+class FakeChannel:
+    def __init__(self, guild, name, state):
+        self.guild = guild
+        self.id = snowflake()
+        self.name = name
+        self.mention = f"<#{self.id}>"
+        self._state = state
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.http.call("POST /channels/{channel_id}/messages")
+        return FakeMessage(self, self.guild.me, content or "", self._state)
+
+    async def delete_messages(self, messages, reason=None):
+        await self.guild.http.call("POST /channels/{channel_id}/messages/bulk-delete")
+
+
+class FakeGuild:
+    def __init__(self, name, http, state, bot_user, channels=5):
+        self.id = snowflake()
+        self.name = name
+        self.http = http
+        self.owner_id = snowflake()
+        self.default_role = FakeRole(self, "@everyone", role_id=self.id, position=0)
+        self._roles = {self.id: self.default_role}
+        self._members = {}
+        self._channels = {}
+        self.chunked = True
+        self.me = FakeMember(self, bot_user.name, bot=True, member_id=bot_user.id)
+        for index in range(channels):
+            channel = FakeChannel(self, f"channel-{index}", state)
+            self._channels[channel.id] = channel
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    @property
+    def member_count(self):
+        return len(self._members)
+
+    @property
+    def channels(self):
+        return list(self._channels.values())
+
+    @property
+    def text_channels(self):
+        return self.channels
+
+    @property
+    def roles(self):
+        return list(self._roles.values())
+
+    @property
+    def owner(self):
+        return self._members.get(self.owner_id)
+
+    def add_role(self, name):
+        role = FakeRole(self, name, position=len(self._roles))
+        self._roles[role.id] = role
+        return role
+
+    def add_member(self, member):
+        self._members[member.id] = member
+
+    def remove_member(self, member_id):
+        self._members.pop(member_id, None)
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+    async def chunk(self, cache=True):
+        return self.members
+
+    async def fetch_member(self, member_id):
+        await self.http.call("GET /guilds/{guild_id}/members/{user_id}")
+        return self._members[member_id]
+
+
+class ReplayContext(commands.Context):
+    """Context whose replies go to the fake channel instead of the HTTP client"""
+
+    async def send(self, content=None, **kwargs):
+        kwargs.pop('ephemeral', None)
+        return await self.channel.send(content, **kwargs)
+
+
+class MemoryDatabase:
+    """In-memory stand-in for utils.database.Database.
+
+    The queries the message and presence hot paths make are answered from
+    dicts. Any other coroutine method resolves to a no-op returning None,
+    and its name is counted in `unknown` so gaps in the stand-in stay
+    visible in the report.
+    """
+
+    def __init__(self):
+        self.prefixes = {}
+        self.media_channels = set()
+        self.ignore_settings = {}
+        self.blacklist = {}
+        self.vanity_configs = []
+        self.activity_configs = []
+        self.embeds = {}
+        self.queries = Counter()
+        self.unknown = Counter()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        async def unknown(*args, **kwargs):
+            self.unknown[name] += 1
+            return None
+        unknown.__name__ = name
+        return unknown
+
+    async def init_db(self):
+        pass
+
+    async def get_guild_prefix(self, guild_id):
+        self.queries['get_guild_prefix'] += 1
+        return self.prefixes.get(guild_id)
+
+    async def is_media_channel(self, guild_id, channel_id):
+        self.queries['is_media_channel'] += 1
+        return (guild_id, channel_id) in self.media_channels
+
+    async def has_media_bypass(self, guild_id, user_id, roles):
+        self.queries['has_media_bypass'] += 1
+        return False
+
+    async def get_ignore_setting(self, guild_id, channel_id):
+        self.queries['get_ignore_setting'] += 1
+        return self.ignore_settings.get((guild_id, channel_id))
+
+    async def is_ignore_bypassed(self, guild_id, channel_id, user_id, role_ids):
+        self.queries['is_ignore_bypassed'] += 1
+        return False
+
+    async def is_blacklisted_user(self, user_id):
+        self.queries['is_blacklisted_user'] += 1
+        return self.blacklist.get(user_id)
+
+    async def get_all_vanity_configs(self):
+        self.queries['get_all_vanity_configs'] += 1
+        return list(self.vanity_configs)
+
+    async def get_all_activity_configs(self):
+        self.queries['get_all_activity_configs'] += 1
+        return list(self.activity_configs)
+
+    async def get_embed(self, guild_id, name):
+        self.queries['get_embed'] += 1
+        return self.embeds.get((guild_id, name))
+
+
+class ReplayCommands(commands.Cog):
+    """Cheap commands so command dispatch can be measured without the real cogs"""
+
+    @commands.command()
+    async def ping(self, ctx):
+        await ctx.send("pong")
+
+    @commands.command()
+    async def echo(self, ctx, *, text: str = ""):
+        await ctx.send(text or "nothing")
+
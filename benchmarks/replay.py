@@ -0,0 +1,311 @@
+"""Replay gateway event streams through DiscordBot without a Discord connection.
+
+Builds a synthetic world of fake guilds, members and channels, swaps the bot's
+database for benchmarks.fakes.MemoryDatabase and routes every API call to a
+counting stub. Message floods, presence storms and join raids (or a recorded
+stream) are then fed to the bot's event handlers with the same per-event
+concurrency the gateway gives them. The report covers throughput, p50/p99
+handler latency, retained and peak traced memory per event, API calls and
+database queries, plus one vanity_checker and activity_checker sweep.
+
+Streams are JSON lines that refer to guilds, channels and members by index
+into the synthetic world, so a saved stream replays identically.
+
+Run from the repository root: python benchmarks/replay.py [--scenario messages|presences|raid|all]
+    [--events N] [--save stream.jsonl] [--stream stream.jsonl] [--http-latency SECONDS]
+"""
+import argparse
+import asyncio
+import functools
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+
+from benchmarks.fakes import (
+    FakeActivity, FakeClientUser, FakeGuild, FakeMember, FakeMessage,
+    MemoryDatabase, ReplayCommands, ReplayContext, StubHTTP,
+)
+from config import DEFAULT_PREFIX
+from main import DiscordBot
+
+GUILDS = 50
+MEMBERS_PER_GUILD = 200
+CHANNELS_PER_GUILD = 5
+# Share of guilds with vanity/activity role configs and a media channel
+CONFIGURED_SHARE = 0.2
+
+CHAT = (
+    "hey what's up", "lol", "anyone up for a game tonight?", "gg", "brb",
+    "that was actually insane", "ok", "who's online", "nice one", "WHAT",
+)
+GAMES = ("Minecraft", "Valorant", "Fortnite", "Rocket League")
+
+
+def generate(scenario, count, seed=42):
+    """Generate a synthetic event stream"""
+    rng = random.Random(seed)
+    configured = range(int(GUILDS * CONFIGURED_SHARE))
+    events = []
+    for _ in range(count):
+        if scenario == 'messages':
+            guild = rng.randrange(GUILDS)
+            roll = rng.random()
+            if roll < 0.80:
+                content = rng.choice(CHAT)
+            elif roll < 0.90:
+                content = f"{DEFAULT_PREFIX}{rng.choice(('ping', 'echo hello there'))}"
+            elif roll < 0.95:
+                content = f"{DEFAULT_PREFIX}doesnotexist"
+            elif roll < 0.98:
+                content = "@mention"
+            else:
+                content = "no attachment here"
+            channel = 0 if content == "no attachment here" else rng.randrange(1, CHANNELS_PER_GUILD)
+            events.append({
+                'event': 'message', 'guild': guild, 'channel': channel,
+                'member': rng.randrange(MEMBERS_PER_GUILD), 'content': content,
+            })
+        elif scenario == 'presences':
+            guild = rng.choice(configured) if rng.random() < 0.7 else rng.randrange(GUILDS)
+            activities = []
+            if rng.random() < 0.5:
+                activities.append(['playing', rng.choice(GAMES), None])
+            if rng.random() < 0.3:
+                activities.append(['custom', 'Custom Status', f"join discord.gg/guild{guild}"])
+            events.append({
+                'event': 'presence', 'guild': guild,
+                'member': rng.randrange(MEMBERS_PER_GUILD), 'activities': activities,
+            })
+        else:
+            guild = rng.randrange(GUILDS)
+            if rng.random() < 0.9:
+                events.append({'event': 'join', 'guild': guild, 'bot': rng.random() < 0.01})
+            else:
+                events.append({'event': 'remove', 'guild': guild, 'member': rng.randrange(MEMBERS_PER_GUILD)})
+    return events
+
+
+class World:
+    """A DiscordBot wired to fake guilds, an in-memory database and a stub HTTP layer"""
+
+    def __init__(self, http_latency=0.0):
+        self.http = StubHTTP(http_latency)
+        self.db = MemoryDatabase()
+        self.bot = DiscordBot()
+        self.user = FakeClientUser()
+        self.guilds = []
+        self.members = []
+
+    async def setup(self):
+        bot = self.bot
+        # Same as `async with bot`: binds the client, HTTP and state to the running loop
+        await bot.__aenter__()
+        bot._connection.user = self.user
+        bot.http.request = self.http.request
+        bot.get_context = functools.partial(DiscordBot.get_context, bot, cls=ReplayContext)
+
+        # Every cache that holds the database gets the in-memory one
+        bot.db = self.db
+        for cache in (bot.settings_cache, bot.embed_templates, bot.link_matchers, bot.autoresponders):
+            cache.db = self.db
+        bot.db_pool = None
+        bot.write_behind = None
+
+        for index in range(GUILDS):
+            guild = FakeGuild(f"guild-{index}", self.http, bot._connection, self.user, CHANNELS_PER_GUILD)
+            members = [FakeMember(guild, f"member-{index}-{number}") for number in range(MEMBERS_PER_GUILD)]
+            for member in members:
+                guild.add_member(member)
+            bot._connection._guilds[guild.id] = guild
+            self.guilds.append(guild)
+            self.members.append(members)
+
+        for index in range(int(GUILDS * CONFIGURED_SHARE)):
+            guild = self.guilds[index]
+            log_channel = guild.channels[1]
+            self.db.media_channels.add((guild.id, guild.channels[0].id))
+            self.db.vanity_configs.append({
+                'guild_id': guild.id,
+                'role_id': guild.add_role("vanity").id,
+                'vanity_url': f"discord.gg/guild{index}",
+                'log_channel_id': log_channel.id,
+                'custom_embed': None,
+            })
+            self.db.activity_configs.append({
+                'guild_id': guild.id,
+                'role_id': guild.add_role("gamer").id,
+                'activity_type': 'playing',
+            })
+
+        await bot._init_storage()
+        await bot.add_cog(ReplayCommands())
+        bot.vanity_engine.sweep_batch_delay = 0
+        bot.activity_engine.sweep_batch_delay = 0
+        bot.log_pipeline.start()
+        bot.role_queue.start()
+
+    def handler(self, event):
+        """Turn one stream event into the bot handler call the gateway would make"""
+        bot = self.bot
+        kind = event['event']
+        guild = self.guilds[event['guild'] % GUILDS]
+        members = self.members[event['guild'] % GUILDS]
+
+        if kind == 'message':
+            author = members[event['member'] % len(members)]
+            channel = guild.channels[event['channel'] % CHANNELS_PER_GUILD]
+            content = event['content']
+            mentions = ()
+            if content == "@mention":
+                content = f"<@{self.user.id}>"
+                mentions = (self.user,)
+            message = FakeMessage(channel, author, content, bot._connection, mentions=mentions)
+            return bot.on_message(message)
+
+        if kind == 'presence':
+            member = members[event['member'] % len(members)]
+            before = member.copy()
+            member.activities = tuple(
+                FakeActivity(getattr(discord.ActivityType, name, discord.ActivityType.custom), title, state)
+                for name, title, state in event['activities']
+            )
+            return bot.on_presence_update(before, member)
+
+        if kind == 'join':
+            member = FakeMember(guild, f"raider-{len(members)}", bot=event.get('bot', False))
+            guild.add_member(member)
+            members.append(member)
+            return bot.on_member_join(member)
+
+        member = members[event['member'] % len(members)]
+        guild.remove_member(member.id)
+        return bot.on_member_remove(member)
+
+    async def replay(self, events, concurrency=256):
+        """Run events as concurrent handler tasks; returns per-kind handler durations"""
+        durations = {}
+
+        async def run(event):
+            started = time.perf_counter()
+            await self.handler(event)
+            durations.setdefault(event['event'], []).append(time.perf_counter() - started)
+
+        for start in range(0, len(events), concurrency):
+            await asyncio.gather(*(run(event) for event in events[start:start + concurrency]))
+        await self.drain()
+        return durations
+
+    async def drain(self):
+        """Wait for queued role edits and deferred log sends to finish"""
+        queue = self.bot.role_queue
+        while True:
+            stats = queue.stats()
+            if not stats['depth'] and not stats['in_flight']:
+                break
+            await asyncio.sleep(0.01)
+        await self.bot.log_pipeline.flush()
+
+    async def close(self):
+        await self.bot.close()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_stream(events, http_latency, trace=False):
+    world = World(http_latency=http_latency)
+    await world.setup()
+    if trace:
+        gc.collect()
+        tracemalloc.start()
+    started = time.perf_counter()
+    durations = await world.replay(events)
+    elapsed = time.perf_counter() - started
+    retained = peak = None
+    if trace:
+        # Only allocations made during the replay are traced, so what is
+        # still live after a collection is memory the events left behind
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    sweeps = {}
+    for name in ('vanity_checker', 'activity_checker'):
+        started = time.perf_counter()
+        await getattr(world.bot, name)()
+        await world.drain()
+        sweeps[name] = time.perf_counter() - started
+
+    report = {
+        'elapsed': elapsed,
+        'durations': durations,
+        'retained': retained,
+        'peak': peak,
+        'sweeps': sweeps,
+        'http': dict(world.http.calls),
+        'queries': dict(world.db.queries),
+        'unknown_queries': dict(world.db.unknown),
+    }
+    await world.close()
+    return report
+
+
+def print_report(title, events, timed, traced):
+    print(f"\n== {title}: {len(events):,} events ==")
+    print(f"throughput: {len(events) / timed['elapsed']:,.0f} events/s ({timed['elapsed']:.2f}s)")
+    for kind, values in sorted(timed['durations'].items()):
+        values.sort()
+        print(
+            f"  {kind:<9} n={len(values):>7,}  p50={percentile(values, 0.5) * 1e6:>9,.1f}us"
+            f"  p99={percentile(values, 0.99) * 1e6:>11,.1f}us  max={values[-1] * 1e6:>12,.1f}us"
+        )
+    print(f"memory: {traced['retained'] / len(events):,.0f} bytes/event retained, "
+          f"traced peak {traced['peak'] / len(events):,.0f} bytes/event")
+    print("sweeps: " + ", ".join(f"{name} {seconds * 1000:,.1f}ms" for name, seconds in timed['sweeps'].items()))
+    print("api calls: " + (", ".join(f"{route} x{count:,}" for route, count in sorted(timed['http'].items())) or "none"))
+    print("db queries: " + (", ".join(f"{name} x{count:,}" for name, count in sorted(timed['queries'].items())) or "none"))
+    if timed['unknown_queries']:
+        print("unmodelled db calls: " + ", ".join(f"{name} x{count:,}" for name, count in sorted(timed['unknown_queries'].items())))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenario", default="all", choices=("messages", "presences", "raid", "all"))
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--stream", help="replay a saved JSON lines stream instead of generating one")
+    parser.add_argument("--save", help="write the generated stream to this file")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="seconds added to every stubbed API call")
+    args = parser.parse_args()
+
+    if args.stream:
+        with open(args.stream) as file:
+            streams = [(os.path.basename(args.stream), [json.loads(line) for line in file if line.strip()])]
+    else:
+        scenarios = ('messages', 'presences', 'raid') if args.scenario == 'all' else (args.scenario,)
+        streams = [(scenario, generate(scenario, args.events)) for scenario in scenarios]
+        if args.save:
+            with open(args.save, 'w') as file:
+                for _, events in streams:
+                    for event in events:
+                        file.write(json.dumps(event) + "\n")
+
+    for title, events in streams:
+        timed = await run_stream(events, args.http_latency)
+        # Second pass under tracemalloc for the memory figures only
+        traced = await run_stream(events, args.http_latency, trace=True)
+        print_report(title, events, timed, traced)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
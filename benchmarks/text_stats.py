@@ -0,0 +1,68 @@
+"""Compare the memoised single-pass text statistics against per-character unicodedata lookups.
+
+Run from the repository root: python benchmarks/text_stats.py
+"""
+import os
+import random
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_stats import analyze, analyze_many
+
+MESSAGES = 50_000
+SAMPLES = [
+    "hey guys what's up, anyone wanna play some games tonight?",
+    "lol",
+    "WHY IS NOBODY ANSWERING ME THIS IS SO ANNOYING!!!!!!",
+    "Ça va très bien, merci Élodie! On se voit demain?",
+    "h̷̢̛e̴̡͝l̸̨͠l̷̢̛o̴ ̸̨͠w̷̢̛o̴̡͝r̸̨͠l̷̢̛d̴",
+    "check out https://example.com/some/page it is really good",
+]
+
+
+def naive(text):
+    """Reference implementation: one unicodedata call per character"""
+    letters = uppercase = marks = 0
+    longest = run = 0
+    previous = None
+    for char in text:
+        category = unicodedata.category(char)
+        if category[0] == 'L':
+            letters += 1
+            if category in ('Lu', 'Lt'):
+                uppercase += 1
+        elif category in ('Mn', 'Me'):
+            marks += 1
+        run = run + 1 if char == previous else 1
+        longest = max(longest, run)
+        previous = char
+    return len(text), letters, uppercase, marks, longest
+
+
+def main():
+    rng = random.Random(42)
+    messages = [rng.choice(SAMPLES) for _ in range(MESSAGES)]
+
+    for text in SAMPLES:
+        assert tuple(analyze(text)) == naive(text), text
+
+    start = time.perf_counter()
+    for text in messages:
+        naive(text)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = analyze_many(messages)
+    elapsed = time.perf_counter() - start
+
+    print(f"{MESSAGES:,} messages, average {sum(map(len, messages)) / MESSAGES:.0f} characters")
+    print(f"unicodedata per character: {baseline / MESSAGES * 1e6:.2f} us/message")
+    print(f"text_stats.analyze:        {elapsed / MESSAGES * 1e6:.2f} us/message  ({baseline / elapsed:.1f}x)")
+    print(f"caps: {sum(stats.is_caps() for stats in results):,}  zalgo: {sum(stats.is_zalgo() for stats in results):,}")
+
+
+if __name__ == "__main__":
+    main()
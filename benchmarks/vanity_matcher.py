@@ -0,0 +1,93 @@
+"""Compare the precompiled VanityMatcher to the old per-member regex loop.
+
+Run from the repository root: python benchmarks/vanity_matcher.py
+"""
+import os
+import random
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.vanity_matcher import VanityMatcher
+
+GUILDS = 200
+MEMBERS = 20000
+ROUNDS = 3
+
+
+def legacy_has_vanity(member, vanity_url):
+    """The per-member check vanity_checker used to run"""
+    vanity_patterns = [
+        rf"discord\.gg/{re.escape(vanity_url)}",
+        rf"\.gg/{re.escape(vanity_url)}",
+        rf"https://discord\.gg/{re.escape(vanity_url)}"
+    ]
+    for activity in member.activities:
+        if hasattr(activity, 'state') and activity.state:
+            for pattern in vanity_patterns:
+                if re.search(pattern, activity.state, re.IGNORECASE):
+                    return True
+        if hasattr(activity, 'name') and activity.name:
+            for pattern in vanity_patterns:
+                if re.search(pattern, activity.name, re.IGNORECASE):
+                    return True
+    return False
+
+
+def build_fixtures(rng):
+    configs = [{'guild_id': guild_id, 'vanity_url': f"server{guild_id}"} for guild_id in range(GUILDS)]
+    members = []
+    for _ in range(MEMBERS):
+        roll = rng.random()
+        if roll < 0.1:
+            state = f"join discord.gg/server{rng.randrange(GUILDS)} now"
+        elif roll < 0.2:
+            state = f"come hang out .gg/other{rng.randrange(1000)}"
+        elif roll < 0.6:
+            state = "just vibing"
+        else:
+            state = None
+        activities = [SimpleNamespace(state=state, name="Custom Status")] if state else []
+        if rng.random() < 0.3:
+            activities.append(SimpleNamespace(state=None, name="Some Game"))
+        members.append(SimpleNamespace(activities=activities, guild_id=rng.randrange(GUILDS)))
+    return configs, members
+
+
+def bench(label, func, members):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        matches = func(members)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:9.1f} ms  {best / len(members) * 1e9:9.0f} ns/member  matches={matches}")
+    return best
+
+
+def main():
+    rng = random.Random(1234)
+    configs, members = build_fixtures(rng)
+    vanity_by_guild = {config['guild_id']: config['vanity_url'] for config in configs}
+
+    def legacy(members):
+        return sum(legacy_has_vanity(member, vanity_by_guild[member.guild_id]) for member in members)
+
+    start = time.perf_counter()
+    matcher = VanityMatcher(configs)
+    build = time.perf_counter() - start
+
+    def compiled(members):
+        return sum(matcher.has_vanity(member, vanity_by_guild[member.guild_id]) for member in members)
+
+    print(f"{GUILDS} guild configs, {MEMBERS} members, matcher built in {build * 1000:.2f} ms")
+    legacy_time = bench("legacy per-member regex", legacy, members)
+    compiled_time = bench("VanityMatcher", compiled, members)
+    print(f"speedup: {legacy_time / compiled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
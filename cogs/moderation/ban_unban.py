@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 import config
+from utils.mass_actions import TargetSpec, split_protected, confirm_and_run
 
 class Ban(commands.Cog):
     def __init__(self, bot):
@@ -55,11 +56,10 @@ class Ban(commands.Cog):
             return await self.send_error_embed(ctx, "Incorrect Usage ❌", "**Usage:** `/unban <user_id>`\n**Example:** `/unban 123456789012345678`")
 
         try:
-            user = await self.bot.fetch_user(user_id)
-            await ctx.guild.unban(user)
+            await ctx.guild.unban(discord.Object(id=user_id))
             embed = discord.Embed(
                 title="Unbanned ✅",
-                description=f"**{user.mention} has been unbanned!**",
+                description=f"**<@{user_id}> has been unbanned!**",
                 color=config.DEFAULT_COLOR
             )
             await ctx.send(embed=embed)
@@ -68,5 +68,45 @@ class Ban(commands.Cog):
         except discord.Forbidden:
             await self.send_error_embed(ctx, "Permission Error 🚫", "**I don't have permission to unban this user!**")
 
+    @commands.hybrid_command(name="massban", description="Bans many users at once by ID, join time or account age.")
+    @commands.has_permissions(ban_members=True)
+    @commands.bot_has_permissions(ban_members=True)
+    @commands.guild_only()
+    async def massban(self, ctx, *, targets: str = None):
+        """Bans user IDs/mentions and members matching joined:<duration> or age:<duration>; other words are the reason."""
+        spec = TargetSpec.parse(targets)
+        if not spec:
+            return await self.send_error_embed(ctx, "Incorrect Usage ❌", "**Usage:** `/massban <ids...> [joined:30m] [age:7d] [reason]`\n**Example:** `/massban joined:15m age:1d Raid`")
+
+        await ctx.defer()
+        user_ids, skipped = split_protected(ctx, await spec.resolve(self.bot, ctx.guild))
+        if not user_ids:
+            return await self.send_error_embed(ctx, "Nothing To Do ⚠", f"**No users can be banned.** ({skipped} skipped)")
+
+        await confirm_and_run(
+            ctx, "Mass Ban",
+            f"**Ban {len(user_ids):,} users?** ({skipped:,} skipped)\n**Reason:** `{spec.reason}`",
+            config.DEFAULT_COLOR,
+            lambda progress: self.bot.mass_actions.ban(ctx.guild, user_ids, reason=spec.reason, progress=progress, skipped=skipped)
+        )
+
+    @commands.hybrid_command(name="massunban", description="Unbans many users at once by ID.")
+    @commands.has_permissions(ban_members=True)
+    @commands.bot_has_permissions(ban_members=True)
+    @commands.guild_only()
+    async def massunban(self, ctx, *, targets: str = None):
+        """Unbans a list of user IDs; other words are the reason."""
+        spec = TargetSpec.parse(targets)
+        if not spec.user_ids:
+            return await self.send_error_embed(ctx, "Incorrect Usage ❌", "**Usage:** `/massunban <ids...> [reason]`\n**Example:** `/massunban 123456789012345678 234567890123456789 Appeal accepted`")
+
+        user_ids = spec.user_ids
+        await confirm_and_run(
+            ctx, "Mass Unban",
+            f"**Unban {len(user_ids):,} users?**\n**Reason:** `{spec.reason}`",
+            config.DEFAULT_COLOR,
+            lambda progress: self.bot.mass_actions.unban(ctx.guild, user_ids, reason=spec.reason, progress=progress)
+        )
+
 async def setup(bot):
     await bot.add_cog(Ban(bot))
\ No newline at end of file
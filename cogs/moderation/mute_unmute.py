@@ -1,5 +1,7 @@
+import discord
 from discord.ext import commands
 import config
+from utils.mass_actions import MAX_TIMEOUT, TargetSpec, parse_duration, split_protected, confirm_and_run
 
 class Mute(commands.Cog):
     def __init__(self, bot):
@@ -78,5 +80,35 @@ class Mute(commands.Cog):
         except discord.Forbidden:
             await self.send_error_embed(ctx, "Permission Error 🚫", "**I don't have permission to unmute this user!**")
 
+    @commands.hybrid_command(name="masstimeout", aliases=["massmute"], description="Times out many members at once by ID, join time or account age.")
+    @commands.has_permissions(moderate_members=True)
+    @commands.bot_has_permissions(moderate_members=True)
+    @commands.guild_only()
+    async def masstimeout(self, ctx, duration: str = None, *, targets: str = None):
+        """Times out member IDs/mentions and members matching joined:<duration> or age:<duration>; other words are the reason."""
+        spec = TargetSpec.parse(targets)
+        length = parse_duration(duration)
+        if length is None or not spec:
+            return await self.send_error_embed(ctx, "Incorrect Usage ❌", "**Usage:** `/masstimeout <duration> <ids...> [joined:30m] [age:7d] [reason]`\n**Example:** `/masstimeout 1h joined:10m Raid`")
+        if length > MAX_TIMEOUT:
+            return await self.send_error_embed(ctx, "Invalid Duration ⚠", "**Timeouts can last at most 28 days.**")
+
+        await ctx.defer()
+        user_ids, skipped = split_protected(ctx, await spec.resolve(self.bot, ctx.guild), members_only=True)
+        if not user_ids:
+            return await self.send_error_embed(ctx, "Nothing To Do ⚠", f"**No members can be timed out.** ({skipped} skipped)")
+
+        async def run(progress):
+            # The end time is fixed when the moderator confirms, not when the prompt was sent
+            until = discord.utils.utcnow() + length
+            return await self.bot.mass_actions.timeout(ctx.guild, user_ids, until, reason=spec.reason, progress=progress, skipped=skipped)
+
+        await confirm_and_run(
+            ctx, "Mass Timeout",
+            f"**Time out {len(user_ids):,} members for `{duration}`?** ({skipped:,} skipped)\n**Reason:** `{spec.reason}`",
+            config.DEFAULT_COLOR,
+            run
+        )
+
 async def setup(bot):
     await bot.add_cog(Mute(bot))
\ No newline at end of file
@@ -0,0 +1,103 @@
+import discord
+from discord.ext import commands
+import config
+
+class Diagnostics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name="memory", aliases=["memreport"], hidden=True)
+    @commands.is_owner()
+    async def memory(self, ctx, limit: int = 10):
+        """Shows cached members and estimated memory per guild"""
+        policy = self.bot.member_cache
+        rows = policy.report()
+        total_bytes = sum(row['estimated_bytes'] for row in rows)
+        cached = sum(row['cached_members'] for row in rows)
+        members = sum(row['member_count'] for row in rows)
+
+        embed = discord.Embed(
+            title="Member Cache Report",
+            description=(
+                f"**Mode:** `{policy.mode}`\n"
+                f"**Cached members:** {cached:,} of {members:,}\n"
+                f"**Estimated size:** {total_bytes / 1024 / 1024:.1f} MiB\n"
+                f"**Chunked guilds:** {sum(1 for guild in self.bot.guilds if policy.is_chunked(guild)):,} of {len(self.bot.guilds):,}"
+            ),
+            color=config.EMBED_COLOR
+        )
+
+        for row in rows[:max(1, min(limit, 20))]:
+            embed.add_field(
+                name=f"{row['name']} ({row['guild_id']})",
+                value=(
+                    f"{row['cached_members']:,}/{row['member_count']:,} cached, "
+                    f"{row['with_presence']:,} with presence\n"
+                    f"~{row['estimated_bytes'] / 1024:.0f} KiB"
+                    f"{' • needs members' if row['needs_members'] else ''}"
+                ),
+                inline=False
+            )
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="metrics", hidden=True)
+    @commands.is_owner()
+    async def metrics(self, ctx, metric: str = None):
+        """Shows the slowest commands, queries, events and loops"""
+        rows = self.bot.metrics.summary(metric)
+        embed = discord.Embed(
+            title="Metrics" if metric is None else f"Metrics: {metric}",
+            color=config.EMBED_COLOR
+        )
+        if not rows:
+            embed.description = "No samples recorded yet."
+        else:
+            lines = [
+                f"`{name}:{label}` n={count:,} avg={mean * 1000:.1f}ms p50≤{p50 * 1000:.1f}ms p99≤{p99 * 1000:.1f}ms max={maximum * 1000:.1f}ms"
+                for name, label, count, mean, p50, p99, maximum in rows[:20]
+            ]
+            embed.description = "\n".join(lines)[:4096]
+
+        lag = self.bot.metrics.histograms.get(('event_loop_lag', 'loop'))
+        if lag and lag.count:
+            embed.set_footer(text=f"Event loop lag p99 ≤ {lag.quantile(0.99) * 1000:.1f}ms, max {lag.maximum * 1000:.1f}ms")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="helpstats", hidden=True)
+    @commands.is_owner()
+    async def helpstats(self, ctx):
+        """Shows how often help pages are served from the render cache"""
+        stats = self.bot.help_catalog.stats()
+        embed = discord.Embed(
+            title="Help Catalog",
+            description=(
+                f"**Hit rate:** {stats['hit_rate'] * 100:.1f}% ({stats['hits']:,} hits, {stats['misses']:,} renders)\n"
+                f"**Cached prefixes:** {stats['prefixes']:,}\n"
+                f"**Pages:** {stats['pages']:,} • **Command pages:** {stats['commands']:,}\n"
+                f"**Catalog builds:** {stats['builds']:,}"
+            ),
+            color=config.EMBED_COLOR
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="usage", hidden=True)
+    @commands.is_owner()
+    async def usage(self, ctx, scope: str = None):
+        """Shows the most used commands bot-wide, or in this server with `usage here`"""
+        command_usage = self.bot.command_usage
+        if command_usage is None:
+            return await ctx.send("Command usage is only recorded when `DATABASE_WAL` is enabled.")
+        guild_id = ctx.guild.id if scope == "here" and ctx.guild else None
+        rows = await command_usage.top(15, guild_id)
+        embed = discord.Embed(
+            title="Command Usage" if guild_id is None else f"Command Usage in {ctx.guild.name}",
+            description="\n".join(f"`{name}` {uses:,}" for name, uses in rows) or "No commands recorded yet.",
+            color=config.EMBED_COLOR
+        )
+        stats = self.bot.write_behind.stats()
+        embed.set_footer(text=f"{stats['writes']:,} writes buffered into {stats['committed']:,} statements")
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -1,70 +1,86 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import config
+
+class HelpPaginator(discord.ui.View):
+    """Previous/next buttons over prebuilt help pages"""
+    def __init__(self, pages, author_id):
+        super().__init__(timeout=120)
+        self.pages = pages
+        self.author_id = author_id
+        self.index = 0
+        self.message = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= len(self.pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ This help menu isn't yours.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction):
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = max(0, self.index - 1)
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = min(len(self.pages) - 1, self.index + 1)
+        await self._show(interaction)
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
 
 class HelpCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     async def send_help_embed(self, interaction_or_ctx, command_name=None):
-        """Sends the help embed for both prefix and slash commands"""
-        prefix = await config.get_prefix(self.bot, interaction_or_ctx) if isinstance(interaction_or_ctx, commands.Context) else "/"
-        
-        # Get the user's avatar (handling None cases properly)
-        author = interaction_or_ctx.author if isinstance(interaction_or_ctx, commands.Context) else interaction_or_ctx.user
-        avatar_url = (author.avatar or author.default_avatar).replace(static_format="png").url
-        bot_avatar_url = (self.bot.user.avatar or self.bot.user.default_avatar).replace(static_format="png").url
+        """Sends the help pages for both prefix and slash commands"""
+        is_context = isinstance(interaction_or_ctx, commands.Context)
+        prefix = interaction_or_ctx.clean_prefix if is_context else "/"
+        author = interaction_or_ctx.author if is_context else interaction_or_ctx.user
+        catalog = self.bot.help_catalog
 
         if command_name is None:
-            embed = discord.Embed(
-                title="Help Menu",
-                description=f"Use `{prefix}help <command>` for more info on a command.\nExample: `{prefix}help mute`",
-                color=config.DEFAULT_COLOR
-            )
-            embed.add_field(
-                name="📌 Categories", 
-                value="🔹 Antinuke\n🔹 AutoResponder\n🔹 Fun\n🔹 Information\n🔹 Moderation\n🔹 Utility\n🔹 Voice\n🔹 Welcome",
-                inline=False
-            )
-            embed.set_thumbnail(url=bot_avatar_url)  # Bot's avatar as thumbnail
-            embed.set_footer(text=f"Requested by {author}", icon_url=avatar_url)
-
-            if isinstance(interaction_or_ctx, commands.Context):
-                await interaction_or_ctx.send(embed=embed)
+            pages = catalog.pages(prefix)
+            view = HelpPaginator(pages, author.id) if len(pages) > 1 else None
+            if is_context:
+                message = await interaction_or_ctx.send(embed=pages[0], view=view)
             else:
-                await interaction_or_ctx.response.send_message(embed=embed)
+                await interaction_or_ctx.response.send_message(embed=pages[0], view=view)
+                message = await interaction_or_ctx.original_response() if view else None
+            if view:
+                view.message = message
             return
 
-        command = self.bot.get_command(command_name)
-
-        # Prevent showing help for the help command itself
-        if command and command.name != "help":
-            embed = discord.Embed(
-                title=f"Command: `{prefix}{command.name}`",
-                description=command.help or "No description available.",
-                color=config.DEFAULT_COLOR
-            )
-            embed.add_field(
-                name="Aliases",
-                value=", ".join(command.aliases) if command.aliases else "None",
-                inline=False
-            )
-            embed.set_thumbnail(url=bot_avatar_url)  # Bot's avatar as thumbnail
-            embed.set_footer(text=f"Requested by {author}", icon_url=avatar_url)
-
-            if isinstance(interaction_or_ctx, commands.Context):
+        # The help command itself has no detail page
+        embed = catalog.command(command_name, prefix)
+        if embed:
+            if is_context:
                 await interaction_or_ctx.send(embed=embed)
             else:
                 await interaction_or_ctx.response.send_message(embed=embed)
         else:
-            if isinstance(interaction_or_ctx, commands.Context):
+            if is_context:
                 await interaction_or_ctx.send(f"❌ Command `{command_name}` not found.")
             else:
                 await interaction_or_ctx.response.send_message(f"❌ Command `{command_name}` not found.", ephemeral=True)
 
     @commands.command()
-    async def help(self, ctx, command_name=None):
+    async def help(self, ctx, *, command_name=None):
         """Custom Help Command (Prefix)"""
         await self.send_help_embed(ctx, command_name)
 
@@ -74,4 +90,4 @@ class HelpCommand(commands.Cog):
         await self.send_help_embed(interaction, command_name)
 
 async def setup(bot):
-    await bot.add_cog(HelpCommand(bot))
\ No newline at end of file
+    await bot.add_cog(HelpCommand(bot))
@@ -22,9 +22,44 @@ DEFAULT_PREFIX = "&"
 # Discord default grey color
 EMBED_COLOR = 0x2f3136
 
+# Moderation embed color
+DEFAULT_COLOR = EMBED_COLOR
+
 # Database file
 DATABASE_FILE = "database/bot.db"
 
+# WAL storage engine for the tables written through bot.db_pool (command usage counters).
+# Opening it switches the database file to WAL, so the Database connection's reads no longer wait on writes.
+# The Database helpers keep their own connection, so readers only pay off for code reading through
+# bot.db_pool; with 0 those reads share the writer connection.
+DATABASE_WAL = True
+DATABASE_READERS = 0
+
+# Write-behind buffering for high-frequency writes: "full" (write-through), "normal" or "off"
+DATABASE_DURABILITY = "normal"
+WRITE_BEHIND_INTERVAL = 1.0
+
+# Sharding: AUTO_SHARD runs every shard in one process (shard count from Discord when SHARD_COUNT is None).
+# launcher.py sets these per cluster process through the environment.
+AUTO_SHARD = os.getenv("AUTO_SHARD", "0") == "1"
+SHARD_COUNT = int(os.getenv("SHARD_COUNT")) if os.getenv("SHARD_COUNT") else None
+SHARD_IDS = [int(shard) for shard in os.getenv("SHARD_IDS").split(",")] if os.getenv("SHARD_IDS") else None
+
+# Multi-process cluster launcher: processes on this host and where they share bot-wide stats
+CLUSTER_COUNT = 1
+CLUSTER_ID = int(os.getenv("CLUSTER_ID", "0"))
+CLUSTER_STATS_DIR = "database/cluster"
+
+# Member cache: "full" chunks every guild at startup, "lazy" only caches members of guilds
+# with vanity/activity role or antinuke configs (presence data of other guilds is discarded).
+# Lazy is opt-in: on_member_remove/on_member_update only fire for cached members.
+MEMBER_CACHE_MODE = "full"
+
+# Prometheus text metrics on http://METRICS_HOST:METRICS_PORT/metrics (cluster N listens on port + N).
+# Off by default; pick a free port to enable it (9100 and up are taken by node_exporter and other exporters).
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = None
+
 # Support Server Configuration
 SUPPORT_SERVER_LINK = "https://discord.gg/VmvwknN2Jp"
 SUPPORT_SERVER_ID = 0  
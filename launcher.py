@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import aiohttp
+from config import BOT_TOKEN, SHARD_COUNT, CLUSTER_COUNT
+from utils.cluster import split_shards
+
+# Seconds to wait before restarting a cluster that exited, doubled on each quick failure
+RESTART_DELAY = 5
+MAX_RESTART_DELAY = 300
+
+
+async def recommended_shards():
+    """Ask Discord how many shards the bot should run"""
+    headers = {"Authorization": f"Bot {BOT_TOKEN}"}
+    async with aiohttp.ClientSession(headers=headers) as session:
+        async with session.get("https://discord.com/api/v10/gateway/bot") as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data["shards"]
+
+
+async def run_cluster(cluster_id, shard_ids, shard_count, stopping):
+    """Run one cluster process, restarting it until the launcher stops"""
+    env = dict(
+        os.environ,
+        AUTO_SHARD="1",
+        CLUSTER_ID=str(cluster_id),
+        SHARD_COUNT=str(shard_count),
+        SHARD_IDS=",".join(map(str, shard_ids)),
+    )
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    delay = RESTART_DELAY
+    while not stopping.is_set():
+        print(f"🚀 Starting cluster {cluster_id} (shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count})")
+        started = asyncio.get_running_loop().time()
+        process = await asyncio.create_subprocess_exec(sys.executable, main, env=env)
+        waiter = asyncio.create_task(process.wait())
+        stopper = asyncio.create_task(stopping.wait())
+        await asyncio.wait({waiter, stopper}, return_when=asyncio.FIRST_COMPLETED)
+
+        if stopping.is_set():
+            stopper.cancel()
+            if process.returncode is None:
+                process.terminate()
+                await waiter
+            return
+
+        stopper.cancel()
+        print(f"❌ Cluster {cluster_id} exited with code {process.returncode}")
+        # A cluster that ran for a while gets restarted quickly again
+        if asyncio.get_running_loop().time() - started > MAX_RESTART_DELAY:
+            delay = RESTART_DELAY
+        try:
+            await asyncio.wait_for(stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        delay = min(delay * 2, MAX_RESTART_DELAY)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run the bot as several processes on one host")
+    parser.add_argument("--clusters", type=int, default=CLUSTER_COUNT, help="number of processes")
+    parser.add_argument("--shards", type=int, default=SHARD_COUNT, help="total shard count (default: Discord's recommendation)")
+    args = parser.parse_args()
+
+    shard_count = args.shards or await recommended_shards()
+    ranges = split_shards(shard_count, args.clusters)
+    print(f"📊 {shard_count} shards across {len(ranges)} clusters")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopping.set)
+        except NotImplementedError:
+            pass
+
+    await asyncio.gather(*(
+        run_cluster(cluster_id, shard_ids, shard_count, stopping)
+        for cluster_id, shard_ids in enumerate(ranges)
+    ))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,11 +3,52 @@ from discord.ext import commands, tasks
 import asyncio
 import os
 import sys
+import time
 import traceback
-from config import BOT_TOKEN, OWNER_IDS, DEV_IDS, ADMIN_IDS, emoji, DEFAULT_PREFIX
+from config import BOT_TOKEN, OWNER_IDS, DEV_IDS, ADMIN_IDS, emoji, DEFAULT_PREFIX, DATABASE_FILE, DATABASE_WAL, DATABASE_READERS, DATABASE_DURABILITY, WRITE_BEHIND_INTERVAL, AUTO_SHARD, SHARD_COUNT, SHARD_IDS, CLUSTER_ID, CLUSTER_STATS_DIR, MEMBER_CACHE_MODE, METRICS_HOST, METRICS_PORT, EMBED_COLOR
 from utils.database import Database
 from utils.helpers import get_prefix, is_authorized_user
 from utils.logging import BotLogger
+from utils.cache import GuildSettingsCache
+from utils.vanity import VanityRoleEngine
+from utils.activity import ActivityRoleEngine
+from utils.role_queue import RoleMutationQueue
+from utils.log_pipeline import LogPipeline, QueuedLogger
+from utils.startup import load_extensions, format_timings
+from utils.embed_templates import EmbedTemplateCache
+from utils.sqlite_pool import SQLitePool
+from utils.write_behind import WriteBehindQueue
+from utils.command_usage import CommandUsage
+from utils.ratelimit import RateTracker
+from utils.domains import LinkMatcherCache
+from utils.autoresponder_matcher import AutoresponderCache
+from utils.antinuke_engine import AntinukeEngine
+from utils.expiry import ExpiryScheduler
+from utils.cluster import ClusterStats, shard_for
+from utils.member_cache import MemberCachePolicy
+from utils.metrics import Metrics, MetricsServer
+from utils.deferred_delete import DeferredDeleter
+from utils.command_registry import CommandRegistry
+from utils.help_catalog import HelpCatalog
+from utils.mass_actions import MassActionRunner
+
+# Disabled antinuke configurations are deleted this long after being disabled
+ANTINUKE_RETENTION = 7 * 24 * 60 * 60
+
+# Expiring record kinds and the delay added to their stored expiry time
+EXPIRING_KINDS = (('no_prefix', 0), ('premium', 0), ('antinuke_cleanup', ANTINUKE_RETENTION))
+
+# Bot-wide jobs (expiring no-prefix, premium and antinuke records) only run on this cluster
+PRIMARY_CLUSTER_ID = 0
+
+# Extension holding the antinuke commands and settings
+ANTINUKE_EXTENSION = 'cogs.antinuke.antinuke'
+
+# Events the antinuke engine detects; the cog's own listeners for them are detached
+ANTINUKE_EVENTS = frozenset({
+    'on_guild_channel_delete', 'on_guild_channel_create', 'on_guild_role_delete',
+    'on_guild_role_create', 'on_member_ban', 'on_member_join',
+})
 
 # Bot intents
 intents = discord.Intents.default()
@@ -24,9 +65,12 @@ class MentionResponseView(discord.ui.View):
     @discord.ui.button(label="Bot Stats", emoji=f"{emoji.server}", style=discord.ButtonStyle.primary)
     async def bot_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Show bot statistics"""
-        total_guilds = len(self.bot.guilds)
-        total_users = sum(guild.member_count for guild in self.bot.guilds)
-        total_channels = sum(len(guild.channels) for guild in self.bot.guilds)
+        # Totals across every cluster process, republished every 30 seconds
+        totals = self.bot.cluster_stats.aggregate()
+        total_guilds = totals['guilds']
+        total_users = totals['users']
+        total_channels = totals['channels']
+        latency = totals['latency'] if totals['latency'] is not None else self.bot.latency
         
         embed = discord.Embed(
             title=f"{self.bot.user.name} Statistics",
@@ -37,7 +81,7 @@ class MentionResponseView(discord.ui.View):
         embed.add_field(name="Users", value=f"{total_users:,}", inline=True)
         embed.add_field(name="Channels", value=f"{total_channels:,}", inline=True)
         
-        embed.add_field(name="Latency", value=f"{round(self.bot.latency * 1000)}ms", inline=True)
+        embed.add_field(name="Latency", value=f"{round(latency * 1000)}ms", inline=True)
         embed.add_field(name="Python Version", value="3.11", inline=True)
         embed.add_field(name="Discord.py Version", value=discord.__version__, inline=True)
         
@@ -79,22 +123,60 @@ class MentionResponseView(discord.ui.View):
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-class DiscordBot(commands.Bot):
+# Shard settings only apply to the auto-sharded client
+if AUTO_SHARD:
+    BotBase = commands.AutoShardedBot
+    shard_options = {'shard_count': SHARD_COUNT, 'shard_ids': SHARD_IDS}
+else:
+    BotBase = commands.Bot
+    shard_options = {}
+
+class DiscordBot(BotBase):
     def __init__(self):
+        self.member_cache = MemberCachePolicy(self, MEMBER_CACHE_MODE)
         super().__init__(
             command_prefix=self.get_bot_prefix,
             intents=intents,
             help_command=None,
-            case_insensitive=True
+            case_insensitive=True,
+            **shard_options,
+            **self.member_cache.client_options(intents)
         )
+        self.cluster_stats = ClusterStats(CLUSTER_STATS_DIR, CLUSTER_ID)
+        self.runs_global_jobs = CLUSTER_ID == PRIMARY_CLUSTER_ID
+        self.metrics = Metrics()
+        self.metrics_server = MetricsServer(self.metrics, METRICS_PORT + CLUSTER_ID, METRICS_HOST) if METRICS_PORT else None
         self.db = Database()
+        self.db_pool = SQLitePool(DATABASE_FILE, readers=DATABASE_READERS) if DATABASE_WAL else None
+        self.write_behind = WriteBehindQueue(
+            self.db_pool, durability=DATABASE_DURABILITY, interval=WRITE_BEHIND_INTERVAL
+        ) if self.db_pool else None
+        self.command_usage = CommandUsage(self.db_pool, self.write_behind) if self.write_behind else None
+        self.settings_cache = GuildSettingsCache(self.db)
+        self.vanity_engine = VanityRoleEngine(self)
+        self.activity_engine = ActivityRoleEngine(self)
+        self.role_queue = RoleMutationQueue()
+        self.embed_templates = EmbedTemplateCache(self.db)
+        self.rate_tracker = RateTracker()
+        self.link_matchers = LinkMatcherCache(self.db)
+        self.autoresponders = AutoresponderCache(self.db)
+        self.antinuke = AntinukeEngine(self)
+        self.expiry = ExpiryScheduler()
+        self.deleter = DeferredDeleter()
+        self.command_registry = CommandRegistry(self)
+        self.help_catalog = HelpCatalog(self, color=EMBED_COLOR)
+        self.mass_actions = MassActionRunner()
         self.owner_ids = OWNER_IDS
-        self.logger = BotLogger(self)
+        self.log_pipeline = LogPipeline(self)
+        self.logger = QueuedLogger(BotLogger(self), self.log_pipeline)
         
     async def setup_hook(self):
         """Called when the bot is starting up"""
-        # Initialize database
-        await self.db.init_db()
+        started = time.perf_counter()
+        
+        # Initialize database and logging webhooks while cog modules import
+        storage = asyncio.create_task(self._init_storage())
+        webhooks = asyncio.create_task(self._init_webhooks(storage))
         
         # Load all cogs
         cog_files = [
@@ -102,6 +184,7 @@ class DiscordBot(commands.Bot):
             'cogs.welcomer.welcomer',
             'cogs.utility.utility',
             'cogs.owner.owner',
+            'cogs.owner.diagnostics',
             'cogs.moderation.moderation',
             'cogs.vanityrole.vanityrole',
             'cogs.activityroles.activityroles',
@@ -117,32 +200,193 @@ class DiscordBot(commands.Bot):
             'cogs.automod.automod'
         ]
         
-        for cog in cog_files:
-            try:
-                await self.load_extension(cog)
-                print(f"✅ Loaded {cog}")
-            except Exception as e:
-                print(f"❌ Failed to load {cog}: {e}")
-                traceback.print_exc()
+        timings = await load_extensions(self, cog_files, storage)
+        loaded = sum(1 for timing in timings if not timing.error)
+        print(f"✅ Loaded {loaded}/{len(cog_files)} cogs")
         
-        # Initialize logging webhooks
-        await self.logger.initialize_webhooks()
+        print(format_timings(timings, [
+            ("Database init", await storage),
+            ("Webhook init", await webhooks),
+            ("Total startup", time.perf_counter() - started),
+        ]))
         
         # Start background tasks
+        self.metrics.start()
+        if self.metrics_server:
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                print(f"Error starting metrics endpoint: {e}")
+        self.log_pipeline.start()
+        self.role_queue.start()
+        self.deleter.start()
         self.vanity_checker.start()
         self.activity_checker.start()
-        self.antinuke_cleanup.start()
+        self.expiry.start()
+        self.expiry_reloader.start()
+        self.cluster_stats_publisher.start()
+        if self.runs_global_jobs and not self.expiry.tracks('antinuke_cleanup'):
+            self.antinuke_cleanup.start()
+    
+    async def _init_storage(self):
+        """Initialize the database and everything loaded from it"""
+        started = time.perf_counter()
+        await self.db.init_db()
+        if self.db_pool:
+            await self.db_pool.open()
+            await self.write_behind.start()
+            await self.command_usage.create_table()
+        
+        # Keep cached settings in sync with database writes
+        self.settings_cache.bind_write_methods()
+        self.embed_templates.bind_write_methods()
+        self.link_matchers.bind_write_methods()
+        self.autoresponders.bind_write_methods()
+        self.antinuke.bind_write_methods()
+        self.antinuke.bind_readers()
+        
+        # Load presence driven role configs
+        await self.vanity_engine.reload()
+        self.vanity_engine.bind_write_methods()
+        await self.activity_engine.reload()
+        self.activity_engine.bind_write_methods()
+        
+        # Load expiring no-prefix access, premium guilds and disabled antinuke configs
+        await self._init_expiry()
+        
+        # Time every database call (after the write hooks so they are included)
+        self.metrics.instrument(self.db)
+        return time.perf_counter() - started
+    
+    async def _init_expiry(self):
+        """Load expiring records into the expiry scheduler"""
+        # Other clusters still drop expired records locally, only the primary deletes them
+        if self.runs_global_jobs:
+            self.expiry.register('no_prefix', self._expire_no_prefix)
+            self.expiry.register('premium', self._expire_premium)
+            self.expiry.register('antinuke_cleanup', self._expire_antinuke)
+        for kind, offset in EXPIRING_KINDS:
+            try:
+                if await self.expiry.load(self.db, kind, offset):
+                    self.expiry.bind_write_methods(self.db, kind, offset)
+                else:
+                    print(f"⚠️ The database has no loader for {kind} expiry records; they are not tracked")
+            except Exception as e:
+                print(f"Error loading {kind} expiry records: {e}")
+    
+    async def _init_webhooks(self, storage):
+        """Initialize logging webhooks once the database is ready"""
+        await storage
+        started = time.perf_counter()
+        await self.logger.initialize_webhooks()
+        return time.perf_counter() - started
+    
+    async def flush_writes(self):
+        """Commit buffered database writes (called before backups and on shutdown)"""
+        if self.write_behind:
+            return await self.write_behind.flush()
+        return 0
+    
+    async def add_cog(self, cog, **kwargs):
+        await super().add_cog(cog, **kwargs)
+        if type(cog).__module__ == ANTINUKE_EXTENSION and self.antinuke.ready:
+            self._detach_antinuke_listeners(cog)
+    
+    def _detach_antinuke_listeners(self, cog):
+        """Remove the antinuke cog's detection listeners so the engine handles those events alone"""
+        for name, listener in cog.get_listeners():
+            if name in ANTINUKE_EVENTS:
+                self.remove_listener(listener, name)
+    
+    def add_command(self, command):
+        super().add_command(command)
+        # Extension load/reload adds cog commands through here
+        self.command_registry.invalidate()
+    
+    def remove_command(self, name):
+        command = super().remove_command(name)
+        self.command_registry.invalidate()
+        return command
+    
+    def owns_guild(self, guild_id):
+        """Check if a guild is on one of this process's shards"""
+        shard_ids = getattr(self, 'shard_ids', None)
+        if not shard_ids or not self.shard_count:
+            return True
+        return shard_for(guild_id, self.shard_count) in shard_ids
+    
+    def is_premium(self, guild_id):
+        """Check if a guild has active premium"""
+        return self.expiry.is_active('premium', guild_id)
+    
+    async def _expire_no_prefix(self, user_id):
+        """Remove no-prefix access once it expires"""
+        remove = getattr(self.db, 'remove_no_prefix_user', None)
+        if remove:
+            await remove(user_id)
+    
+    async def _expire_premium(self, guild_id):
+        """Remove premium from a guild once it expires"""
+        remove = getattr(self.db, 'remove_premium_guild', None)
+        if remove:
+            await remove(guild_id)
+    
+    async def _expire_antinuke(self, guild_id):
+        """Delete an antinuke configuration that has stayed disabled past the retention period"""
+        cleanup = getattr(self.db, 'cleanup_antinuke_guild', None)
+        if cleanup:
+            await cleanup(guild_id)
+        else:
+            await self.db.cleanup_disabled_antinuke()
+    
+    async def close(self):
+        """Flush queued work before disconnecting"""
+        await self.expiry.stop()
+        await self.metrics.stop()
+        if self.metrics_server:
+            await self.metrics_server.close()
+        await self.role_queue.stop()
+        await self.deleter.close()
+        await self.log_pipeline.close()
+        if self.db_pool:
+            # A failing flush must not keep the bot from shutting down
+            try:
+                await self.write_behind.close()
+            except Exception as e:
+                print(f"Error flushing buffered writes on shutdown: {e}")
+            await self.db_pool.close()
+        await super().close()
+    
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        """Time every event listener, including cog listeners"""
+        with self.metrics.timer('event', event_name):
+            await super()._run_event(coro, event_name, *args, **kwargs)
+    
+    async def on_connect(self):
+        """A fresh READY (not a resume) clears every cached member"""
+        self.member_cache.reset()
+    
+    async def on_guild_unavailable(self, guild):
+        """The guild's members are re-sent when it becomes available again"""
+        self.member_cache.forget(guild.id)
     
     async def on_ready(self):
         """Called when the bot is ready"""
         print(f"🤖 {self.user} is now online!")
         print(f"📊 Connected to {len(self.guilds)} servers")
         
-        # Set bot status
+        # Cache members only where vanity/activity roles and antinuke need them
+        asyncio.create_task(self.member_cache.chunk_configured())
+        
+        # Render the help pages now so the first help command doesn't pay for it
+        self.help_catalog.pages(DEFAULT_PREFIX)
+        
+        # Set bot status from the bot-wide guild count
+        self.cluster_stats.publish(self)
         await self.change_presence(
             activity=discord.Activity(
                 type=discord.ActivityType.watching,
-                name=f"{len(self.guilds)} Guilds"
+                name=f"{self.cluster_stats.aggregate()['guilds']} Guilds"
             )
         )
     
@@ -152,6 +396,8 @@ class DiscordBot(commands.Bot):
     
     async def on_guild_remove(self, guild):
         """Called when bot leaves a guild"""
+        self.settings_cache.invalidate_guild(guild.id)
+        self.member_cache.forget(guild.id)
         await self.logger.log_server_leave(guild)
     
     async def on_message(self, message):
@@ -162,10 +408,10 @@ class DiscordBot(commands.Bot):
         
         # Check if message is in media channel
         if message.guild and hasattr(message, 'attachments'):
-            is_media_channel = await self.db.is_media_channel(message.guild.id, message.channel.id)
+            is_media_channel = await self.settings_cache.is_media_channel(message.guild.id, message.channel.id)
             if is_media_channel:
                 # Check if user has bypass
-                has_bypass = await self.db.has_media_bypass(message.guild.id, message.author.id, message.author.roles)
+                has_bypass = await self.settings_cache.has_media_bypass(message.guild.id, message.author.id, message.author.roles)
                 
                 # If no attachment and no bypass, delete the message
                 if not message.attachments and not has_bypass and not message.author.guild_permissions.manage_messages:
@@ -176,9 +422,8 @@ class DiscordBot(commands.Bot):
                             description="This channel only allows messages with attachments (images, videos, files).",
                             color=0xFF0000
                         )
-                        warning_msg = await message.channel.send(embed=embed)
-                        await asyncio.sleep(5)
-                        await warning_msg.delete()
+                        # One live warning per channel, however many messages get removed
+                        await self.deleter.warn(message.channel, 'media_only', 5, embed=embed)
                         return
                     except discord.Forbidden:
                         pass
@@ -188,14 +433,11 @@ class DiscordBot(commands.Bot):
             # Only respond to direct mentions, not replies
             if f'<@{self.user.id}>' in message.content or f'<@!{self.user.id}>' in message.content:
                 # Get server prefix (clean, not the command callable)
-                prefix = await self.db.get_guild_prefix(message.guild.id) if message.guild else DEFAULT_PREFIX
+                prefix = await self.settings_cache.get_guild_prefix(message.guild.id) if message.guild else DEFAULT_PREFIX
                 
-                # Count total commands (excluding hidden ones)
-                total_commands = 0
-                for cog_name, cog in self.cogs.items():
-                    if hasattr(cog, 'hidden') and getattr(cog, 'hidden', False):
-                        continue
-                    total_commands += len([cmd for cmd in cog.get_commands() if not cmd.hidden])
+                # Total commands (excluding hidden ones) from the cached registry
+                self.command_registry.refresh()
+                total_commands = self.command_registry.visible_count
                 
                 bot_name = self.user.name if self.user else "Bot"
                 bot_mention = self.user.mention if self.user else "@Bot"
@@ -224,28 +466,41 @@ class DiscordBot(commands.Bot):
             prefixes = [f'<@{self.user.id}> ', f'<@!{self.user.id}> ']
         else:
             prefixes = []
-        guild_prefix = await get_prefix(bot, message)
+        if message.guild:
+            guild_prefix = await self.settings_cache.get_guild_prefix(message.guild.id) or DEFAULT_PREFIX
+        else:
+            guild_prefix = await get_prefix(bot, message)
         if isinstance(guild_prefix, list):
             prefixes.extend(guild_prefix)
         else:
             prefixes.append(guild_prefix)
         return prefixes
     
+    async def on_command_completion(self, ctx):
+        """Count command uses (buffered, committed in batches)"""
+        if self.command_usage:
+            await self.command_usage.record(ctx)
+    
     async def on_command_error(self, ctx, error):
         """Global error handler"""
+        if ctx.command:
+            self.metrics.error('command', ctx.command.qualified_name)
         if isinstance(error, commands.CommandNotFound):
-            # Show invalid command message
-            prefix = await get_prefix(self, ctx.message)
-            if isinstance(prefix, list):
-                prefix = prefix[0]
+            # Typo floods get a couple of replies per channel, not one per message
+            if not self.command_registry.allow_reply(ctx.channel.id):
+                return
             
             command_name = ctx.invoked_with
+            description = f"There is no command named `{command_name}`."
+            suggestions = self.command_registry.suggest(command_name)
+            if suggestions:
+                description += "\nDid you mean " + ", ".join(f"`{ctx.clean_prefix}{name}`" for name in suggestions) + "?"
             embed = discord.Embed(
                 title=f"{emoji.cross} Command Not Found",
-                description=f"There is no command named `{command_name}`.",
+                description=description,
                 color=0x2f3136
             )
-            await ctx.send(embed=embed, delete_after=5)
+            self.deleter.schedule(await ctx.send(embed=embed), 5)
             return
         
         if isinstance(error, commands.MissingPermissions):
@@ -296,14 +551,14 @@ class DiscordBot(commands.Bot):
             return
         
         # Check if user is blacklisted
-        blacklist_reason = await self.db.is_blacklisted_user(message.author.id)
+        blacklist_reason = await self.settings_cache.is_blacklisted_user(message.author.id)
         if blacklist_reason:
             return  # Silently ignore blacklisted users
         
         ctx = await self.get_context(message)
         
         # Check for no-prefix users
-        if not ctx.valid and await is_authorized_user(self.db, message.author.id):
+        if not ctx.valid and await self._has_no_prefix(message.author.id):
             # Try processing as a no-prefix command
             content = message.content.strip()
             if content and not content.startswith(('http', 'www', 'discord.gg')):
@@ -320,182 +575,159 @@ class DiscordBot(commands.Bot):
                     description=f"The command `{ctx.command.name}` is ignored in this channel.",
                     color=0x2f3136
                 )
-                await ctx.send(embed=embed, delete_after=5)
+                await self.deleter.warn(ctx.channel, f"ignored:{ctx.command.name}", 5, embed=embed)
                 return
             
-            # Log command execution
+            # Log command execution (queued, never awaited inline)
             await self.logger.log_command_executed(ctx)
         
-        await self.invoke(ctx)
+        if ctx.command:
+            with self.metrics.timer('command', ctx.command.qualified_name):
+                await self.invoke(ctx)
+        else:
+            await self.invoke(ctx)
+    
+    async def _has_no_prefix(self, user_id):
+        """Check no-prefix access, answering active no-prefix users from the expiry scheduler"""
+        if self.expiry.tracks('no_prefix') and self.expiry.is_active('no_prefix', user_id):
+            return True
+        # Owners, developers and admins are authorized through the usual check
+        return await is_authorized_user(self.db, user_id)
     
     async def _should_ignore_command(self, ctx):
         """Check if a command should be ignored"""
         if not ctx.guild:
             return False
         
-        # Check if user has bypass permission
-        user_role_ids = [role.id for role in ctx.author.roles] if hasattr(ctx.author, 'roles') else []
-        if await self.db.is_ignore_bypassed(ctx.guild.id, ctx.channel.id, ctx.author.id, user_role_ids):
+        # Compiled ignore rule for this channel (cached until the ignore settings change)
+        rule = await self.settings_cache.get_ignore_rule(ctx.guild.id, ctx.channel.id)
+        if rule is None:
             return False
         
-        # Get ignore settings for this channel
-        ignore_settings = await self.db.get_ignore_setting(ctx.guild.id, ctx.channel.id)
-        if not ignore_settings:
+        cog_name = ctx.cog.qualified_name if ctx.cog else None
+        if not rule.matches(ctx.command.name, cog_name):
             return False
         
-        # Check if all commands are ignored
-        if ignore_settings.get('ignore_all'):
-            return True
-        
-        # Check if specific command is ignored
-        ignored_commands = ignore_settings.get('ignored_commands', '').split(',')
-        ignored_commands = [cmd.strip().lower() for cmd in ignored_commands if cmd.strip()]
-        if ctx.command.name.lower() in ignored_commands:
-            return True
-        
-        # Check if command category is ignored
-        ignored_categories = ignore_settings.get('ignored_categories', '').split(',')
-        ignored_categories = [cat.strip().lower() for cat in ignored_categories if cat.strip()]
-        if ctx.cog and ctx.cog.qualified_name.lower() in ignored_categories:
-            return True
-        
-        return False
+        # Check if user has bypass permission
+        user_role_ids = [role.id for role in ctx.author.roles] if hasattr(ctx.author, 'roles') else []
+        return not await self.settings_cache.is_ignore_bypassed(ctx.guild.id, ctx.channel.id, ctx.author.id, user_role_ids)
     
-    @tasks.loop(seconds=30)
+    async def on_presence_update(self, before, after):
+        """Re-evaluate presence driven roles for the member that changed"""
+        await self.vanity_engine.on_presence_update(before, after)
+        await self.activity_engine.on_presence_update(before, after)
+    
+    async def on_member_remove(self, member):
+        """Drop state kept for members that left"""
+        self.activity_engine.forget(member.guild.id, member.id)
+    
+    async def on_guild_channel_delete(self, channel):
+        """Feed channel deletes to antinuke"""
+        await self._feed_antinuke(channel.guild, 'channel_delete', channel.id)
+    
+    async def on_guild_channel_create(self, channel):
+        """Feed channel creates to antinuke"""
+        await self._feed_antinuke(channel.guild, 'channel_create', channel.id)
+    
+    async def on_guild_role_delete(self, role):
+        """Feed role deletes to antinuke"""
+        await self._feed_antinuke(role.guild, 'role_delete', role.id)
+    
+    async def on_guild_role_create(self, role):
+        """Feed role creates to antinuke"""
+        await self._feed_antinuke(role.guild, 'role_create', role.id)
+    
+    async def on_member_ban(self, guild, user):
+        """Feed bans to antinuke"""
+        await self._feed_antinuke(guild, 'ban', user.id)
+    
+    async def on_member_unban(self, guild, user):
+        """Let antinuke punish an unbanned executor again"""
+        self.antinuke.forget(guild.id, user.id)
+    
+    async def on_member_join(self, member):
+        """Cache the member where the guild is chunked and feed bot additions to antinuke"""
+        self.member_cache.add_member(member)
+        self.antinuke.forget(member.guild.id, member.id)
+        if member.bot:
+            await self._feed_antinuke(member.guild, 'bot_add', member.id)
+    
+    async def _feed_antinuke(self, guild, action, target_id):
+        """Record a destructive event once the engine can read antinuke settings"""
+        # Without its readers the cog's own listeners stay attached and do the detection
+        if not self.antinuke.ready:
+            return
+        await self.antinuke.record(guild, action, target_id)
+    
+    @tasks.loop(minutes=10)
     async def vanity_checker(self):
-        """Check for vanity URL changes in user activities"""
+        """Reconcile vanity roles missed by presence updates"""
         try:
-            vanity_configs = await self.db.get_all_vanity_configs()
-            
-            for config in vanity_configs:
-                guild = self.get_guild(config['guild_id'])
-                if not guild:
-                    continue
-                
-                vanity_url = config['vanity_url']
-                role_id = config['role_id']
-                role = guild.get_role(role_id)
-                
-                if not role:
-                    continue
-                
-                for member in guild.members:
-                    if member.bot:
-                        continue
-                    
-                    has_vanity = await self._check_user_has_vanity(member, vanity_url)
-                    has_role = role in member.roles
-                    
-                    if has_vanity and not has_role:
-                        # Add role
-                        try:
-                            await member.add_roles(role, reason="Vanity URL detected")
-                            await self._log_vanity_action(guild, member, config, "added")
-                        except discord.Forbidden:
-                            pass
-                    elif not has_vanity and has_role:
-                        # Remove role
-                        try:
-                            await member.remove_roles(role, reason="Vanity URL removed")
-                            await self._log_vanity_action(guild, member, config, "removed")
-                        except discord.Forbidden:
-                            pass
+            with self.metrics.timer('loop', 'vanity_checker'):
+                await self.vanity_engine.reload()
+                await self.vanity_engine.reconcile()
         except Exception as e:
+            self.metrics.error('loop', 'vanity_checker')
             print(f"Error in vanity checker: {e}")
     
-    @tasks.loop(seconds=60)
+    @vanity_checker.before_loop
+    async def before_vanity_checker(self):
+        await self.wait_until_ready()
+    
+    @tasks.loop(minutes=10)
     async def activity_checker(self):
-        """Check for activity changes"""
+        """Reconcile activity roles missed by presence updates"""
         try:
-            activity_configs = await self.db.get_all_activity_configs()
-            
-            for config in activity_configs:
-                guild = self.get_guild(config['guild_id'])
-                if not guild:
-                    continue
-                
-                activity_type = config['activity_type']
-                role_id = config['role_id']
-                role = guild.get_role(role_id)
-                
-                if not role:
-                    continue
-                
-                for member in guild.members:
-                    if member.bot:
-                        continue
-                    
-                    has_activity = await self._check_user_has_activity(member, activity_type)
-                    has_role = role in member.roles
-                    
-                    if has_activity and not has_role:
-                        # Add role
-                        try:
-                            await member.add_roles(role, reason=f"{activity_type} activity detected")
-                        except discord.Forbidden:
-                            pass
-                    elif not has_activity and has_role:
-                        # Remove role
-                        try:
-                            await member.remove_roles(role, reason=f"{activity_type} activity removed")
-                        except discord.Forbidden:
-                            pass
+            with self.metrics.timer('loop', 'activity_checker'):
+                await self.activity_engine.reload()
+                await self.activity_engine.reconcile()
         except Exception as e:
+            self.metrics.error('loop', 'activity_checker')
             print(f"Error in activity checker: {e}")
+    
+    @activity_checker.before_loop
+    async def before_activity_checker(self):
+        await self.wait_until_ready()
 
-    @tasks.loop(hours=24)
+    @tasks.loop(seconds=30)
+    async def cluster_stats_publisher(self):
+        """Publish this process's totals for bot-wide stats"""
+        with self.metrics.timer('loop', 'cluster_stats_publisher'):
+            self.cluster_stats.publish(self)
+    
+    @cluster_stats_publisher.before_loop
+    async def before_cluster_stats_publisher(self):
+        await self.wait_until_ready()
+    
+    @tasks.loop(minutes=5)
+    async def expiry_reloader(self):
+        """Reload expiring records so writes made by other cluster processes show up"""
+        for kind, offset in EXPIRING_KINDS:
+            if not self.expiry.tracks(kind):
+                continue
+            try:
+                with self.metrics.timer('loop', 'expiry_reloader'):
+                    await self.expiry.load(self.db, kind, offset)
+            except Exception as e:
+                self.metrics.error('loop', 'expiry_reloader')
+                print(f"Error reloading {kind} expiry records: {e}")
+    
+    @expiry_reloader.before_loop
+    async def before_expiry_reloader(self):
+        await self.wait_until_ready()
+    
+    @tasks.loop(hours=1)
     async def antinuke_cleanup(self):
-        """Cleanup disabled antinuke configurations after 7 days"""
+        """Cleanup disabled antinuke configurations after 7 days (when the expiry scheduler cannot track them)"""
         try:
-            cleaned_count = await self.db.cleanup_disabled_antinuke()
+            with self.metrics.timer('loop', 'antinuke_cleanup'):
+                cleaned_count = await self.db.cleanup_disabled_antinuke()
             if cleaned_count > 0:
                 print(f"Cleaned up antinuke data for {cleaned_count} guilds")
         except Exception as e:
+            self.metrics.error('loop', 'antinuke_cleanup')
             print(f"Error in antinuke cleanup: {e}")
     
-    async def _check_user_has_vanity(self, member, vanity_url):
-        """Check if user has vanity URL in bio or activities"""
-        import re
-        
-        # Extract the vanity code from the full URL
-        vanity_patterns = [
-            rf"discord\.gg/{re.escape(vanity_url)}",
-            rf"\.gg/{re.escape(vanity_url)}",
-            rf"https://discord\.gg/{re.escape(vanity_url)}"
-        ]
-        
-        # Check activities/custom status
-        for activity in member.activities:
-            if hasattr(activity, 'state') and activity.state:
-                for pattern in vanity_patterns:
-                    if re.search(pattern, activity.state, re.IGNORECASE):
-                        return True
-            if hasattr(activity, 'name') and activity.name:
-                for pattern in vanity_patterns:
-                    if re.search(pattern, activity.name, re.IGNORECASE):
-                        return True
-        
-        return False
-    
-    async def _check_user_has_activity(self, member, activity_type):
-        """Check if user has specific activity type"""
-        activity_map = {
-            'playing': discord.ActivityType.playing,
-            'listening': discord.ActivityType.listening,
-            'streaming': discord.ActivityType.streaming,
-            'competing': discord.ActivityType.competing
-        }
-        
-        target_type = activity_map.get(activity_type.lower())
-        if not target_type:
-            return False
-        
-        for activity in member.activities:
-            if activity.type == target_type:
-                return True
-        
-        return False
-    
     async def _log_vanity_action(self, guild, member, config, action):
         """Log vanity role actions"""
         log_channel_id = config.get('log_channel_id')
@@ -514,26 +746,8 @@ class DiscordBot(commands.Bot):
         # Check if there's a custom embed
         custom_embed_name = config.get('custom_embed')
         if custom_embed_name:
-            embed_data = await self.db.get_embed(guild.id, custom_embed_name)
-            if embed_data:
-                from utils.variables import parse_variables
-                parsed_data = await parse_variables(embed_data, member, guild, log_channel)
-                
-                embed = discord.Embed(color=0x2f3136)
-                if parsed_data.get('title'):
-                    embed.title = parsed_data['title']
-                if parsed_data.get('description'):
-                    embed.description = parsed_data['description']
-                if parsed_data.get('footer'):
-                    embed.set_footer(text=parsed_data['footer'])
-                if parsed_data.get('thumbnail'):
-                    embed.set_thumbnail(url=parsed_data['thumbnail'])
-                if parsed_data.get('author'):
-                    embed.set_author(name=parsed_data['author'])
-                
-                for field in parsed_data.get('fields', []):
-                    embed.add_field(name=field['name'], value=field['value'], inline=field.get('inline', False))
-                
+            embed = await self.embed_templates.render(guild.id, custom_embed_name, member, guild, log_channel)
+            if embed:
                 await log_channel.send(embed=embed)
                 return
         
@@ -0,0 +1,49 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.antinuke_engine import AntinukeEngine
+
+
+class FakeDatabase:
+    async def get_antinuke_settings(self, guild_id):
+        return {'enabled': guild_id == 1, 'punishment': 'kick'}
+
+    async def get_antinuke_whitelist(self, guild_id):
+        return [{'user_id': 42}]
+
+    async def get_all_antinuke_settings(self):
+        return []
+
+    async def get_automod_whitelist(self, guild_id):
+        return []
+
+
+def make_engine(db, **kwargs):
+    bot = SimpleNamespace(db=db, user=SimpleNamespace(id=0))
+    return AntinukeEngine(bot, **kwargs)
+
+
+def test_readers_are_found_by_name():
+    async def run():
+        engine = make_engine(FakeDatabase())
+        assert engine.bind_readers()
+        assert (engine._settings_reader, engine._whitelist_reader) == ('get_antinuke_settings', 'get_antinuke_whitelist')
+        config = await engine.get_config(1)
+        assert config.enabled and config.punishment == 'kick' and config.whitelist == {42}
+        assert not (await engine.get_config(2)).enabled
+    asyncio.run(run())
+
+
+def test_missing_reader_leaves_the_engine_off():
+    engine = make_engine(object())
+    assert not engine.bind_readers()
+    assert not engine.ready
+
+
+def test_punishments_expire_after_the_cooldown():
+    now = [0.0]
+    engine = make_engine(FakeDatabase(), punish_cooldown=300, clock=lambda: now[0])
+    engine._punished = {1: {10: 0.0}, 2: {20: 250.0}}
+    now[0] = 320
+    engine._prune(now[0])
+    assert engine._punished == {2: {20: 250.0}}
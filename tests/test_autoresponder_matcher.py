@@ -0,0 +1,17 @@
+from utils.autoresponder_matcher import LINEAR_THRESHOLD, AutoresponderMatcher
+
+
+def test_regex_triggers_keep_their_meaning():
+    matcher = AutoresponderMatcher([(r"^\S+$", "regex", "one word"), (r"\bHI\b", "regex", "greeting")])
+    assert matcher.match("hello") == ["one word"]
+    assert matcher.match("Hi there") == ["greeting"]
+
+
+def test_linear_and_indexed_paths_agree():
+    triggers = [(f"word{index}", mode, index) for index in range(LINEAR_THRESHOLD * 2)
+                for mode in ("exact", "contains", "startswith", "endswith")]
+    small = AutoresponderMatcher(triggers[:4] + [(r"\d+", "regex", "digits")])
+    large = AutoresponderMatcher(triggers + [(r"\d+", "regex", "digits")])
+    assert small._linear is not None and large._linear is None
+    for content in ("WORD0", "say word0 now", "word0 first", "last word0", "nothing", "42"):
+        assert small.match(content) == [payload for payload in large.match(content) if payload in (0, "digits")]
@@ -0,0 +1,35 @@
+import random
+
+from utils.command_registry import BKTree, edit_distance
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("bna", "ban") == 1
+    assert edit_distance("ca", "abc") == 2
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+
+
+def test_edit_distance_is_a_metric():
+    rng = random.Random(7)
+    words = ["".join(rng.choice("abc") for _ in range(rng.randint(0, 5))) for _ in range(60)]
+    for a in words:
+        for b in words:
+            assert edit_distance(a, b) == edit_distance(b, a)
+            for c in words[:20]:
+                assert edit_distance(a, c) <= edit_distance(a, b) + edit_distance(b, c)
+
+
+def test_bk_tree_matches_brute_force():
+    rng = random.Random(42)
+    vocabulary = sorted({"".join(rng.choice("abcd") for _ in range(rng.randint(1, 6))) for _ in range(400)})
+    tree = BKTree(vocabulary)
+    assert tree.search("cbbc", 1) == sorted((edit_distance("cbbc", word), word) for word in vocabulary if edit_distance("cbbc", word) <= 1)
+    for _ in range(300):
+        query = "".join(rng.choice("abcd") for _ in range(rng.randint(1, 6)))
+        radius = rng.randint(0, 2)
+        expected = sorted(
+            (distance, word) for word in vocabulary
+            for distance in (edit_distance(query, word),) if distance <= radius
+        )
+        assert tree.search(query, radius) == expected
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.deferred_delete import DeferredDeleter
+
+
+class FakeChannel:
+    def __init__(self, channel_id=1, error=None):
+        self.id = channel_id
+        self.error = error
+        self.deleted = []
+
+    async def delete_messages(self, messages):
+        if self.error is not None:
+            raise self.error
+        self.deleted.append([message.id for message in messages])
+
+
+def make_message(message_id, channel):
+    async def delete():
+        channel.deleted.append([message_id])
+    return SimpleNamespace(id=message_id, channel=channel, delete=delete)
+
+
+def test_rescheduling_keeps_one_slot_entry():
+    now = [0.0]
+    deleter = DeferredDeleter(tick=1, clock=lambda: now[0])
+    message = make_message(1, FakeChannel())
+    for delay in range(1, 50):
+        deleter.schedule(message, delay)
+    assert sum(len(slot) for slot in deleter._slots.values()) == 1
+    assert deleter.stats()['pending'] == 1
+
+
+def test_loop_survives_delete_errors():
+    async def run():
+        now = [0.0]
+        deleter = DeferredDeleter(tick=0.01, clock=lambda: now[0])
+        broken = FakeChannel(1, error=RuntimeError("boom"))
+        healthy = FakeChannel(2)
+        deleter.start()
+        deleter.schedule(make_message(1, broken), 0)
+        deleter.schedule(make_message(2, broken), 0)
+        now[0] = 1
+        await asyncio.sleep(0.05)
+        deleter.schedule(make_message(3, healthy), 0)
+        deleter.schedule(make_message(4, healthy), 0)
+        now[0] = 2
+        await asyncio.sleep(0.05)
+        worker = deleter._worker
+        await deleter.close()
+        return worker, healthy
+
+    worker, healthy = asyncio.run(run())
+    assert worker.cancelled()
+    assert healthy.deleted == [[3, 4]]
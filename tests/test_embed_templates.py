@@ -0,0 +1,21 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.embed_templates import EmbedTemplate
+
+
+def test_compiled_lookups_resolve_without_parsing():
+    template = EmbedTemplate({
+        'title': "Welcome to {server.name}!",
+        'description': "Hey {user.mention}, you are member #{server.member_count}. See {channel.mention}",
+        'fields': [{'name': "{server.name}", 'value': "Be nice", 'inline': True}],
+    })
+    assert template.parsed == []
+    member = SimpleNamespace(id=1, mention="<@1>")
+    guild = SimpleNamespace(id=2, name="Test", member_count=50)
+    values = asyncio.run(template.resolve(member, guild, None))
+    data = template.render(values)
+    assert data['title'] == "Welcome to Test!"
+    # No channel in this context: the raw token is kept
+    assert data['description'] == "Hey <@1>, you are member #50. See {channel.mention}"
+    assert data['fields'] == [{'name': "Test", 'value': "Be nice", 'inline': True}]
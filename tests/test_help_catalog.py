@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+
+discord = pytest.importorskip("discord")
+from discord.ext import commands
+
+from utils.command_registry import CommandRegistry
+from utils.help_catalog import HelpCatalog
+
+
+class Moderation(commands.Cog):
+    @commands.command()
+    async def mute(self, ctx):
+        """Mutes a member"""
+
+
+class Fun(commands.Cog):
+    @commands.command(aliases=["8ball"])
+    async def eightball(self, ctx):
+        """Asks the magic ball"""
+
+
+def make_catalog():
+    bot = commands.Bot(command_prefix="&", intents=discord.Intents.none(), help_command=None)
+
+    async def load():
+        await bot.add_cog(Moderation())
+        await bot.add_cog(Fun())
+    asyncio.run(load())
+    bot.command_registry = CommandRegistry(bot)
+    return HelpCatalog(bot, page_size=1)
+
+
+def test_pages_render_the_real_prefix():
+    catalog = make_catalog()
+    pages = catalog.pages("?!")
+    overview = pages[0].to_dict()
+    assert "`?!help <command>`" in overview['description']
+    assert "\x00" not in str([page.to_dict() for page in pages])
+    assert "`?!mute`" in pages[1].description
+
+
+def test_categories_keep_cog_load_order():
+    catalog = make_catalog()
+    pages = catalog.pages("&")
+    assert [page.title for page in pages[1:]] == ["Moderation", "Fun"]
+    assert pages[0].fields[0].value.splitlines() == ["🔹 Moderation (1)", "🔹 Fun (1)"]
+
+
+def test_command_pages_are_cached_per_prefix():
+    catalog = make_catalog()
+    first = catalog.command("8ball", '"q"')
+    assert first.title == 'Command: `"q"eightball`'
+    assert catalog.command("8BALL", '"q"') is first
+    assert catalog.command("missing", "&") is None
+    assert catalog.stats()['hits'] == 1
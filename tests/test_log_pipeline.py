@@ -0,0 +1,80 @@
+import asyncio
+
+import aiohttp
+import discord
+
+from utils import log_pipeline
+from utils.log_pipeline import LogPipeline, QueuedLogger
+
+
+class FakeBotLogger:
+    def __init__(self, webhooks):
+        self.webhooks = webhooks
+
+    async def log_server_join(self, guild_name):
+        await self.webhooks['server'].send(embed=discord.Embed(title=f"Joined {guild_name}"))
+
+    async def log_server_leave(self, guild_name):
+        await self.webhooks['server'].send(embed=discord.Embed(title=f"Left {guild_name}"))
+
+    async def log_error(self, title, message):
+        await self.webhooks['error'].send(embeds=[discord.Embed(title=title, description=message)])
+
+    async def log_ratelimit(self, bucket):
+        await self.webhooks['error'].send(content=f"Rate limited on {bucket}")
+
+
+def run_with_webhooks(monkeypatch, body):
+    async def run():
+        sent = []
+
+        async def send(webhook, *args, **kwargs):
+            sent.append((webhook.id, kwargs))
+
+        monkeypatch.setattr(log_pipeline, '_webhook_send', send)
+        monkeypatch.setattr(discord.Webhook, 'send', log_pipeline._batched_send)
+        async with aiohttp.ClientSession() as session:
+            webhooks = {
+                'server': discord.Webhook.partial(1, 'token', session=session),
+                'error': discord.Webhook.partial(2, 'token', session=session),
+            }
+            await body(webhooks, sent)
+    asyncio.run(run())
+
+
+def test_every_log_type_is_batched_per_webhook(monkeypatch):
+    async def body(webhooks, sent):
+        pipeline = LogPipeline(bot=None)
+        logger = QueuedLogger(FakeBotLogger(webhooks), pipeline)
+        for index in range(6):
+            await logger.log_server_join(f"guild {index}")
+            await logger.log_server_leave(f"guild {index}")
+        await logger.log_error("Command Error", "boom")
+        await logger.log_ratelimit("global")
+        await pipeline.flush()
+        # Anything besides embeds is sent as is, while its job runs
+        assert sent[0] == (2, {'content': "Rate limited on global"})
+        batches = [(webhook_id, len(kwargs['embeds'])) for webhook_id, kwargs in sent[1:]]
+        assert batches == [(1, 10), (1, 2), (2, 1)]
+        # BotLogger's own embeds are sent, in order
+        assert [embed.title for embed in sent[1][1]['embeds'][:2]] == ["Joined guild 0", "Left guild 0"]
+    run_with_webhooks(monkeypatch, body)
+
+
+def test_submit_for_a_new_webhook_during_a_send(monkeypatch):
+    async def body(webhooks, sent):
+        pipeline = LogPipeline(bot=None)
+        pipeline.submit(webhooks['server'], [discord.Embed(title="first")])
+        send = log_pipeline._webhook_send
+
+        async def send_and_submit(webhook, *args, **kwargs):
+            await send(webhook, *args, **kwargs)
+            if len(sent) == 1:
+                pipeline.submit(webhooks['error'], [discord.Embed(title="during send")])
+
+        monkeypatch.setattr(log_pipeline, '_webhook_send', send_and_submit)
+        await pipeline.flush()
+        await pipeline.flush()
+        assert [webhook_id for webhook_id, _ in sent] == [1, 2]
+        assert pipeline.depth() == 0
+    run_with_webhooks(monkeypatch, body)
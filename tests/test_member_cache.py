@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.member_cache import MemberCachePolicy
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.chunked = False
+        self.chunks = 0
+        self.members = {}
+
+    async def chunk(self, cache=True):
+        self.chunks += 1
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    def _add_member(self, member):
+        self.members[member.id] = member
+
+
+class FakeAntinuke:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.loaded = set()
+
+    async def get_config(self, guild_id):
+        self.loaded.add(guild_id)
+
+    def is_enabled(self, guild_id):
+        return guild_id in self.loaded and guild_id in self.enabled
+
+
+def make_policy(guilds, vanity=(), antinuke=()):
+    bot = SimpleNamespace(
+        guilds=guilds,
+        vanity_engine=SimpleNamespace(configs=dict.fromkeys(vanity)),
+        activity_engine=SimpleNamespace(configs={}),
+        antinuke=FakeAntinuke(set(antinuke)),
+    )
+    return MemberCachePolicy(bot, 'lazy', chunk_delay=0)
+
+
+def test_guilds_are_chunked_once_and_joins_are_cached():
+    async def run():
+        guild = FakeGuild(1)
+        policy = make_policy([guild], vanity=[1])
+        await policy.chunk_configured()
+        # A join leaves guild.chunked False, that must not trigger another chunk
+        await policy.ensure(guild)
+        assert guild.chunks == 1
+        member = SimpleNamespace(id=7, guild=guild)
+        policy.add_member(member)
+        assert guild.get_member(7) is member
+        policy.forget(1)
+        await policy.ensure(guild)
+        assert guild.chunks == 2
+    asyncio.run(run())
+
+
+def test_antinuke_guilds_are_chunked():
+    async def run():
+        enabled, plain = FakeGuild(1), FakeGuild(2)
+        policy = make_policy([enabled, plain], antinuke=[1])
+        await policy.chunk_configured()
+        assert (enabled.chunks, plain.chunks) == (1, 0)
+        policy.add_member(SimpleNamespace(id=7, guild=plain))
+        assert plain.get_member(7) is None
+    asyncio.run(run())
+
+
+def test_reconnect_forgets_chunked_guilds():
+    async def run():
+        guild = FakeGuild(1)
+        policy = make_policy([guild], vanity=[1])
+        await policy.ensure(guild)
+        assert policy.is_chunked(guild)
+        policy.reset()
+        assert not policy.is_chunked(guild)
+        await policy.chunk_configured()
+        assert guild.chunks == 2
+        policy.forget(1)
+        assert not policy.is_chunked(guild)
+    asyncio.run(run())
+
+
+def test_reset_during_chunk_does_not_mark_the_guild():
+    async def run():
+        guild = FakeGuild(1)
+        policy = make_policy([guild], vanity=[1])
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_chunk(cache=True):
+            started.set()
+            await release.wait()
+
+        guild.chunk = slow_chunk
+        waiter = asyncio.create_task(policy.ensure(guild))
+        await started.wait()
+        policy.reset()
+        release.set()
+        await waiter
+        assert not policy.is_chunked(guild)
+    asyncio.run(run())
@@ -0,0 +1,54 @@
+from utils.ratelimit import RateTracker, SlidingWindowCounter
+
+
+def test_hits_slide_out_of_the_window():
+    counter = SlidingWindowCounter(10, buckets=10)
+    assert counter.hit('a', now=0.5) == 1
+    assert counter.hit('a', now=3.5) == 2
+    assert counter.hit('a', now=9.5) == 3
+    assert counter.count('a', now=10.5) == 2
+    assert counter.hit('a', now=13.5) == 2
+    assert counter.count('a', now=30) == 0
+    assert counter.hit('a', now=30) == 1
+
+
+def test_idle_keys_expire():
+    counter = SlidingWindowCounter(10, buckets=10)
+    counter.hit('idle', now=0)
+    counter.hit('active', now=0)
+    for now in range(1, 12):
+        counter.hit('active', now=now)
+    assert counter.count('idle', now=11) == 0
+    assert 'idle' not in counter._entries
+    assert counter.expired == 1
+    assert len(counter) == 1
+
+
+def test_expiry_after_a_long_gap():
+    counter = SlidingWindowCounter(10, buckets=10)
+    for key in range(5):
+        counter.hit(key, now=key)
+    counter.hit('late', now=1000)
+    assert len(counter) == 1
+    assert counter.expired == 5
+
+
+def test_key_ceiling_evicts_the_key_closest_to_expiring():
+    counter = SlidingWindowCounter(10, buckets=10, max_keys=3)
+    counter.hit('first', now=0)
+    counter.hit('second', now=1)
+    counter.hit('third', now=2)
+    counter.hit('fourth', now=3)
+    assert len(counter) == 3
+    assert counter.evicted == 1
+    assert counter.count('first', now=3) == 0
+    assert counter.count('second', now=3) == 1
+
+
+def test_rate_tracker_limit_and_reset():
+    tracker = RateTracker()
+    assert not any(tracker.hit(1, 2, limit=3, timeframe=5, now=now / 10) for now in range(3))
+    assert tracker.hit(1, 2, limit=3, timeframe=5, now=0.3)
+    tracker.reset(1, 2)
+    assert not tracker.hit(1, 2, limit=3, timeframe=5, now=0.4)
+    assert tracker.stats()[5]['keys'] == 1
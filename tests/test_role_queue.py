@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.role_queue import RoleMutationQueue
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+    def is_default(self):
+        return False
+
+
+class FakeGuild:
+    def __init__(self, guild_id=1):
+        self.id = guild_id
+        self.members = {}
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+
+class FakeMember:
+    def __init__(self, guild, member_id, role_ids=(), gate=None):
+        self.guild = guild
+        self.id = member_id
+        self.roles = [FakeRole(role_id) for role_id in role_ids]
+        self.gate = gate
+        self.edits = []
+        guild.members[member_id] = self
+
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+
+    async def edit(self, roles, reason=None):
+        self.edits.append({role.id for role in roles})
+        if self.gate is not None:
+            await self.gate.wait()
+
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_opposite_requests_cancel_out():
+    async def scenario():
+        queue = RoleMutationQueue()
+        member = FakeMember(FakeGuild(), 10)
+        role = FakeRole(5)
+        assert queue.set_role(member, role, True)
+        assert not queue.set_role(member, role, False)
+        queue.start()
+        await settle()
+        await queue.stop()
+        return queue, member
+
+    queue, member = asyncio.run(scenario())
+    assert member.edits == []
+    assert queue.stats()['cancelled'] == 1
+    assert queue.stats()['depth'] == 0
+
+
+def test_requests_coalesce_into_one_edit():
+    async def scenario():
+        queue = RoleMutationQueue()
+        member = FakeMember(FakeGuild(), 10, role_ids=(1,))
+        queue.set_role(member, FakeRole(2), True)
+        queue.set_role(member, FakeRole(3), True)
+        queue.set_role(member, FakeRole(1), False)
+        queue.start()
+        await settle()
+        await queue.stop()
+        return queue, member
+
+    queue, member = asyncio.run(scenario())
+    assert member.edits == [{2, 3}]
+    assert queue.stats()['merged'] == 2
+    assert queue.stats()['applied'] == 1
+
+
+def test_chained_edit_starts_from_previous_edit():
+    async def scenario():
+        queue = RoleMutationQueue()
+        gate = asyncio.Event()
+        member = FakeMember(FakeGuild(), 10, gate=gate)
+        queue.start()
+        queue.set_role(member, FakeRole(1), True)
+        await settle()
+        # The first edit is in flight; the gateway has not echoed role 1 yet
+        assert not queue.set_role(member, FakeRole(1), True)
+        queue.set_role(member, FakeRole(2), True)
+        await settle()
+        assert len(member.edits) == 1
+        gate.set()
+        await settle()
+        await queue.stop()
+        return member
+
+    member = asyncio.run(scenario())
+    assert member.edits == [{1}, {1, 2}]
+
+
+def test_chained_edit_does_not_hold_a_slot():
+    async def scenario():
+        queue = RoleMutationQueue(concurrency=2)
+        guild = FakeGuild()
+        gate = asyncio.Event()
+        busy = FakeMember(guild, 10, gate=gate)
+        other = FakeMember(guild, 20)
+        queue.start()
+        queue.set_role(busy, FakeRole(1), True)
+        await settle()
+        queue.set_role(busy, FakeRole(2), True)
+        await settle()
+        # One slot is used by the in-flight edit, the chained edit waits without one
+        queue.set_role(other, FakeRole(3), True)
+        await settle()
+        other_edits = list(other.edits)
+        gate.set()
+        await settle()
+        await queue.stop()
+        return other_edits, busy
+
+    other_edits, busy = asyncio.run(scenario())
+    assert other_edits == [{3}]
+    assert busy.edits == [{1}, {1, 2}]
@@ -0,0 +1,77 @@
+import asyncio
+
+from utils.cache import GuildSettingsCache
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.prefixes = {1: "!"}
+        self.blacklist = {}
+
+    async def get_guild_prefix(self, guild_id):
+        return self.prefixes.get(guild_id)
+
+    async def set_guild_prefix(self, guild_id, prefix):
+        self.prefixes[guild_id] = prefix
+
+    async def set_no_prefix_user(self, user_id):
+        pass
+
+    async def is_blacklisted_user(self, user_id):
+        return self.blacklist.get(user_id)
+
+    async def blacklist_user(self, user_id, reason):
+        self.blacklist[user_id] = reason
+
+
+def test_bound_writes_invalidate_their_section():
+    async def run():
+        db = FakeDatabase()
+        cache = GuildSettingsCache(db)
+        bound = cache.bind_write_methods()
+        assert sorted(bound) == ["blacklist_user", "set_guild_prefix"]
+        assert await cache.get_guild_prefix(1) == "!"
+        await db.set_guild_prefix(1, "?")
+        assert await cache.get_guild_prefix(1) == "?"
+        assert not await cache.is_blacklisted_user(5)
+        await db.blacklist_user(5, "spam")
+        assert await cache.is_blacklisted_user(5) == "spam"
+    asyncio.run(run())
+
+
+def test_entries_expire_after_ttl():
+    async def run():
+        now = [0.0]
+        db = FakeDatabase()
+        cache = GuildSettingsCache(db, ttl=60, clock=lambda: now[0])
+        assert await cache.get_guild_prefix(1) == "!"
+        assert not await cache.is_blacklisted_user(5)
+        # Written by another process, so nothing invalidates the cache
+        db.prefixes[1] = "?"
+        db.blacklist[5] = "spam"
+        assert await cache.get_guild_prefix(1) == "!"
+        now[0] = 61
+        assert await cache.get_guild_prefix(1) == "?"
+        assert await cache.is_blacklisted_user(5) == "spam"
+    asyncio.run(run())
+
+
+def test_read_racing_a_write_is_not_cached():
+    class SlowDatabase(FakeDatabase):
+        async def get_guild_prefix(self, guild_id):
+            prefix = self.prefixes.get(guild_id)
+            # The write lands while this read is in flight
+            await self.set_guild_prefix(guild_id, "?")
+            return prefix
+
+    async def run():
+        db = SlowDatabase()
+        cache = GuildSettingsCache(db)
+        cache.bind_write_methods()
+        stale = await cache.get_guild_prefix(1)
+        db.get_guild_prefix = FakeDatabase.get_guild_prefix.__get__(db)
+        return stale, await cache.get_guild_prefix(1)
+
+    stale, fresh = asyncio.run(run())
+    assert stale == "!"
+    assert fresh == "?"
@@ -0,0 +1,16 @@
+import asyncio
+
+from utils.sqlite_pool import SQLitePool
+
+
+def test_pool_without_readers_reads_on_the_writer(tmp_path):
+    async def run():
+        pool = SQLitePool(str(tmp_path / "bot.db"), readers=0)
+        await pool.open()
+        await pool.execute("CREATE TABLE t (x INTEGER)")
+        await pool.execute("INSERT INTO t VALUES (1)")
+        assert (await pool.fetchone("SELECT x FROM t"))['x'] == 1
+        assert (await pool.fetchone("PRAGMA journal_mode"))[0] == 'wal'
+        assert len(pool._connections) == 1
+        await pool.close()
+    asyncio.run(run())
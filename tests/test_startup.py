@@ -0,0 +1,44 @@
+import asyncio
+
+from utils.startup import load_extensions
+
+
+class FakeDatabase:
+    async def get_settings(self):
+        await asyncio.sleep(0.05)
+
+
+class FakeBot:
+    def __init__(self):
+        self.db = FakeDatabase()
+        self.loaded = []
+        self.running = 0
+        self.peak = 0
+
+    async def load_extension(self, name):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.db.get_settings()
+            if name.endswith('broken'):
+                raise RuntimeError("setup failed")
+            self.loaded.append(name)
+        finally:
+            self.running -= 1
+
+
+def test_packages_load_concurrently_in_order_within_a_package():
+    async def run():
+        bot = FakeBot()
+        names = ['cogs.a.main', 'cogs.a.extra', 'cogs.b.main', 'cogs.c.broken']
+        storage = asyncio.create_task(asyncio.sleep(0))
+        timings = await load_extensions(bot, names, storage)
+        assert bot.peak == 3
+        assert bot.loaded.index('cogs.a.main') < bot.loaded.index('cogs.a.extra')
+        assert bot.extension_order == names
+        assert [timing.name for timing in timings if timing.error] == ['cogs.c.broken']
+        # Database time is attributed to the extension that spent it, not to everything loading at once
+        assert all(0.04 < timing.db_time < 0.09 for timing in timings)
+        # The timer is removed afterwards
+        assert 'get_settings' not in vars(bot.db)
+    asyncio.run(run())
@@ -0,0 +1,13 @@
+from utils.text_stats import analyze
+
+
+def test_counts_characters_outside_the_bmp():
+    stats = analyze("𝐀𝐁𝐂 test")
+    assert (stats.letters, stats.uppercase) == (7, 3)
+
+
+def test_marks_and_runs():
+    stats = analyze("hé́llooo!!")
+    assert (stats.length, stats.letters, stats.uppercase, stats.marks, stats.longest_run) == (11, 7, 0, 2, 3)
+    assert analyze("a") == (1, 1, 0, 0, 1)
+    assert analyze("") == (0, 0, 0, 0, 0)
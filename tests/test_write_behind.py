@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from utils.command_usage import CommandUsage
+from utils.sqlite_pool import SQLitePool
+from utils.write_behind import WriteBehindQueue
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+        self.pending = []
+
+    async def executemany(self, sql, params_seq):
+        for params in params_seq:
+            if self.pool.fails(sql, params):
+                raise RuntimeError(f"bad {sql}")
+            self.pending.append((sql, params))
+
+
+class FakePool:
+    def __init__(self, fails=lambda sql, params: False):
+        self.fails = fails
+        self.committed = []
+        self.transactions = 0
+
+    async def execute(self, sql, params=()):
+        pass
+
+    @asynccontextmanager
+    async def transaction(self):
+        connection = FakeConnection(self)
+        yield connection
+        self.transactions += 1
+        self.committed += connection.pending
+
+
+def make_queue(pool):
+    return WriteBehindQueue(pool, durability='normal', interval=3600)
+
+
+def test_writes_commit_in_queued_order():
+    async def run():
+        pool = FakePool()
+        queue = make_queue(pool)
+        await queue.increment('xp:1', "ADD", (1,), 5)
+        await queue.upsert('xp:1', "RESET", (1, 0))
+        await queue.append("INSERT", ('a',))
+        await queue.append("DELETE", ('a',))
+        await queue.append("INSERT", ('b',))
+        await queue.flush()
+        assert pool.committed == [("ADD", (5, 1)), ("RESET", (1, 0)), ("INSERT", ('a',)), ("DELETE", ('a',)), ("INSERT", ('b',))]
+        assert pool.transactions == 1
+    asyncio.run(run())
+
+
+def test_only_independent_writes_are_merged():
+    async def run():
+        pool = FakePool()
+        queue = make_queue(pool)
+        await queue.increment('xp:1', "ADD", (1,))
+        await queue.increment('xp:2', "ADD", (2,))
+        await queue.increment('xp:1', "ADD", (1,), 2)
+        await queue.upsert('name:1', "SET", (1, 'a'))
+        await queue.upsert('name:1', "SET", (1, 'b'))
+        await queue.append("DELETE", (1,))
+        # An append may touch the row, so this one is not merged into the one before it
+        await queue.increment('xp:1', "ADD", (1,))
+        await queue.flush()
+        assert pool.committed == [("ADD", (3, 1)), ("ADD", (1, 2)), ("SET", (1, 'b')), ("DELETE", (1,)), ("ADD", (1, 1))]
+        assert queue.stats()['merged'] == 2
+    asyncio.run(run())
+
+
+def test_failed_write_holds_back_its_key_and_is_dropped():
+    async def run():
+        pool = FakePool(fails=lambda sql, params: sql == "BAD")
+        queue = make_queue(pool)
+        await queue.upsert('row:1', "BAD", (1,))
+        await queue.upsert('row:1', "SET", (1, 'x'))
+        await queue.upsert('row:2', "SET", (2, 'y'))
+        await queue.flush()
+        # The row:1 write after the failure waits for it, row:2 goes through
+        assert pool.committed == [("SET", (2, 'y'))]
+        assert queue.pending() == 2
+        await queue.flush()
+        await queue.flush()
+        assert queue.stats()['dropped'] == 1
+        assert pool.committed == [("SET", (2, 'y')), ("SET", (1, 'x'))]
+        assert queue.pending() == 0
+    asyncio.run(run())
+
+
+def test_failed_append_holds_back_everything_after_it():
+    async def run():
+        pool = FakePool(fails=lambda sql, params: params == ('bad',))
+        queue = make_queue(pool)
+        await queue.upsert('row:1', "SET", (1,))
+        await queue.append("INSERT", ('bad',))
+        await queue.upsert('row:2', "SET", (2,))
+        await queue.flush()
+        assert pool.committed == [("SET", (1,))]
+        assert queue.pending() == 2
+    asyncio.run(run())
+
+
+def test_command_usage_counts_through_the_queue(tmp_path):
+    async def run():
+        pool = SQLitePool(str(tmp_path / "bot.db"), readers=1)
+        await pool.open()
+        queue = WriteBehindQueue(pool, interval=3600)
+        await queue.start()
+        usage = CommandUsage(pool, queue)
+        await usage.create_table()
+        guild = SimpleNamespace(id=1)
+        for name in ("ban", "ban", "help", "ban"):
+            await usage.record(SimpleNamespace(command=SimpleNamespace(qualified_name=name), guild=guild))
+        await usage.record(SimpleNamespace(command=SimpleNamespace(qualified_name="help"), guild=None))
+        assert await usage.top() == [("ban", 3), ("help", 2)]
+        assert await usage.top(guild_id=1) == [("ban", 3), ("help", 1)]
+        assert queue.stats()['committed'] == 3
+        await queue.close()
+        await pool.close()
+    asyncio.run(run())
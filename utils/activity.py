@@ -0,0 +1,119 @@
+import asyncio
+import discord
+from utils.cache import bind_writes
+
+ACTIVITY_TYPES = {
+    'playing': discord.ActivityType.playing,
+    'listening': discord.ActivityType.listening,
+    'streaming': discord.ActivityType.streaming,
+    'competing': discord.ActivityType.competing
+}
+
+
+class ActivityRoleEngine:
+    """Activity role assignment from presence deltas against an index of member activity state"""
+
+    def __init__(self, bot, sweep_batch_size=250, sweep_batch_delay=2.0):
+        self.bot = bot
+        self.sweep_batch_size = sweep_batch_size
+        self.sweep_batch_delay = sweep_batch_delay
+        # guild_id -> {ActivityType: [config, ...]}
+        self.configs = {}
+        # (guild_id, member_id) -> frozenset of configured ActivityTypes the member has
+        self.index = {}
+        self.flips = 0
+
+    async def reload(self):
+        """Reload activity configs from the database"""
+        configs = {}
+        for config in await self.bot.db.get_all_activity_configs():
+            if not self.bot.owns_guild(config['guild_id']):
+                continue
+            target_type = ACTIVITY_TYPES.get(config['activity_type'].lower())
+            if target_type is None:
+                continue
+            configs.setdefault(config['guild_id'], {}).setdefault(target_type, []).append(config)
+
+        # Index entries of guilds that lost their config are dead weight
+        if configs.keys() != self.configs.keys():
+            self.index = {key: value for key, value in self.index.items() if key[0] in configs}
+        self.configs = configs
+
+    def bind_write_methods(self):
+        """Reload configs whenever an activity config is written"""
+        return bind_writes(self.bot.db, "activity role configs", self._on_config_write, 'activity')
+
+    async def _on_config_write(self, guild_id=None, *args, **kwargs):
+        await self.reload()
+        # A newly configured guild needs its members cached to see presences
+        guild = self.bot.get_guild(guild_id) if guild_id in self.configs else None
+        if guild and not self.bot.member_cache.is_chunked(guild):
+            asyncio.create_task(self.bot.member_cache.ensure(guild))
+
+    @staticmethod
+    def _configured_types(member, guild_configs):
+        """Get the configured activity types a member currently has"""
+        return frozenset(
+            activity.type for activity in member.activities
+            if activity.type in guild_configs
+        )
+
+    async def on_presence_update(self, before, after):
+        """Apply role changes for the activity types that flipped for a member"""
+        if not after.guild:
+            return
+        guild_configs = self.configs.get(after.guild.id)
+        if not guild_configs or after.bot:
+            return
+
+        key = (after.guild.id, after.id)
+        previous = self.index.get(key)
+        if previous is None:
+            previous = self._configured_types(before, guild_configs)
+        current = self._configured_types(after, guild_configs)
+        if current:
+            self.index[key] = current
+        else:
+            self.index.pop(key, None)
+
+        if current != previous:
+            self._apply(after, guild_configs, current ^ previous, current)
+
+    def forget(self, guild_id, member_id):
+        """Drop a member from the index (e.g. after they leave)"""
+        self.index.pop((guild_id, member_id), None)
+
+    async def reconcile(self):
+        """Backstop sweep that rebuilds the index and fixes drifted roles"""
+        for guild_id, guild_configs in list(self.configs.items()):
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+            await self.bot.member_cache.ensure(guild)
+            checked = 0
+            for member in list(guild.members):
+                if member.bot:
+                    continue
+                current = self._configured_types(member, guild_configs)
+                key = (guild_id, member.id)
+                if current:
+                    self.index[key] = current
+                else:
+                    self.index.pop(key, None)
+                self._apply(member, guild_configs, guild_configs.keys(), current)
+                checked += 1
+                if checked % self.sweep_batch_size == 0:
+                    await asyncio.sleep(self.sweep_batch_delay)
+
+    def _apply(self, member, guild_configs, changed_types, current):
+        """Queue role changes for the roles tied to changed activity types"""
+        guild = member.guild
+        for activity_type in changed_types:
+            has_activity = activity_type in current
+            for config in guild_configs.get(activity_type, ()):
+                role = guild.get_role(config['role_id'])
+                if not role:
+                    continue
+                reason = f"{config['activity_type']} activity {'detected' if has_activity else 'removed'}"
+                if self.bot.role_queue.set_role(member, role, has_activity, reason=reason):
+                    self.flips += 1
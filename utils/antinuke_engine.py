@@ -0,0 +1,317 @@
+import asyncio
+import datetime
+import inspect
+import time
+from collections import OrderedDict, deque
+import discord
+from utils.cache import bind_writes
+
+# Destructive actions watched by antinuke and the audit log action naming their executor
+AUDIT_ACTIONS = {
+    'channel_delete': discord.AuditLogAction.channel_delete,
+    'channel_create': discord.AuditLogAction.channel_create,
+    'role_delete': discord.AuditLogAction.role_delete,
+    'role_create': discord.AuditLogAction.role_create,
+    'ban': discord.AuditLogAction.ban,
+    'kick': discord.AuditLogAction.kick,
+    'webhook_create': discord.AuditLogAction.webhook_create,
+    'bot_add': discord.AuditLogAction.bot_add,
+}
+
+# Allowed actions per executor as (count, seconds) before a punishment fires
+DEFAULT_LIMITS = {
+    'channel_delete': (3, 10),
+    'channel_create': (5, 10),
+    'role_delete': (3, 10),
+    'role_create': (5, 10),
+    'ban': (3, 10),
+    'kick': (3, 10),
+    'webhook_create': (3, 10),
+    'bot_add': (1, 60),
+}
+
+
+def find_reader(db, keyword, exclude=()):
+    """Get the name of db's get_* coroutine mentioning keyword, preferring antinuke specific and shorter names"""
+    names = [
+        name for name in dir(db)
+        if name.startswith('get_') and keyword in name and not any(word in name for word in exclude)
+        and inspect.iscoroutinefunction(getattr(db, name, None))
+    ]
+    return min(names, key=lambda name: ('antinuke' not in name, len(name))) if names else None
+
+
+class TokenBucket:
+    """Token bucket allowing `capacity` actions that refill over `per` seconds"""
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity, per, now):
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def take(self, now):
+        """Spend one token; returns False once the bucket is empty"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class AntinukeConfig:
+    """Antinuke settings of one guild"""
+    __slots__ = ('enabled', 'punishment', 'whitelist', 'limits')
+
+    def __init__(self, enabled=False, punishment='ban', whitelist=(), limits=None):
+        self.enabled = enabled
+        self.punishment = punishment
+        self.whitelist = frozenset(whitelist)
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+
+
+class _AuditWindow:
+    """Recent audit log entries of one guild and the fetch that is filling them"""
+    __slots__ = ('entries', 'fetched_at', 'fetching')
+
+    def __init__(self):
+        self.entries = {}
+        self.fetched_at = 0.0
+        self.fetching = None
+
+
+class AntinukeEngine:
+    """Antinuke burst detection.
+
+    Destructive events are resolved to their executor through one audit log
+    fetch per guild per window, shared by every event waiting on it. Each
+    executor gets a token bucket per action, and crossing the limit punishes
+    them at once.
+    """
+
+    def __init__(self, bot, window=0.5, entry_ttl=30.0, punish_cooldown=300.0, max_guilds=5000, max_buckets=50000, clock=time.monotonic):
+        self.bot = bot
+        self.window = window
+        self.entry_ttl = entry_ttl
+        self.punish_cooldown = punish_cooldown
+        self.max_guilds = max_guilds
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self._configs = OrderedDict()
+        self._windows = {}
+        self._buckets = {}
+        self._punished = {}
+        self._pruned_at = clock()
+        self._settings_reader = None
+        self._whitelist_reader = None
+        self.latencies = deque(maxlen=500)
+        self.events = 0
+        self.fetches = 0
+        self.lookups = 0
+        self.unresolved = 0
+        self.punishments = 0
+        self.failed = 0
+
+    async def get_config(self, guild_id):
+        """Get a guild's antinuke settings (cached until they are written)"""
+        config = self._configs.get(guild_id)
+        if config is None:
+            config = await self._load_config(guild_id)
+            self._configs[guild_id] = config
+            if len(self._configs) > self.max_guilds:
+                self._configs.popitem(last=False)
+        else:
+            self._configs.move_to_end(guild_id)
+        return config
+
+    @property
+    def ready(self):
+        """Check if the database readers were found, so the engine can replace the cog's detection"""
+        return self._settings_reader is not None
+
+    def bind_readers(self):
+        """Find the Database methods returning a guild's antinuke settings and whitelist; warns when missing"""
+        db = self.bot.db
+        self._settings_reader = find_reader(db, 'antinuke', ('whitelist', 'all', 'disabled', 'log'))
+        self._whitelist_reader = find_reader(db, 'whitelist', ('all',))
+        if self._settings_reader is None:
+            print("⚠️ No database reader found for antinuke settings; the antinuke cog keeps its own detection")
+        elif self._whitelist_reader is None:
+            print("⚠️ No database reader found for the antinuke whitelist; whitelisted users are not exempt")
+        return self.ready
+
+    async def _load_config(self, guild_id):
+        if self._settings_reader is None:
+            return AntinukeConfig()
+        db = self.bot.db
+        settings = await getattr(db, self._settings_reader)(guild_id)
+        settings = dict(settings) if settings else None
+        if not settings or not settings.get('enabled'):
+            return AntinukeConfig()
+
+        whitelist = ()
+        if self._whitelist_reader is not None:
+            rows = await getattr(db, self._whitelist_reader)(guild_id) or ()
+            whitelist = [row['user_id'] if not isinstance(row, int) else row for row in rows]
+        return AntinukeConfig(True, settings.get('punishment') or 'ban', whitelist)
+
+    def is_enabled(self, guild_id):
+        """Check if a guild's cached settings have antinuke enabled (False until they are loaded)"""
+        config = self._configs.get(guild_id)
+        return config is not None and config.enabled
+
+    def invalidate(self, guild_id):
+        """Drop cached settings and executor state of a guild"""
+        self._configs.pop(guild_id, None)
+        self._windows.pop(guild_id, None)
+        self._punished.pop(guild_id, None)
+        for key in [key for key in self._buckets if key[0] == guild_id]:
+            del self._buckets[key]
+
+    def bind_write_methods(self):
+        """Invalidate a guild's settings whenever its antinuke settings are written"""
+        def callback(guild_id=None, *args, **kwargs):
+            if guild_id is None:
+                self._configs.clear()
+            else:
+                self._configs.pop(guild_id, None)
+
+        return bind_writes(self.bot.db, "antinuke settings", callback, 'antinuke')
+
+    async def record(self, guild, action, target_id):
+        """Handle one destructive event; returns the executor id if they were punished"""
+        detected = self.clock()
+        self.events += 1
+        config = await self.get_config(guild.id)
+        if not config.enabled:
+            return None
+        member_cache = self.bot.member_cache
+        if not member_cache.is_chunked(guild):
+            asyncio.create_task(member_cache.ensure(guild))
+
+        executor_id = await self.executor(guild, action, target_id)
+        if executor_id is None:
+            self.unresolved += 1
+            return None
+        if executor_id in (guild.owner_id, self.bot.user.id) or executor_id in config.whitelist:
+            return None
+
+        limit = config.limits.get(action)
+        if not limit:
+            return None
+        now = self.clock()
+        if now - self._pruned_at >= self.punish_cooldown:
+            self._prune(now)
+        key = (guild.id, executor_id, action)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune(now)
+            bucket = self._buckets[key] = TokenBucket(limit[0], limit[1], now)
+        if bucket.take(now):
+            return None
+
+        # Only the first crossing punishes; later events of the same burst are ignored
+        punished = self._punished.setdefault(guild.id, {})
+        punished_at = punished.get(executor_id)
+        if punished_at is not None and now - punished_at < self.punish_cooldown:
+            return None
+        punished[executor_id] = now
+        await self.punish(guild, executor_id, config.punishment, action)
+        self.latencies.append(self.clock() - detected)
+        return executor_id
+
+    async def executor(self, guild, action, target_id):
+        """Find who performed an action, sharing one audit log fetch across the burst"""
+        window = self._windows.get(guild.id)
+        if window is None:
+            window = self._windows[guild.id] = _AuditWindow()
+
+        self.lookups += 1
+        key = (AUDIT_ACTIONS[action], target_id)
+        for attempt in range(2):
+            entry = window.entries.get(key)
+            if entry is not None:
+                return entry
+            if window.fetching is None:
+                window.fetching = asyncio.create_task(self._fetch(guild, window))
+            await asyncio.shield(window.fetching)
+            entry = window.entries.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    async def _fetch(self, guild, window):
+        """Wait out the window so the rest of the burst lands, then read the audit log once"""
+        try:
+            await asyncio.sleep(self.window)
+            self.fetches += 1
+            now = self.clock()
+            after = discord.utils.utcnow() - datetime.timedelta(seconds=self.entry_ttl)
+            entries = {}
+            try:
+                # Newest first: in a burst of more than 100 entries the latest actions matter most
+                async for entry in guild.audit_logs(limit=100, after=after, oldest_first=False):
+                    target = getattr(entry.target, 'id', None)
+                    if entry.user_id and target is not None:
+                        entries.setdefault((entry.action, target), entry.user_id)
+            except discord.HTTPException as e:
+                print(f"Error fetching audit log for {guild.id}: {e}")
+            window.entries = entries
+            window.fetched_at = now
+        finally:
+            window.fetching = None
+
+    async def punish(self, guild, executor_id, punishment, action):
+        """Apply a guild's punishment to an executor"""
+        reason = f"Antinuke: {action.replace('_', ' ')} limit exceeded"
+        try:
+            if punishment == 'kick':
+                await guild.kick(discord.Object(id=executor_id), reason=reason)
+            elif punishment in ('strip', 'quarantine'):
+                member = guild.get_member(executor_id) or await guild.fetch_member(executor_id)
+                if member:
+                    await member.edit(roles=[role for role in member.roles if role.is_default() or role.managed], reason=reason)
+            else:
+                await guild.ban(discord.Object(id=executor_id), reason=reason)
+            self.punishments += 1
+        except discord.HTTPException as e:
+            self.failed += 1
+            print(f"Error punishing {executor_id} in {guild.id}: {e}")
+
+    def _prune(self, now):
+        """Drop buckets that have refilled completely and punishments past their cooldown"""
+        self._pruned_at = now
+        for key, bucket in list(self._buckets.items()):
+            if bucket.tokens + (now - bucket.updated) * bucket.rate >= bucket.capacity:
+                del self._buckets[key]
+        for guild_id, punished in list(self._punished.items()):
+            for executor_id, punished_at in list(punished.items()):
+                if now - punished_at >= self.punish_cooldown:
+                    del punished[executor_id]
+            if not punished:
+                del self._punished[guild_id]
+
+    def forget(self, guild_id, executor_id):
+        """Allow an executor to be punished again (called when they are unbanned or rejoin)"""
+        punished = self._punished.get(guild_id)
+        if not punished or punished.pop(executor_id, None) is None:
+            return
+        for key in [key for key in self._buckets if key[0] == guild_id and key[1] == executor_id]:
+            del self._buckets[key]
+
+    def stats(self):
+        """Get event, fetch and detection-to-punishment latency counters"""
+        latencies = sorted(self.latencies)
+        return {
+            'events': self.events,
+            'audit_fetches': self.fetches,
+            'executor_lookups': self.lookups,
+            'unresolved': self.unresolved,
+            'punishments': self.punishments,
+            'failed': self.failed,
+            'latency_p50': latencies[len(latencies) // 2] if latencies else None,
+            'latency_max': latencies[-1] if latencies else None,
+        }
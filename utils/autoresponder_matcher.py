@@ -0,0 +1,233 @@
+import re
+from collections import OrderedDict, deque
+from utils.cache import bind_writes
+
+# Below this many contains triggers plain substring checks are faster than the automaton
+AUTOMATON_THRESHOLD = 24
+# Below this many plain triggers checking each one in turn beats the indexes
+LINEAR_THRESHOLD = 16
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton reporting which patterns occur anywhere in a text"""
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for index, pattern in enumerate(patterns):
+            self._insert(pattern, index)
+        self._build()
+
+    def _insert(self, pattern, index):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = next_node
+        self._out[node] = self._out[node] + (index,)
+
+    def _build(self):
+        """Compute failure links breadth first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text):
+        """Get the indexes of every pattern found in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        found = set()
+        node = 0
+        for char in text:
+            if node:
+                while node and char not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(char, 0) if node else root.get(char, 0)
+            else:
+                # Most characters of a message leave the automaton at the root
+                node = root.get(char, 0)
+            if node and out[node]:
+                found.update(out[node])
+        return found
+
+
+class _PrefixIndex:
+    """Trie answering which patterns are a prefix of a text"""
+
+    def __init__(self, patterns):
+        self._root = {}
+        for index, pattern in enumerate(patterns):
+            node = self._root
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(index)
+
+    def search(self, text):
+        found = []
+        node = self._root
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                found.extend(node[None])
+        return found
+
+
+class AutoresponderMatcher:
+    """Compiled autoresponder triggers of one guild.
+
+    entries are (trigger, match_mode, payload) tuples; match() returns the
+    payloads whose trigger matches, in entry order. Matching is case-insensitive.
+    Guilds with only a few plain triggers check them one by one, since the
+    indexes only pay off past LINEAR_THRESHOLD triggers.
+    """
+
+    def __init__(self, entries):
+        self.payloads = []
+        self._exact = {}
+        plain = []
+        contains, starts, ends = [], [], []
+        contains_ids, starts_ids, ends_ids = [], [], []
+        self._regexes = []
+
+        for position, (trigger, mode, payload) in enumerate(entries):
+            self.payloads.append(payload)
+            mode = (mode or 'exact').lower()
+            if not trigger:
+                continue
+            if mode == 'regex':
+                # Lowercasing a pattern changes its meaning (\S becomes \s), IGNORECASE handles case
+                try:
+                    self._regexes.append((re.compile(trigger, re.IGNORECASE), position))
+                except re.error:
+                    pass
+            elif mode in ('exact', 'contains', 'startswith', 'endswith'):
+                plain.append((trigger.lower(), mode, position))
+
+        self._linear = tuple(plain) if len(plain) < LINEAR_THRESHOLD else None
+        for trigger, mode, position in (plain if self._linear is None else ()):
+            if mode == 'exact':
+                self._exact.setdefault(trigger, []).append(position)
+            elif mode == 'contains':
+                contains.append(trigger)
+                contains_ids.append(position)
+            elif mode == 'startswith':
+                starts.append(trigger)
+                starts_ids.append(position)
+            else:
+                ends.append(trigger[::-1])
+                ends_ids.append(position)
+
+        # A handful of substring checks in C beats walking the automaton in Python
+        if len(contains) > AUTOMATON_THRESHOLD:
+            self._contains = AhoCorasick(contains)
+            self._contains_few = ()
+        else:
+            self._contains = None
+            self._contains_few = tuple(zip(contains, contains_ids))
+        self._contains_ids = contains_ids
+        self._starts = _PrefixIndex(starts) if starts else None
+        self._starts_ids = starts_ids
+        self._ends = _PrefixIndex(ends) if ends else None
+        self._ends_ids = ends_ids
+
+    def match(self, content):
+        """Get the payloads of every trigger matching a message"""
+        text = content.lower()
+        if self._linear is not None:
+            positions = self._match_linear(text)
+            if not self._regexes:
+                # Already in entry order
+                return [self.payloads[position] for position in positions]
+            positions = set(positions)
+        else:
+            positions = self._match_indexed(text)
+        for regex, position in self._regexes:
+            if regex.search(content):
+                positions.add(position)
+        return [self.payloads[position] for position in sorted(positions)]
+
+    def _match_linear(self, text):
+        stripped = text.strip()
+        positions = []
+        for trigger, mode, position in self._linear:
+            if mode == 'contains':
+                found = trigger in text
+            elif mode == 'exact':
+                found = stripped == trigger
+            elif mode == 'startswith':
+                found = text.startswith(trigger)
+            else:
+                found = text.endswith(trigger)
+            if found:
+                positions.append(position)
+        return positions
+
+    def _match_indexed(self, text):
+        positions = set(self._exact.get(text.strip(), ()))
+        if self._contains:
+            positions.update(self._contains_ids[index] for index in self._contains.search(text))
+        for trigger, position in self._contains_few:
+            if trigger in text:
+                positions.add(position)
+        if self._starts:
+            positions.update(self._starts_ids[index] for index in self._starts.search(text))
+        if self._ends:
+            positions.update(self._ends_ids[index] for index in self._ends.search(text[::-1]))
+        return positions
+
+
+class AutoresponderCache:
+    """Per-guild compiled autoresponder matchers, built on first use after a change"""
+
+    def __init__(self, db=None, max_guilds=5000):
+        self.db = db
+        self.max_guilds = max_guilds
+        self._matchers = OrderedDict()
+        self.builds = 0
+
+    def get(self, guild_id):
+        """Get the compiled matcher of a guild (None if it needs building)"""
+        matcher = self._matchers.get(guild_id)
+        if matcher is not None:
+            self._matchers.move_to_end(guild_id)
+        return matcher
+
+    def build(self, guild_id, entries):
+        """Compile and cache a guild's (trigger, match_mode, payload) entries"""
+        matcher = AutoresponderMatcher(entries)
+        self._matchers[guild_id] = matcher
+        self._matchers.move_to_end(guild_id)
+        self.builds += 1
+        if len(self._matchers) > self.max_guilds:
+            self._matchers.popitem(last=False)
+        return matcher
+
+    def invalidate(self, guild_id):
+        """Drop the matcher of a guild after its autoresponders change"""
+        self._matchers.pop(guild_id, None)
+
+    def bind_write_methods(self):
+        """Invalidate a guild's matcher whenever its autoresponders are written"""
+        def callback(guild_id=None, *args, **kwargs):
+            if guild_id is None:
+                self._matchers.clear()
+            else:
+                self.invalidate(guild_id)
+
+        return bind_writes(self.db, "autoresponders", callback, 'autoresponder')
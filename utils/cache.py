@@ -0,0 +1,309 @@
+import functools
+import inspect
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# First word of Database methods that write data (set_guild_prefix, remove_media_channel, ...)
+WRITE_VERBS = frozenset({
+    'set', 'update', 'add', 'remove', 'delete', 'reset', 'clear', 'toggle', 'enable', 'disable',
+    'save', 'edit', 'rename', 'insert', 'upsert', 'create', 'blacklist', 'unblacklist', 'cleanup',
+})
+
+# Cache section -> (keyword in the write method names, keywords to leave out).
+# The first argument of each method is the guild id (or user id for the blacklist).
+SETTINGS_SECTIONS = {
+    'prefix': ('prefix', ('no_prefix',)),
+    'media': ('media', ()),
+    'ignore': ('ignore', ()),
+    'blacklist': ('blacklist', ()),
+}
+
+
+def find_write_methods(db, keyword, exclude=()):
+    """Get the names of db's coroutine methods that start with a write verb and mention keyword"""
+    names = []
+    for name in dir(db):
+        if name.startswith('_') or name.split('_', 1)[0] not in WRITE_VERBS:
+            continue
+        if keyword not in name or any(word in name for word in exclude):
+            continue
+        if inspect.iscoroutinefunction(getattr(db, name, None)):
+            names.append(name)
+    return names
+
+
+def bind_writes(db, label, callback, keyword, exclude=()):
+    """Run callback after every write method found for keyword; warns when there is none.
+
+    Write methods are discovered by name rather than listed, so a renamed
+    Database method keeps invalidating. Returns the names that were bound.
+    """
+    names = [name for name in find_write_methods(db, keyword, exclude) if after_write(db, name, callback)]
+    if not names:
+        print(f"⚠️ No database write methods found for {label}; cached {label} data will not refresh on writes")
+    return names
+
+
+def after_write(db, method_name, callback):
+    """Wrap a Database write method so callback runs with its arguments after it completes"""
+    method = getattr(db, method_name, None)
+    if method is None:
+        return False
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        result = await method(*args, **kwargs)
+        outcome = callback(*args, **kwargs)
+        if inspect.isawaitable(outcome):
+            await outcome
+        return result
+
+    setattr(db, method_name, wrapper)
+    return True
+
+
+def _split_names(value):
+    """Split a comma separated list of names into a lower-case frozenset"""
+    return frozenset(name.strip().lower() for name in (value or '').split(',') if name.strip())
+
+
+class IgnoreRule:
+    """Compiled ignore settings of one channel"""
+    __slots__ = ('ignore_all', 'commands', 'categories')
+
+    def __init__(self, settings):
+        self.ignore_all = bool(settings.get('ignore_all'))
+        self.commands = _split_names(settings.get('ignored_commands'))
+        self.categories = _split_names(settings.get('ignored_categories'))
+
+    def matches(self, command_name, cog_name=None):
+        """Check if a command (and its cog) is ignored by this rule"""
+        if self.ignore_all:
+            return True
+        if command_name.lower() in self.commands:
+            return True
+        return cog_name is not None and cog_name.lower() in self.categories
+
+
+class GuildSettings:
+    """Cached settings for a single guild"""
+    __slots__ = ('prefix', 'media_channels', 'media_bypass', 'ignore_rules', 'ignore_bypass', 'loaded_at')
+
+    def __init__(self, loaded_at):
+        self.loaded_at = loaded_at
+        self.prefix = _MISSING
+        self.media_channels = {}
+        self.media_bypass = {}
+        self.ignore_rules = {}
+        self.ignore_bypass = {}
+
+
+class GuildSettingsCache:
+    """In-memory LRU cache for the per-guild settings read on every message.
+
+    Writes invalidate entries straight away; ttl bounds how long anything
+    can stay stale when a write happens elsewhere (another cluster process,
+    or a write method that was not bound). Each section has a generation
+    counter bumped on invalidation, and a read only stores its result if the
+    generation is unchanged after it, so a value read before a write
+    finishes is never cached over it.
+    """
+
+    def __init__(self, db, ttl=300, max_guilds=5000, max_users=50000, max_entries_per_guild=2000, clock=time.monotonic):
+        self.db = db
+        self.ttl = ttl
+        self.clock = clock
+        self.max_guilds = max_guilds
+        self.max_users = max_users
+        self.max_entries_per_guild = max_entries_per_guild
+        self._guilds = OrderedDict()
+        self._blacklist = OrderedDict()
+        self._generations = dict.fromkeys(SETTINGS_SECTIONS, 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _guild(self, guild_id):
+        """Get (or create) the cache entry for a guild and mark it recently used"""
+        settings = self._guilds.get(guild_id)
+        now = self.clock()
+        if settings is not None and self.ttl and now - settings.loaded_at >= self.ttl:
+            settings = None
+        if settings is None:
+            settings = GuildSettings(now)
+            self._guilds[guild_id] = settings
+            self._guilds.move_to_end(guild_id)
+            if len(self._guilds) > self.max_guilds:
+                self._guilds.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._guilds.move_to_end(guild_id)
+        return settings
+
+    def _store(self, table, key, value):
+        """Store a per-guild entry, resetting the table if it grows too large"""
+        if len(table) >= self.max_entries_per_guild:
+            table.clear()
+        table[key] = value
+
+    @staticmethod
+    def _roles_key(roles):
+        """Build a hashable key from a list of roles or role ids"""
+        return frozenset(getattr(role, 'id', role) for role in roles)
+
+    async def get_guild_prefix(self, guild_id):
+        """Get the guild prefix"""
+        settings = self._guild(guild_id)
+        if settings.prefix is not _MISSING:
+            self.hits += 1
+            return settings.prefix
+        self.misses += 1
+        generation = self._generations['prefix']
+        prefix = await self.db.get_guild_prefix(guild_id)
+        if self._generations['prefix'] == generation:
+            settings.prefix = prefix
+        return prefix
+
+    async def is_media_channel(self, guild_id, channel_id):
+        """Check if a channel is a media-only channel"""
+        settings = self._guild(guild_id)
+        result = settings.media_channels.get(channel_id, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+        self.misses += 1
+        generation = self._generations['media']
+        result = await self.db.is_media_channel(guild_id, channel_id)
+        if self._generations['media'] == generation:
+            self._store(settings.media_channels, channel_id, result)
+        return result
+
+    async def has_media_bypass(self, guild_id, user_id, roles):
+        """Check if a user bypasses media channel restrictions"""
+        settings = self._guild(guild_id)
+        key = (user_id, self._roles_key(roles))
+        result = settings.media_bypass.get(key, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+        self.misses += 1
+        generation = self._generations['media']
+        result = await self.db.has_media_bypass(guild_id, user_id, roles)
+        if self._generations['media'] == generation:
+            self._store(settings.media_bypass, key, result)
+        return result
+
+    async def get_ignore_rule(self, guild_id, channel_id):
+        """Get the compiled ignore rule for a channel (None if nothing is ignored)"""
+        settings = self._guild(guild_id)
+        result = settings.ignore_rules.get(channel_id, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+        self.misses += 1
+        generation = self._generations['ignore']
+        row = await self.db.get_ignore_setting(guild_id, channel_id)
+        result = IgnoreRule(row) if row else None
+        if self._generations['ignore'] == generation:
+            self._store(settings.ignore_rules, channel_id, result)
+        return result
+
+    async def is_ignore_bypassed(self, guild_id, channel_id, user_id, role_ids):
+        """Check if a user bypasses the ignore settings of a channel"""
+        settings = self._guild(guild_id)
+        key = (channel_id, user_id, self._roles_key(role_ids))
+        result = settings.ignore_bypass.get(key, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+        self.misses += 1
+        generation = self._generations['ignore']
+        result = await self.db.is_ignore_bypassed(guild_id, channel_id, user_id, role_ids)
+        if self._generations['ignore'] == generation:
+            self._store(settings.ignore_bypass, key, result)
+        return result
+
+    async def is_blacklisted_user(self, user_id):
+        """Get the blacklist reason for a user (falsy if not blacklisted)"""
+        entry = self._blacklist.get(user_id)
+        now = self.clock()
+        if entry is not None and (not self.ttl or now - entry[1] < self.ttl):
+            self._blacklist.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        generation = self._generations['blacklist']
+        result = await self.db.is_blacklisted_user(user_id)
+        if self._generations['blacklist'] != generation:
+            return result
+        self._blacklist[user_id] = (result, now)
+        self._blacklist.move_to_end(user_id)
+        if len(self._blacklist) > self.max_users:
+            self._blacklist.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def invalidate_guild(self, guild_id):
+        """Drop everything cached for a guild"""
+        self._guilds.pop(guild_id, None)
+
+    def invalidate_prefix(self, guild_id=None):
+        """Drop the cached prefix of a guild (or of every guild)"""
+        self._generations['prefix'] += 1
+        for settings in self._sections(guild_id):
+            settings.prefix = _MISSING
+
+    def invalidate_media(self, guild_id=None):
+        """Drop cached media channels and bypasses of a guild (or of every guild)"""
+        self._generations['media'] += 1
+        for settings in self._sections(guild_id):
+            settings.media_channels.clear()
+            settings.media_bypass.clear()
+
+    def invalidate_ignore(self, guild_id=None):
+        """Drop cached ignore settings and bypasses of a guild (or of every guild)"""
+        self._generations['ignore'] += 1
+        for settings in self._sections(guild_id):
+            settings.ignore_rules.clear()
+            settings.ignore_bypass.clear()
+
+    def invalidate_blacklist(self, user_id=None):
+        """Drop the cached blacklist entry of a user (or of every user)"""
+        self._generations['blacklist'] += 1
+        if user_id is None:
+            self._blacklist.clear()
+        else:
+            self._blacklist.pop(user_id, None)
+
+    def _sections(self, guild_id):
+        if guild_id is None:
+            return list(self._guilds.values())
+        settings = self._guilds.get(guild_id)
+        return [settings] if settings else []
+
+    def bind_write_methods(self):
+        """Wrap every settings write method on the database so it invalidates its cache section"""
+        bound = []
+        for section, (keyword, exclude) in SETTINGS_SECTIONS.items():
+            invalidate = getattr(self, f"invalidate_{section}")
+
+            def callback(*args, _invalidate=invalidate, **kwargs):
+                key = args[0] if args else kwargs.get('guild_id', kwargs.get('user_id'))
+                _invalidate(key if isinstance(key, int) else None)
+
+            bound += bind_writes(self.db, f"{section} settings", callback, keyword, exclude)
+        return bound
+
+    def stats(self):
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'guilds': len(self._guilds),
+            'blacklist_entries': len(self._blacklist),
+        }
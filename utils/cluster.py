@@ -0,0 +1,103 @@
+import json
+import math
+import os
+import time
+
+
+def shard_for(guild_id, shard_count):
+    """Get the shard a guild is on"""
+    return (guild_id >> 22) % shard_count
+
+
+def split_shards(shard_count, clusters):
+    """Split shard ids into contiguous ranges, one per cluster"""
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    ranges = []
+    start = 0
+    for index in range(clusters):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class ClusterStats:
+    """Bot-wide counters shared between cluster processes through small JSON files.
+
+    Every process periodically publishes its own totals to one file and reads
+    everyone's files back, so bot-wide numbers never iterate another
+    process's guilds. Files older than max_age belong to dead processes and
+    are ignored.
+    """
+
+    def __init__(self, directory, cluster_id=0, max_age=120, cache_for=15):
+        self.directory = directory
+        self.cluster_id = cluster_id
+        self.max_age = max_age
+        self.cache_for = cache_for
+        self.local = {}
+        self._aggregate = None
+        self._aggregated_at = 0.0
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"cluster-{self.cluster_id}.json")
+
+    def publish(self, bot):
+        """Write this process's totals and return them"""
+        self.local = {
+            'cluster_id': self.cluster_id,
+            'shards': sorted(bot.shards) if hasattr(bot, 'shards') else [0],
+            'guilds': len(bot.guilds),
+            'users': sum(guild.member_count or 0 for guild in bot.guilds),
+            'channels': sum(len(guild.channels) for guild in bot.guilds),
+            'latency': bot.latency,
+            'updated': time.time(),
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{self.path}.tmp"
+            with open(temporary, 'w') as file:
+                json.dump(self.local, file)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Error publishing cluster stats: {e}")
+        self._aggregate = None
+        return self.local
+
+    def aggregate(self):
+        """Get totals summed over every live cluster (cached for a few seconds)"""
+        now = time.time()
+        if self._aggregate is not None and now - self._aggregated_at < self.cache_for:
+            return self._aggregate
+
+        clusters = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            if not (name.startswith('cluster-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if now - data.get('updated', 0) <= self.max_age:
+                clusters[data['cluster_id']] = data
+        if self.local:
+            clusters[self.cluster_id] = self.local
+
+        latencies = [data['latency'] for data in clusters.values() if not math.isnan(data.get('latency', math.nan))]
+        self._aggregate = {
+            'clusters': len(clusters),
+            'shards': sum(len(data['shards']) for data in clusters.values()),
+            'guilds': sum(data['guilds'] for data in clusters.values()),
+            'users': sum(data['users'] for data in clusters.values()),
+            'channels': sum(data['channels'] for data in clusters.values()),
+            'latency': sum(latencies) / len(latencies) if latencies else None,
+        }
+        self._aggregated_at = now
+        return self._aggregate
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from utils.ratelimit import SlidingWindowCounter
+
+
+def edit_distance(a, b):
+    """Damerau-Levenshtein distance: insertions, deletions, substitutions and transpositions.
+
+    This is the unrestricted variant, which unlike optimal string alignment is
+    a metric, so the BK-tree's triangle inequality pruning stays exact.
+    """
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    infinity = len(a) + len(b)
+    # Row/column 0 hold the sentinel, row/column 1 the empty prefix
+    rows = [[infinity] * (len(b) + 2)]
+    rows.append([infinity] + list(range(len(b) + 1)))
+    for i in range(1, len(a) + 1):
+        rows.append([infinity, i] + [0] * len(b))
+    last_row = {}
+    for i, char_a in enumerate(a, 1):
+        above, current = rows[i], rows[i + 1]
+        last_match = 0
+        for j, char_b in enumerate(b, 1):
+            k = last_row.get(char_b, 0)
+            l = last_match
+            if char_a == char_b:
+                best = above[j]
+                last_match = j
+            else:
+                best = above[j] + 1
+                if above[j + 1] + 1 < best:
+                    best = above[j + 1] + 1
+                if current[j] + 1 < best:
+                    best = current[j] + 1
+            # Swap the last occurrences of char_b in a and char_a in b, editing what lies between
+            if k and l:
+                swap = rows[k][l] + (i - k - 1) + 1 + (j - l - 1)
+                if swap < best:
+                    best = swap
+            current[j + 1] = best
+        last_row[char_a] = i
+    return rows[-1][-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree of words for nearest matches under edit distance"""
+
+    def __init__(self, words=()):
+        self._root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """Get (distance, word) pairs within max_distance, closest first"""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            candidate, children = stack.pop()
+            distance = edit_distance(word, candidate)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+            # Triangle inequality: only subtrees at distance +/- max_distance can match
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+class CommandRegistry:
+    """Snapshot of the loaded commands, rebuilt lazily after commands are added or removed"""
+
+    def __init__(self, bot, reply_limit=2, reply_window=10, max_cached=2000):
+        self.bot = bot
+        self.max_cached = max_cached
+        self.visible_count = 0
+        self.names = {}
+        self._tree = BKTree()
+        self._suggestions = OrderedDict()
+        self._dirty = True
+        self._replies = SlidingWindowCounter(reply_window, max_keys=50000)
+        self.reply_limit = reply_limit
+        self.builds = 0
+
+    def invalidate(self):
+        """Mark the snapshot stale (called whenever a command is added or removed)"""
+        self._dirty = True
+
+    def refresh(self):
+        """Rebuild the snapshot if commands changed since the last build"""
+        if not self._dirty:
+            return
+        visible = 0
+        names = {}
+        for cog in self.bot.cogs.values():
+            if getattr(cog, 'hidden', False):
+                continue
+            visible += sum(1 for command in cog.get_commands() if not command.hidden)
+        for command in self.bot.walk_commands():
+            if command.hidden or command.parent is not None:
+                continue
+            names[command.name.lower()] = command.name
+            for alias in command.aliases:
+                names.setdefault(alias.lower(), command.name)
+
+        self.visible_count = visible
+        self.names = names
+        self._tree = BKTree(names)
+        self._suggestions.clear()
+        self._dirty = False
+        self.builds += 1
+
+    def suggest(self, word, max_distance=2, limit=3):
+        """Get the names of the visible commands closest to a mistyped one"""
+        self.refresh()
+        word = (word or '').lower()[:32]
+        cached = self._suggestions.get(word)
+        if cached is not None:
+            self._suggestions.move_to_end(word)
+            return cached
+
+        # Short words get a tighter radius or everything would match
+        radius = min(max_distance, max(1, len(word) // 3))
+        suggestions = []
+        for _, name in self._tree.search(word, radius):
+            command = self.names[name]
+            if command not in suggestions:
+                suggestions.append(command)
+            if len(suggestions) >= limit:
+                break
+
+        self._suggestions[word] = suggestions
+        if len(self._suggestions) > self.max_cached:
+            self._suggestions.popitem(last=False)
+        return suggestions
+
+    def allow_reply(self, channel_id):
+        """Check if a channel may get another not-found reply in the current window"""
+        return self._replies.hit(channel_id) <= self.reply_limit
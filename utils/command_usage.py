@@ -0,0 +1,52 @@
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS command_usage (
+    command TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (command, guild_id)
+)
+"""
+
+# The amount comes first, as WriteBehindQueue.increment binds it
+INCREMENT = """
+INSERT INTO command_usage (uses, command, guild_id) VALUES (?, ?, ?)
+ON CONFLICT (command, guild_id) DO UPDATE SET uses = uses + excluded.uses
+"""
+
+TOP_COMMANDS = """
+SELECT command, SUM(uses) AS uses FROM command_usage
+GROUP BY command ORDER BY uses DESC LIMIT ?
+"""
+
+TOP_GUILD_COMMANDS = """
+SELECT command, uses FROM command_usage
+WHERE guild_id = ? ORDER BY uses DESC LIMIT ?
+"""
+
+
+class CommandUsage:
+    """Per-guild command use counters, written through the write-behind queue on every command"""
+
+    def __init__(self, pool, write_behind):
+        self.pool = pool
+        self.write_behind = write_behind
+
+    async def create_table(self):
+        """Create the counters table if it does not exist"""
+        await self.pool.execute(CREATE_TABLE)
+
+    async def record(self, ctx):
+        """Count one completed command (DMs count under guild 0)"""
+        name = ctx.command.qualified_name
+        guild_id = ctx.guild.id if ctx.guild else 0
+        await self.write_behind.increment(('command_usage', name, guild_id), INCREMENT, (name, guild_id))
+
+    async def top(self, limit=10, guild_id=None):
+        """Get (command, uses) pairs, most used first, bot-wide or for one guild"""
+        # Buffered counts are committed first so the numbers are current
+        await self.write_behind.flush()
+        if guild_id is None:
+            rows = await self.pool.fetchall(TOP_COMMANDS, (limit,))
+        else:
+            rows = await self.pool.fetchall(TOP_GUILD_COMMANDS, (guild_id, limit))
+        return [(row['command'], row['uses']) for row in rows]
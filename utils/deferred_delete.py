@@ -0,0 +1,172 @@
+import asyncio
+import time
+import discord
+
+# Bulk delete accepts 2 to 100 messages per request
+BULK_DELETE_LIMIT = 100
+
+
+class DeferredDeleter:
+    """Deletes bot messages after a delay from one timer wheel.
+
+    Messages land in a slot per tick and a single task deletes each slot as
+    it comes due, bulk deleting per channel. A warning keyed per channel is
+    only sent once while it is live; repeats push its expiry back instead of
+    sending another message.
+    """
+
+    def __init__(self, tick=0.5, clock=time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self._slots = {}
+        self._due = {}
+        self._warnings = {}
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self.scheduled = 0
+        self.collapsed = 0
+        self.deleted = 0
+        self.bulk_requests = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the timer task"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the timer task and delete everything still pending"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        pending = [message for slot in self._slots.values() for message in slot]
+        self._slots.clear()
+        self._due.clear()
+        self._warnings.clear()
+        await self._delete(pending)
+
+    def _tick_for(self, delay):
+        return int((self.clock() + delay) / self.tick) + 1
+
+    def schedule(self, message, delay):
+        """Delete a message after delay seconds (rescheduling moves its expiry)"""
+        if message is None:
+            return
+        tick = self._tick_for(delay)
+        self.scheduled += 1
+        previous = self._due.get(message.id)
+        if previous == tick:
+            return
+        if previous is not None:
+            # A message only lives in its latest slot
+            self._unslot(message, previous)
+        self._due[message.id] = tick
+        self._slots.setdefault(tick, []).append(message)
+        self._wakeup.set()
+
+    def _unslot(self, message, tick):
+        slot = self._slots.get(tick)
+        if slot is None:
+            return
+        slot[:] = [entry for entry in slot if entry.id != message.id]
+        if not slot:
+            del self._slots[tick]
+
+    async def warn(self, channel, key, delay, **send_kwargs):
+        """Send a temporary warning unless the same warning is already live in the channel"""
+        warning_key = (channel.id, key)
+        if warning_key in self._warnings:
+            self.collapsed += 1
+            message = self._warnings[warning_key]
+            if message is not None:
+                self.schedule(message, delay)
+            return message
+
+        # Placeholder so warnings raised while this one is sending collapse into it
+        self._warnings[warning_key] = None
+        try:
+            message = await channel.send(**send_kwargs)
+        except discord.HTTPException:
+            del self._warnings[warning_key]
+            raise
+        self._warnings[warning_key] = message
+        self.schedule(message, delay)
+        return message
+
+    async def _run(self):
+        while True:
+            if not self._slots:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            now = self.clock() / self.tick
+            next_tick = min(self._slots)
+            if next_tick > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), (next_tick - now) * self.tick)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = []
+            for tick in [tick for tick in self._slots if tick <= now]:
+                for message in self._slots.pop(tick):
+                    self._due.pop(message.id, None)
+                    due.append(message)
+            try:
+                await self._delete(due)
+            except Exception as e:
+                print(f"Error deleting {len(due)} expired messages: {e}")
+
+    async def _delete(self, messages):
+        """Delete messages with one bulk request per channel where possible"""
+        if not messages:
+            return
+        live = {id(message) for message in messages}
+        for key, message in list(self._warnings.items()):
+            if message is not None and id(message) in live:
+                del self._warnings[key]
+
+        by_channel = {}
+        for message in messages:
+            by_channel.setdefault(message.channel.id, []).append(message)
+
+        for channel_messages in by_channel.values():
+            channel = channel_messages[0].channel
+            for start in range(0, len(channel_messages), BULK_DELETE_LIMIT):
+                batch = channel_messages[start:start + BULK_DELETE_LIMIT]
+                if len(batch) > 1 and hasattr(channel, 'delete_messages'):
+                    try:
+                        await channel.delete_messages(batch)
+                        self.bulk_requests += 1
+                        self.deleted += len(batch)
+                        continue
+                    except discord.Forbidden:
+                        # Bulk delete needs Manage Messages even for our own messages
+                        pass
+                    except discord.HTTPException:
+                        self.failed += len(batch)
+                        continue
+                for message in batch:
+                    try:
+                        await message.delete()
+                        self.deleted += 1
+                    except discord.HTTPException:
+                        self.failed += 1
+
+    def stats(self):
+        """Get pending and deletion counters"""
+        return {
+            'pending': len(self._due),
+            'live_warnings': len(self._warnings),
+            'scheduled': self.scheduled,
+            'collapsed': self.collapsed,
+            'deleted': self.deleted,
+            'bulk_requests': self.bulk_requests,
+            'failed': self.failed,
+        }
@@ -0,0 +1,134 @@
+import re
+from collections import OrderedDict
+from utils.cache import bind_writes
+
+# Extracts the host of every link in a message in one scan (scheme optional for www. links)
+URL_PATTERN = re.compile(
+    r"(?:https?://|\bwww\.)([a-z0-9](?:[a-z0-9.-]*[a-z0-9])?)(?::\d+)?",
+    re.IGNORECASE
+)
+
+# Discord invite links in all their forms
+INVITE_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.)?(?:discord(?:app)?\.com/invite|discord\.(?:gg|io|me|li)|dsc\.gg)/[a-z0-9-]+",
+    re.IGNORECASE
+)
+
+_END = object()
+
+
+def _labels(domain):
+    """Split a configured domain into reversed labels"""
+    domain = domain.strip().lower()
+    if '://' in domain:
+        domain = domain.split('://', 1)[1]
+    domain = domain.split('/', 1)[0].split(':', 1)[0].strip('.')
+    if domain.startswith('*.'):
+        domain = domain[2:]
+    return domain.split('.')[::-1] if domain else []
+
+
+class DomainTrie:
+    """Reversed-label suffix trie: a domain matches itself and every subdomain"""
+
+    def __init__(self, domains=()):
+        self._root = {}
+        self.size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain):
+        labels = _labels(domain)
+        if not labels:
+            return
+        node = self._root
+        for label in labels:
+            node = node.setdefault(label, {})
+        if _END not in node:
+            node[_END] = True
+            self.size += 1
+
+    def matches(self, host):
+        """Check if host is a listed domain or a subdomain of one"""
+        node = self._root
+        for label in reversed(host.lower().split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+
+class LinkMatcher:
+    """Compiled antilink lists of one guild"""
+
+    def __init__(self, allowed=(), disallowed=(), block_invites=True):
+        self.allowed = DomainTrie(allowed)
+        self.disallowed = DomainTrie(disallowed)
+        self.block_invites = block_invites
+
+    @staticmethod
+    def hosts(content):
+        """Get the host of every link in a message"""
+        return [match.group(1) for match in URL_PATTERN.finditer(content)]
+
+    def violation(self, content):
+        """Get the reason a message breaks antilink, or None.
+
+        Allowed domains always pass. With a disallow list only those domains are
+        blocked, otherwise every link that is not allowed is blocked.
+        """
+        if self.block_invites and INVITE_PATTERN.search(content):
+            return "invite"
+        for host in self.hosts(content):
+            if self.allowed.matches(host):
+                continue
+            if not self.disallowed.size or self.disallowed.matches(host):
+                return host
+        return None
+
+
+class LinkMatcherCache:
+    """Per-guild compiled antilink matchers, rebuilt only when the guild's lists change"""
+
+    def __init__(self, db=None, max_guilds=5000):
+        self.db = db
+        self.max_guilds = max_guilds
+        self._matchers = OrderedDict()
+        self.builds = 0
+
+    def get(self, guild_id):
+        """Get the compiled matcher of a guild (None until built or after invalidation)"""
+        matcher = self._matchers.get(guild_id)
+        if matcher is not None:
+            self._matchers.move_to_end(guild_id)
+        return matcher
+
+    def build(self, guild_id, allowed, disallowed, block_invites=True):
+        """Compile and cache a guild's lists; lists may be iterables or comma separated strings"""
+        if isinstance(allowed, str):
+            allowed = allowed.split(',')
+        if isinstance(disallowed, str):
+            disallowed = disallowed.split(',')
+        matcher = LinkMatcher(allowed or (), disallowed or (), block_invites)
+        self._matchers[guild_id] = matcher
+        self._matchers.move_to_end(guild_id)
+        self.builds += 1
+        if len(self._matchers) > self.max_guilds:
+            self._matchers.popitem(last=False)
+        return matcher
+
+    def invalidate(self, guild_id):
+        """Drop the matcher of a guild after its antilink lists change"""
+        self._matchers.pop(guild_id, None)
+
+    def bind_write_methods(self):
+        """Invalidate a guild's matcher whenever its antilink settings are written"""
+        def callback(guild_id=None, *args, **kwargs):
+            if guild_id is None:
+                self._matchers.clear()
+            else:
+                self.invalidate(guild_id)
+
+        return bind_writes(self.db, "antilink settings", callback, 'antilink')
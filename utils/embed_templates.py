@@ -0,0 +1,177 @@
+import re
+from collections import OrderedDict
+import discord
+from utils.cache import bind_writes
+
+# Variable placeholders such as {user.mention} or {server}
+SLOT_PATTERN = re.compile(r"\{[^{}\s]+\}")
+
+# Separator used to resolve the remaining slots of a template with one parse_variables call
+_SLOT_SEPARATOR = "\x1f"
+
+# Variables read straight from the member, guild or channel, compiled into each template once;
+# every other variable goes through parse_variables
+SLOT_GETTERS = {
+    '{user.mention}': lambda member, guild, channel: member.mention,
+    '{user.id}': lambda member, guild, channel: str(member.id),
+    '{server.name}': lambda member, guild, channel: guild.name,
+    '{server.id}': lambda member, guild, channel: str(guild.id),
+    '{server.member_count}': lambda member, guild, channel: str(guild.member_count),
+    '{channel.mention}': lambda member, guild, channel: channel.mention,
+    '{channel.name}': lambda member, guild, channel: channel.name,
+    '{channel.id}': lambda member, guild, channel: str(channel.id),
+}
+
+TEXT_KEYS = ('title', 'description', 'footer', 'thumbnail', 'author')
+
+
+class EmbedTemplate:
+    """Saved embed compiled into static segments and variable slots"""
+
+    def __init__(self, embed_data):
+        self.slots = []
+        self._slot_index = {}
+        self.texts = {key: self._compile(embed_data.get(key)) for key in TEXT_KEYS}
+        self.fields = [
+            (self._compile(field.get('name')), self._compile(field.get('value')), field.get('inline', False))
+            for field in embed_data.get('fields', [])
+        ]
+        # (slot index, getter) for direct lookups, and the slots parse_variables still resolves
+        self.getters = [(index, SLOT_GETTERS[slot]) for index, slot in enumerate(self.slots) if slot in SLOT_GETTERS]
+        self.parsed = [(index, slot) for index, slot in enumerate(self.slots) if slot not in SLOT_GETTERS]
+        self._parsed_text = _SLOT_SEPARATOR.join(slot for _, slot in self.parsed)
+
+    def _compile(self, text):
+        """Compile text into a static string or a positional format over slot indexes"""
+        if not text:
+            return None
+        if '{' not in text:
+            return text
+        parts = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(text):
+            parts.append(text[position:match.start()].replace('{', '{{').replace('}', '}}'))
+            token = match.group()
+            index = self._slot_index.get(token)
+            if index is None:
+                index = self._slot_index[token] = len(self.slots)
+                self.slots.append(token)
+            parts.append(f"{{{index}}}")
+            position = match.end()
+        parts.append(text[position:].replace('{', '{{').replace('}', '}}'))
+        return ''.join(parts).format
+
+    @staticmethod
+    def _fill(compiled, values):
+        if compiled is None or isinstance(compiled, str):
+            return compiled
+        return compiled(*values)
+
+    async def resolve(self, member, guild, channel):
+        """Resolve every slot: compiled lookups first, then one parse_variables call for the rest"""
+        values = list(self.slots)
+        for index, getter in self.getters:
+            try:
+                values[index] = getter(member, guild, channel)
+            except AttributeError:
+                # Not available in this context (e.g. no channel), keep the raw token
+                pass
+        if not self.parsed:
+            return values
+        from utils.variables import parse_variables
+        parsed = await parse_variables({'description': self._parsed_text}, member, guild, channel)
+        parsed_values = (parsed.get('description') or '').split(_SLOT_SEPARATOR)
+        if len(parsed_values) == len(self.parsed):
+            for (index, _), value in zip(self.parsed, parsed_values):
+                values[index] = value
+        # Otherwise a variable expanded to something containing the separator, keep the raw tokens
+        return values
+
+    def render(self, values):
+        """Fill the template with resolved slot values"""
+        data = {key: self._fill(parts, values) for key, parts in self.texts.items()}
+        data['fields'] = [
+            {'name': self._fill(name, values), 'value': self._fill(value, values), 'inline': inline}
+            for name, value, inline in self.fields
+        ]
+        return data
+
+    def to_embed(self, values):
+        """Build the discord.Embed for resolved slot values"""
+        data = self.render(values)
+        embed = discord.Embed(color=0x2f3136)
+        if data['title']:
+            embed.title = data['title']
+        if data['description']:
+            embed.description = data['description']
+        if data['footer']:
+            embed.set_footer(text=data['footer'])
+        if data['thumbnail']:
+            embed.set_thumbnail(url=data['thumbnail'])
+        if data['author']:
+            embed.set_author(name=data['author'])
+        for field in data['fields']:
+            embed.add_field(name=field['name'], value=field['value'], inline=field['inline'])
+        return embed
+
+
+class EmbedTemplateCache:
+    """LRU cache of compiled saved embeds keyed by (guild_id, embed_name)"""
+
+    def __init__(self, db, max_size=2000):
+        self.db = db
+        self.max_size = max_size
+        self._templates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, guild_id, name):
+        """Get the compiled template of a saved embed (None if it does not exist)"""
+        key = (guild_id, name)
+        if key in self._templates:
+            self._templates.move_to_end(key)
+            self.hits += 1
+            return self._templates[key]
+        self.misses += 1
+        embed_data = await self.db.get_embed(guild_id, name)
+        template = EmbedTemplate(embed_data) if embed_data else None
+        self._templates[key] = template
+        if len(self._templates) > self.max_size:
+            self._templates.popitem(last=False)
+        return template
+
+    async def render(self, guild_id, name, member, guild, channel):
+        """Render a saved embed for a member (None if it does not exist)"""
+        template = await self.get(guild_id, name)
+        if template is None:
+            return None
+        return template.to_embed(await template.resolve(member, guild, channel))
+
+    def invalidate(self, guild_id, name=None):
+        """Drop a cached template, or every template of a guild"""
+        if name is not None:
+            self._templates.pop((guild_id, name), None)
+            return
+        for key in [key for key in self._templates if key[0] == guild_id]:
+            del self._templates[key]
+
+    def bind_write_methods(self):
+        """Invalidate templates whenever a saved embed is written"""
+        def callback(guild_id=None, name=None, *args, **kwargs):
+            if isinstance(name, str):
+                self.invalidate(guild_id, name)
+            else:
+                self.invalidate(guild_id)
+
+        # Saved embed write methods take (guild_id, name, ...)
+        return bind_writes(self.db, "saved embeds", callback, 'embed')
+
+    def stats(self):
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'templates': len(self._templates),
+        }
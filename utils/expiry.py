@@ -0,0 +1,175 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+from utils.cache import bind_writes
+
+# kind -> (Database loader returning every record, key column, expiry column, keyword of the write methods that change the kind)
+EXPIRING_RECORDS = {
+    'no_prefix': ('get_all_no_prefix_users', 'user_id', 'expires_at', 'no_prefix'),
+    'premium': ('get_all_premium_guilds', 'guild_id', 'expires_at', 'premium'),
+    'antinuke_cleanup': ('get_disabled_antinuke_configs', 'guild_id', 'disabled_at', 'antinuke'),
+}
+
+
+def to_timestamp(value):
+    """Convert a stored expiry (datetime, ISO string or epoch number) to epoch seconds; None means never"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+class ExpiryScheduler:
+    """Min-heap of expiring records that fires a callback at each record's expiry time.
+
+    Every live record is also kept in a dict, so checking whether something
+    is active is a memory lookup. Superseded heap entries are skipped when
+    popped rather than removed, and due callbacks run in small batches.
+    """
+
+    def __init__(self, batch_size=25, clock=time.time):
+        self.batch_size = batch_size
+        self.clock = clock
+        self._heap = []
+        self._live = {}
+        self._handlers = {}
+        self._loaded = set()
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self.fired = 0
+        self.failed = 0
+
+    def register(self, kind, callback):
+        """Set the coroutine function called with the key when a record of kind expires"""
+        self._handlers[kind] = callback
+
+    def schedule(self, kind, key, expires_at):
+        """Track a record; expires_at is epoch seconds or None for a permanent record"""
+        if self._live.get((kind, key), False) == expires_at:
+            return
+        self._live[(kind, key)] = expires_at
+        if expires_at is not None:
+            heapq.heappush(self._heap, (expires_at, next(self._counter), kind, key))
+            if self._heap[0][2:] == (kind, key):
+                # New earliest deadline, wake the worker to shorten its sleep
+                self._wakeup.set()
+
+    def cancel(self, kind, key):
+        """Stop tracking a record (its heap entry is skipped when it comes due)"""
+        self._live.pop((kind, key), None)
+
+    def is_active(self, kind, key):
+        """Check if a record exists and has not expired"""
+        expires_at = self._live.get((kind, key), False)
+        if expires_at is False:
+            return False
+        return expires_at is None or expires_at > self.clock()
+
+    def expires_at(self, kind, key):
+        """Get the expiry time of a record (None if permanent or untracked)"""
+        return self._live.get((kind, key))
+
+    def tracks(self, kind):
+        """Check if records of kind were loaded, so is_active() is authoritative for it"""
+        return kind in self._loaded
+
+    async def load(self, db, kind, offset=0):
+        """Load every record of kind from the database; returns False if the database has no loader"""
+        loader, key_column, expiry_column, _ = EXPIRING_RECORDS[kind]
+        method = getattr(db, loader, None)
+        if method is None:
+            return False
+
+        rows = await method() or ()
+        stale = {key for key in self._live if key[0] == kind}
+        for row in rows:
+            expires_at = to_timestamp(row.get(expiry_column))
+            if expires_at is not None:
+                expires_at += offset
+            self.schedule(kind, row[key_column], expires_at)
+            stale.discard((kind, row[key_column]))
+        for key in stale:
+            del self._live[key]
+        self._loaded.add(kind)
+        return True
+
+    def bind_write_methods(self, db, kind, offset=0):
+        """Reload a kind whenever one of its write methods runs"""
+        async def callback(*args, **kwargs):
+            await self.load(db, kind, offset)
+
+        return bind_writes(db, f"{kind} expiry records", callback, EXPIRING_RECORDS[kind][3])
+
+    def start(self):
+        """Start the background expiry task"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background expiry task"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._heap[0][0] - self.clock() if self._heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_due()
+            # Yield between batches so a backlog never blocks the event loop
+            await asyncio.sleep(0)
+
+    async def run_due(self):
+        """Fire callbacks for up to batch_size due records; returns how many fired"""
+        now = self.clock()
+        fired = 0
+        while self._heap and self._heap[0][0] <= now and fired < self.batch_size:
+            expires_at, _, kind, key = heapq.heappop(self._heap)
+            if self._live.get((kind, key), False) != expires_at:
+                continue
+            del self._live[(kind, key)]
+            fired += 1
+            handler = self._handlers.get(kind)
+            if handler is None:
+                continue
+            try:
+                await handler(key)
+                self.fired += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Error expiring {kind} {key}: {e}")
+        return fired
+
+    def stats(self):
+        """Get tracked record and callback counters"""
+        counts = {}
+        for kind, _ in self._live:
+            counts[kind] = counts.get(kind, 0) + 1
+        return {
+            'tracked': counts,
+            'heap': len(self._heap),
+            'next_due': self._heap[0][0] - self.clock() if self._heap else None,
+            'fired': self.fired,
+            'failed': self.failed,
+        }
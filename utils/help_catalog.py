@@ -0,0 +1,165 @@
+import json
+from collections import OrderedDict
+import discord
+
+# Stands in for the prefix inside rendered page templates (printable so it survives json.dumps)
+PREFIX_TOKEN = "{{prefix}}"
+
+
+class HelpCatalog:
+    """Help pages rendered once per command set and served per prefix.
+
+    Pages are stored as JSON embed templates with a prefix placeholder. The
+    embeds for one prefix are built the first time it is asked for and cached;
+    everything is rebuilt only after the command registry changes.
+    """
+
+    def __init__(self, bot, page_size=10, color=0x2f3136, max_prefixes=64):
+        self.bot = bot
+        self.page_size = page_size
+        self.color = color
+        self.max_prefixes = max_prefixes
+        self._version = None
+        self._overview = []
+        self._commands = {}
+        self._rendered = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def _sync(self):
+        """Rebuild the templates if commands were added or removed"""
+        registry = self.bot.command_registry
+        registry.refresh()
+        if self._version != registry.builds:
+            self._build()
+            self._version = registry.builds
+
+    def _template(self, embed):
+        return json.dumps(embed.to_dict())
+
+    def _build(self):
+        bot_avatar = None
+        if self.bot.user:
+            bot_avatar = (self.bot.user.avatar or self.bot.user.default_avatar).replace(static_format="png").url
+
+        # Cogs register in the order their setup finished, list them in extension order instead
+        order = {name: index for index, name in enumerate(getattr(self.bot, 'extension_order', ()))}
+        cogs = sorted(self.bot.cogs.items(), key=lambda item: order.get(type(item[1]).__module__, len(order)))
+
+        categories = []
+        for cog_name, cog in cogs:
+            if getattr(cog, 'hidden', False):
+                continue
+            visible = sorted((command for command in cog.get_commands() if not command.hidden), key=lambda command: command.name)
+            if visible:
+                categories.append((cog_name, visible))
+
+        pages = []
+        overview = discord.Embed(
+            title="Help Menu",
+            description=f"Use `{PREFIX_TOKEN}help <command>` for more info on a command.\nExample: `{PREFIX_TOKEN}help mute`",
+            color=self.color
+        )
+        overview.add_field(
+            name="📌 Categories",
+            value="\n".join(f"🔹 {name} ({len(commands)})" for name, commands in categories) or "No commands loaded.",
+            inline=False
+        )
+        pages.append(overview)
+
+        for name, commands in categories:
+            chunks = [commands[start:start + self.page_size] for start in range(0, len(commands), self.page_size)]
+            for index, chunk in enumerate(chunks, 1):
+                embed = discord.Embed(
+                    title=name if len(chunks) == 1 else f"{name} ({index}/{len(chunks)})",
+                    description="\n".join(
+                        f"`{PREFIX_TOKEN}{command.name}` - {command.short_doc or 'No description available.'}"
+                        for command in chunk
+                    ),
+                    color=self.color
+                )
+                pages.append(embed)
+
+        for number, page in enumerate(pages, 1):
+            if bot_avatar:
+                page.set_thumbnail(url=bot_avatar)
+            page.set_footer(text=f"Page {number}/{len(pages)}")
+
+        details = {}
+        for command in self.bot.walk_commands():
+            if command.hidden or command.name == "help":
+                continue
+            embed = discord.Embed(
+                title=f"Command: `{PREFIX_TOKEN}{command.qualified_name}`",
+                description=command.help or "No description available.",
+                color=self.color
+            )
+            embed.add_field(name="Usage", value=f"`{PREFIX_TOKEN}{command.qualified_name} {command.signature}`".replace(" `", "`"), inline=False)
+            embed.add_field(name="Aliases", value=", ".join(command.aliases) if command.aliases else "None", inline=False)
+            if bot_avatar:
+                embed.set_thumbnail(url=bot_avatar)
+            template = self._template(embed)
+            parent = f"{command.full_parent_name} " if command.parent else ""
+            details[command.qualified_name.lower()] = template
+            for alias in command.aliases:
+                details.setdefault(f"{parent}{alias}".lower(), template)
+
+        self._overview = [self._template(page) for page in pages]
+        self._commands = details
+        self._rendered.clear()
+        self.builds += 1
+
+    @staticmethod
+    def _render(template, prefix):
+        return discord.Embed.from_dict(json.loads(template.replace(PREFIX_TOKEN, json.dumps(prefix)[1:-1])))
+
+    def _rendered_for(self, prefix):
+        rendered = self._rendered.get(prefix)
+        if rendered is None:
+            rendered = self._rendered[prefix] = {'pages': None, 'commands': {}}
+            if len(self._rendered) > self.max_prefixes:
+                self._rendered.popitem(last=False)
+        else:
+            self._rendered.move_to_end(prefix)
+        return rendered
+
+    def pages(self, prefix):
+        """Get the overview and category pages for a prefix"""
+        self._sync()
+        rendered = self._rendered_for(prefix)
+        if rendered['pages'] is None:
+            self.misses += 1
+            rendered['pages'] = [self._render(template, prefix) for template in self._overview]
+        else:
+            self.hits += 1
+        return rendered['pages']
+
+    def command(self, name, prefix):
+        """Get the detail page of a command or alias (None if there is no such visible command)"""
+        self._sync()
+        key = " ".join((name or "").lower().split())
+        template = self._commands.get(key)
+        if template is None:
+            return None
+        rendered = self._rendered_for(prefix)['commands']
+        embed = rendered.get(key)
+        if embed is None:
+            self.misses += 1
+            embed = rendered[key] = self._render(template, prefix)
+        else:
+            self.hits += 1
+        return embed
+
+    def stats(self):
+        """Get render cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'builds': self.builds,
+            'prefixes': len(self._rendered),
+            'pages': len(self._overview),
+            'commands': len(self._commands),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import contextvars
+from collections import deque
+import discord
+
+# Discord accepts at most 10 embeds per webhook execute
+MAX_EMBEDS_PER_SEND = 10
+
+# Set while a deferred logging job runs, so its webhook sends are batched by that pipeline
+_capturing = contextvars.ContextVar('log_pipeline_capturing', default=None)
+_webhook_send = discord.Webhook.send
+
+
+async def _batched_send(webhook, *args, **kwargs):
+    """Webhook.send that hands embed-only sends made by a logging job to the pipeline"""
+    pipeline = _capturing.get()
+    if pipeline is not None and not args and kwargs and set(kwargs) <= {'embed', 'embeds'}:
+        embeds = kwargs.get('embeds') or ([kwargs['embed']] if kwargs.get('embed') else [])
+        if embeds:
+            pipeline.submit(webhook, embeds)
+            return None
+    return await _webhook_send(webhook, *args, **kwargs)
+
+
+class LogPipeline:
+    """Bounded, batched webhook logging that never blocks the caller.
+
+    Logging calls run in the background. Embeds they send to a webhook are
+    collected and sent up to 10 per request for each webhook, so every log
+    type keeps BotLogger's formatting and is batched the same way. start()
+    routes Webhook.send through _batched_send for this; sends made outside
+    a logging job, or with anything besides embeds, go out unchanged.
+    """
+
+    def __init__(self, bot, max_queue=2000, flush_interval=2.0):
+        self.bot = bot
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self._embeds = {}
+        self._webhooks = {}
+        self._jobs = deque()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self.queued = 0
+        self.dropped = 0
+        self.sent = 0
+        self.batches = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the background flusher"""
+        discord.Webhook.send = _batched_send
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the flusher and send everything still queued"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.flush()
+
+    def depth(self):
+        """Get the number of queued log items"""
+        return sum(len(queue) for queue in self._embeds.values()) + len(self._jobs)
+
+    def submit(self, webhook, embeds):
+        """Queue embeds for a webhook, sent together with the other embeds queued for it"""
+        self._webhooks[webhook.id] = webhook
+        queue = self._embeds.setdefault(webhook.id, deque())
+        for embed in embeds:
+            self._make_room(queue)
+            queue.append(embed)
+            self.queued += 1
+        if len(queue) >= MAX_EMBEDS_PER_SEND:
+            self._wakeup.set()
+
+    def defer(self, func, *args, **kwargs):
+        """Queue a logging coroutine function to run in the background"""
+        self._make_room(self._jobs)
+        self._jobs.append((func, args, kwargs))
+        self.queued += 1
+        self._wakeup.set()
+
+    def _make_room(self, queue):
+        """Drop the oldest item of a queue when the pipeline is full"""
+        if self.depth() >= self.max_queue:
+            target = queue if queue else max([self._jobs, *self._embeds.values()], key=len)
+            target.popleft()
+            self.dropped += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error in log pipeline: {e}")
+
+    async def flush(self):
+        """Run every queued logging job, then send every queued embed batch"""
+        while self._jobs:
+            func, args, kwargs = self._jobs.popleft()
+            token = _capturing.set(self)
+            try:
+                await func(*args, **kwargs)
+            except Exception as e:
+                self.failed += 1
+                print(f"Error in deferred log: {e}")
+            finally:
+                _capturing.reset(token)
+
+        # A submit for a new webhook can land while a batch is being sent, so iterate over a copy
+        for webhook_id, queue in list(self._embeds.items()):
+            while queue:
+                batch = [queue.popleft() for _ in range(min(MAX_EMBEDS_PER_SEND, len(queue)))]
+                await self._send(self._webhooks[webhook_id], batch)
+
+    async def _send(self, webhook, embeds):
+        try:
+            await _webhook_send(webhook, embeds=embeds)
+            self.sent += len(embeds)
+            self.batches += 1
+        except discord.HTTPException as e:
+            self.failed += len(embeds)
+            print(f"Failed to send {len(embeds)} log embeds to webhook {webhook.id}: {e}")
+
+    def stats(self):
+        """Get queue depth and delivery counters"""
+        return {
+            'depth': self.depth(),
+            'queued': self.queued,
+            'dropped': self.dropped,
+            'sent': self.sent,
+            'batches': self.batches,
+            'failed': self.failed,
+        }
+
+
+class QueuedLogger:
+    """Wraps BotLogger so every log_* call is queued instead of awaited inline"""
+
+    def __init__(self, logger, pipeline):
+        self._logger = logger
+        self._pipeline = pipeline
+
+    def __getattr__(self, name):
+        attr = getattr(self._logger, name)
+        if not name.startswith('log_') or not callable(attr):
+            return attr
+
+        async def queued(*args, **kwargs):
+            self._pipeline.defer(attr, *args, **kwargs)
+
+        return queued
@@ -0,0 +1,311 @@
+import asyncio
+import datetime
+import re
+import time
+import discord
+
+# Bulk ban accepts up to 200 users per request
+BULK_BAN_LIMIT = 200
+# Discord caps timeouts at 28 days
+MAX_TIMEOUT = datetime.timedelta(days=28)
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_USER_ID = re.compile(r"^(?:<@!?)?(\d{15,20})>?$")
+_FILTER = re.compile(r"^(joined|age):(\d+[smhdw])$", re.IGNORECASE)
+
+
+def parse_duration(text):
+    """Convert 30s / 10m / 2h / 1d / 1w to a timedelta (None if invalid)"""
+    text = (text or "").strip().lower()
+    if len(text) < 2 or text[-1] not in DURATION_UNITS or not text[:-1].isdigit():
+        return None
+    return datetime.timedelta(seconds=int(text[:-1]) * DURATION_UNITS[text[-1]])
+
+
+class TargetSpec:
+    """Users picked for a mass action: listed IDs plus members matching filters.
+
+    IDs and mentions are taken as given, joined:<duration> adds members who
+    joined within that window and age:<duration> adds members whose account is
+    younger than that. Both filters must match when both are given. Any other
+    words are the reason.
+    """
+
+    def __init__(self, user_ids=(), joined_within=None, younger_than=None, reason=None):
+        self.user_ids = list(dict.fromkeys(user_ids))
+        self.joined_within = joined_within
+        self.younger_than = younger_than
+        self.reason = reason or "No reason provided"
+
+    @classmethod
+    def parse(cls, text):
+        user_ids = []
+        filters = {}
+        words = []
+        for word in (text or "").split():
+            match = _USER_ID.match(word)
+            if match:
+                user_ids.append(int(match.group(1)))
+                continue
+            match = _FILTER.match(word)
+            if match:
+                filters[match.group(1).lower()] = parse_duration(match.group(2))
+                continue
+            words.append(word)
+        return cls(user_ids, filters.get('joined'), filters.get('age'), " ".join(words))
+
+    @property
+    def has_filters(self):
+        return self.joined_within is not None or self.younger_than is not None
+
+    def __bool__(self):
+        return bool(self.user_ids) or self.has_filters
+
+    def matches(self, member, now):
+        """Check a member against the filters"""
+        if not self.has_filters:
+            return False
+        if self.joined_within is not None and (member.joined_at is None or now - member.joined_at > self.joined_within):
+            return False
+        if self.younger_than is not None and now - member.created_at > self.younger_than:
+            return False
+        return True
+
+    async def resolve(self, bot, guild):
+        """Get the target user IDs, loading the guild's members first so filters and role checks see everyone"""
+        await bot.member_cache.ensure(guild)
+        user_ids = dict.fromkeys(self.user_ids)
+        if self.has_filters:
+            now = discord.utils.utcnow()
+            for member in guild.members:
+                if not member.bot and self.matches(member, now):
+                    user_ids[member.id] = None
+        return list(user_ids)
+
+
+def split_protected(ctx, user_ids, members_only=False):
+    """Drop users the invoker or the bot may not action; returns (allowed IDs, skipped count).
+
+    Users that are not in the guild are kept for bans and unbans, while
+    members_only drops them (timeouts only apply to members).
+    """
+    guild = ctx.guild
+    author = ctx.author
+    me = guild.me
+    allowed = []
+    skipped = 0
+    for user_id in user_ids:
+        if user_id in (author.id, me.id, guild.owner_id):
+            skipped += 1
+            continue
+        member = guild.get_member(user_id)
+        if member is None:
+            if members_only:
+                skipped += 1
+            else:
+                allowed.append(user_id)
+            continue
+        if member.top_role >= me.top_role or (member.top_role >= author.top_role and author.id != guild.owner_id):
+            skipped += 1
+        elif members_only and member.guild_permissions.administrator:
+            # Administrators can't be timed out
+            skipped += 1
+        else:
+            allowed.append(user_id)
+    return allowed, skipped
+
+
+class MassActionResult:
+    """Counters for one mass action"""
+    __slots__ = ('total', 'succeeded', 'failed', 'skipped', 'started')
+
+    def __init__(self, total, skipped=0):
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = skipped
+        self.started = time.monotonic()
+
+    @property
+    def processed(self):
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+
+class MassActionRunner:
+    """Bans, unbans and times out many users with a bounded number of requests in flight"""
+
+    def __init__(self, concurrency=4):
+        # Member edits and unbans share per-guild route buckets, a few in flight keeps us under them
+        self.concurrency = concurrency
+        self.runs = 0
+        self.actioned = 0
+        self.failed = 0
+
+    async def ban(self, guild, user_ids, reason=None, progress=None, skipped=0, delete_message_seconds=0):
+        """Ban users through the bulk ban endpoint, one chunk at a time"""
+        result = MassActionResult(len(user_ids), skipped)
+        self.runs += 1
+        for start in range(0, len(user_ids), BULK_BAN_LIMIT):
+            chunk = [discord.Object(id=user_id) for user_id in user_ids[start:start + BULK_BAN_LIMIT]]
+            try:
+                banned = await guild.bulk_ban(chunk, reason=reason, delete_message_seconds=delete_message_seconds)
+                result.succeeded += len(banned.banned)
+                result.failed += len(banned.failed)
+            except discord.Forbidden:
+                result.failed += result.total - result.processed
+                break
+            except discord.HTTPException as e:
+                # Raised when nobody in the chunk could be banned
+                print(f"Error bulk banning in guild {guild.id}: {e}")
+                result.failed += len(chunk)
+            if progress:
+                await progress(result)
+        self._record(result)
+        return result
+
+    async def unban(self, guild, user_ids, reason=None, progress=None, skipped=0):
+        """Unban users by ID without looking them up first"""
+        async def unban_one(user_id):
+            await guild.unban(discord.Object(id=user_id), reason=reason)
+            return True
+        return await self._each(user_ids, unban_one, progress, skipped)
+
+    async def timeout(self, guild, user_ids, until, reason=None, progress=None, skipped=0):
+        """Time out members until a given time (None lifts the timeout)"""
+        async def timeout_one(user_id):
+            member = guild.get_member(user_id)
+            if member is None:
+                return False
+            await member.timeout(until, reason=reason)
+            return True
+        return await self._each(user_ids, timeout_one, progress, skipped)
+
+    async def _each(self, user_ids, action, progress, skipped):
+        result = MassActionResult(len(user_ids), skipped)
+        self.runs += 1
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(user_id):
+            async with semaphore:
+                try:
+                    done = await action(user_id)
+                except discord.HTTPException:
+                    done = False
+                if done:
+                    result.succeeded += 1
+                else:
+                    result.failed += 1
+            if progress:
+                await progress(result)
+
+        await asyncio.gather(*(run(user_id) for user_id in user_ids))
+        self._record(result)
+        return result
+
+    def _record(self, result):
+        self.actioned += result.succeeded
+        self.failed += result.failed
+
+    def stats(self):
+        """Get lifetime counters"""
+        return {
+            'runs': self.runs,
+            'actioned': self.actioned,
+            'failed': self.failed,
+        }
+
+
+class ConfirmView(discord.ui.View):
+    """Confirm/cancel buttons only the invoking user can press"""
+
+    def __init__(self, author_id, timeout=30):
+        super().__init__(timeout=timeout)
+        self.author_id = author_id
+        self.confirmed = False
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Only the moderator who ran this can confirm it.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = True
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        self.stop()
+
+
+class ProgressMessage:
+    """One message edited with the progress of a mass action, at most once per interval"""
+
+    def __init__(self, message, title, color, interval=2.0, clock=time.monotonic):
+        self.message = message
+        self.title = title
+        self.color = color
+        self.interval = interval
+        self.clock = clock
+        self._last = 0.0
+
+    def embed(self, result, finished=False):
+        bar_width = 20
+        filled = int(bar_width * result.processed / result.total) if result.total else bar_width
+        embed = discord.Embed(
+            title=f"{self.title} {'✅' if finished else '⏳'}",
+            description=(
+                f"`{'█' * filled}{'░' * (bar_width - filled)}` {result.processed:,}/{result.total:,}\n"
+                f"**Succeeded:** {result.succeeded:,}\n"
+                f"**Failed:** {result.failed:,}\n"
+                f"**Skipped:** {result.skipped:,}"
+            ),
+            color=self.color
+        )
+        if finished:
+            embed.set_footer(text=f"Finished in {result.elapsed:.1f}s")
+        return embed
+
+    async def update(self, result):
+        """Edit the message if the interval has passed since the last edit"""
+        now = self.clock()
+        if now - self._last < self.interval:
+            return
+        # Claim the slot before awaiting so concurrent workers don't all edit
+        self._last = now
+        try:
+            await self.message.edit(embed=self.embed(result), view=None)
+        except discord.HTTPException:
+            pass
+
+    async def finish(self, result):
+        """Show the final counts"""
+        try:
+            await self.message.edit(embed=self.embed(result, finished=True), view=None)
+        except discord.HTTPException as e:
+            print(f"Error editing mass action progress: {e}")
+
+
+async def confirm_and_run(ctx, title, description, color, run):
+    """Ask the invoker to confirm, then run run(progress) while streaming progress into the same message"""
+    view = ConfirmView(ctx.author.id)
+    message = await ctx.send(
+        embed=discord.Embed(title=f"{title} ⚠", description=description, color=color),
+        view=view
+    )
+    await view.wait()
+    if not view.confirmed:
+        await message.edit(embed=discord.Embed(title=f"{title} ❌", description="**Cancelled.**", color=color), view=None)
+        return None
+
+    progress = ProgressMessage(message, title, color)
+    result = await run(progress.update)
+    await progress.finish(result)
+    return result
@@ -0,0 +1,150 @@
+import asyncio
+import sys
+import discord
+
+MEMBER_CACHE_MODES = ('full', 'lazy')
+
+
+def _member_size(member):
+    """Rough bytes held by one cached member and its presence"""
+    size = sys.getsizeof(member)
+    for activity in member.activities:
+        size += sys.getsizeof(activity)
+    return size
+
+
+class MemberCachePolicy:
+    """Decides which guilds keep a member (and so presence) cache.
+
+    In lazy mode nothing is chunked at startup and joining members are not
+    cached. Only guilds with vanity, activity or antinuke configs are
+    chunked, either right after connecting or on first need, and members who
+    join a chunked guild are added to its cache here. Presence updates for
+    members that are not cached are discarded by the library, so guilds that
+    don't use presences hold no presence data.
+
+    guild.chunked turns False as soon as anyone joins (the library counts
+    the join but does not cache the member), so chunked guilds are tracked
+    here instead. A fresh READY drops every cached member, so reset() must
+    run on connect, and an unavailable guild is forgotten.
+
+    Lazy mode is opt-in: the library only dispatches on_member_remove and
+    on_member_update for cached members, so those listeners go quiet in
+    guilds that are not chunked.
+    """
+
+    def __init__(self, bot, mode='full', chunk_delay=1.0):
+        if mode not in MEMBER_CACHE_MODES:
+            raise ValueError(f"Unknown member cache mode: {mode}")
+        self.bot = bot
+        self.mode = mode
+        self.chunk_delay = chunk_delay
+        self._chunking = {}
+        self._complete = set()
+        self._generation = 0
+        self.chunked = 0
+
+    @property
+    def lazy(self):
+        return self.mode == 'lazy'
+
+    def client_options(self, intents):
+        """Get the client keyword arguments for this mode"""
+        if not self.lazy:
+            return {'chunk_guilds_at_startup': True, 'member_cache_flags': discord.MemberCacheFlags.from_intents(intents)}
+        return {
+            'chunk_guilds_at_startup': False,
+            'member_cache_flags': discord.MemberCacheFlags(voice=True, joined=False),
+        }
+
+    def needs_members(self, guild_id):
+        """Check if a guild's features need its member list"""
+        return (
+            guild_id in self.bot.vanity_engine.configs
+            or guild_id in self.bot.activity_engine.configs
+            or self.bot.antinuke.is_enabled(guild_id)
+        )
+
+    def is_chunked(self, guild):
+        """Check if a guild's member cache is complete"""
+        if not self.lazy:
+            return guild.chunked
+        return guild.id in self._complete
+
+    async def ensure(self, guild):
+        """Chunk a guild's members on first need; concurrent callers share one request"""
+        if not self.lazy or self.is_chunked(guild):
+            return
+        generation = self._generation
+        task = self._chunking.get(guild.id)
+        if task is None:
+            task = self._chunking[guild.id] = asyncio.create_task(guild.chunk(cache=True))
+            task.add_done_callback(lambda done: self._chunking.pop(guild.id) if self._chunking.get(guild.id) is done else None)
+            self.chunked += 1
+        try:
+            await asyncio.shield(task)
+            # A reconnect during the request cleared the members it cached
+            if generation == self._generation:
+                self._complete.add(guild.id)
+        except asyncio.CancelledError:
+            # The library cancels pending chunk requests when it reconnects
+            if not task.cancelled():
+                raise
+        except (asyncio.TimeoutError, discord.HTTPException) as e:
+            print(f"Error chunking guild {guild.id}: {e}")
+
+    def add_member(self, member):
+        """Cache a member who joined a chunked guild, keeping its member list complete"""
+        guild = member.guild
+        if self.lazy and guild.id in self._complete and guild.get_member(member.id) is None:
+            guild._add_member(member)
+
+    def forget(self, guild_id):
+        """Stop tracking a guild the bot left or that became unavailable"""
+        self._complete.discard(guild_id)
+
+    def reset(self):
+        """Forget every chunked guild (a fresh READY cleared the member cache)"""
+        self._complete.clear()
+        self._chunking.clear()
+        self._generation += 1
+
+    async def chunk_configured(self):
+        """Chunk every guild that needs members, one at a time to spare the gateway"""
+        if not self.lazy:
+            return
+        generation = self._generation
+        for guild in list(self.bot.guilds):
+            if generation != self._generation:
+                # Reconnected; on_ready starts a new pass over the new guild objects
+                return
+            if self.is_chunked(guild):
+                continue
+            try:
+                # Antinuke settings load per guild, the first lookup caches them
+                await self.bot.antinuke.get_config(guild.id)
+            except Exception as e:
+                print(f"Error loading antinuke settings of {guild.id}: {e}")
+            if not self.needs_members(guild.id):
+                continue
+            await self.ensure(guild)
+            await asyncio.sleep(self.chunk_delay)
+
+    def report(self):
+        """Get per-guild cached member counts and estimated memory, largest first"""
+        rows = []
+        for guild in self.bot.guilds:
+            members = guild.members
+            sample = members[:50]
+            per_member = sum(map(_member_size, sample)) / len(sample) if sample else 0
+            rows.append({
+                'guild_id': guild.id,
+                'name': guild.name,
+                'member_count': guild.member_count or 0,
+                'cached_members': len(members),
+                'with_presence': sum(1 for member in members if member.activities),
+                'needs_members': self.needs_members(guild.id),
+                'estimated_bytes': int(per_member * len(members)),
+            })
+        rows.sort(key=lambda row: row['estimated_bytes'], reverse=True)
+        return rows
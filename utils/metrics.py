@@ -0,0 +1,202 @@
+import asyncio
+import bisect
+import functools
+import inspect
+import time
+
+# Histogram bucket upper bounds in seconds: 50µs to 30s, roughly 2.5x apart
+BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and two increments"""
+    __slots__ = ('counts', 'count', 'total', 'maximum')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[index] if index < len(BUCKETS) else self.maximum
+        return self.maximum
+
+
+class _Timer:
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Latency histograms keyed by (metric, label) plus an event loop lag probe.
+
+    Metrics: command, db_query, event, loop and event_loop_lag.
+    """
+
+    def __init__(self, lag_interval=0.5):
+        self.lag_interval = lag_interval
+        self.histograms = {}
+        self.errors = {}
+        self.started = time.time()
+        self._probe = None
+
+    def histogram(self, metric, label):
+        histogram = self.histograms.get((metric, label))
+        if histogram is None:
+            histogram = self.histograms[(metric, label)] = Histogram()
+        return histogram
+
+    def observe(self, metric, label, value):
+        self.histogram(metric, label).observe(value)
+
+    def timer(self, metric, label):
+        """Context manager timing its block into a histogram"""
+        return _Timer(self.histogram(metric, label))
+
+    def error(self, metric, label):
+        """Count a failure next to the histogram of the same key"""
+        self.errors[(metric, label)] = self.errors.get((metric, label), 0) + 1
+
+    def instrument(self, db):
+        """Time every public coroutine method of the database per method name"""
+        wrapped = []
+        for name in dir(db):
+            if name.startswith('_'):
+                continue
+            method = getattr(db, name, None)
+            if not inspect.iscoroutinefunction(method):
+                continue
+            setattr(db, name, self._timed(method, 'db_query', name))
+            wrapped.append(name)
+        return wrapped
+
+    def _timed(self, method, metric, label):
+        histogram = self.histogram(metric, label)
+
+        @functools.wraps(method)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception:
+                self.error(metric, label)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return timed
+
+    def start(self):
+        """Start the event loop lag probe"""
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.create_task(self._measure_lag())
+
+    async def stop(self):
+        if self._probe:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+            self._probe = None
+
+    async def _measure_lag(self):
+        """Sleep a fixed interval and record how late the loop woke us"""
+        histogram = self.histogram('event_loop_lag', 'loop')
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            histogram.observe(max(0.0, loop.time() - expected))
+
+    def summary(self, metric=None):
+        """Get (metric, label, count, mean, p50, p99, max) rows, slowest p99 first"""
+        rows = [
+            (key[0], key[1], histogram.count, histogram.total / histogram.count,
+             histogram.quantile(0.5), histogram.quantile(0.99), histogram.maximum)
+            for key, histogram in self.histograms.items()
+            if histogram.count and (metric is None or key[0] == metric)
+        ]
+        rows.sort(key=lambda row: row[5], reverse=True)
+        return rows
+
+    def prometheus(self):
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = []
+        for metric in sorted({key[0] for key in self.histograms}):
+            name = f"bot_{metric}_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for (key_metric, label), histogram in sorted(self.histograms.items()):
+                if key_metric != metric:
+                    continue
+                label = str(label).replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{name="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{name="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{name="{label}"}} {histogram.total}')
+                lines.append(f'{name}_count{{name="{label}"}} {histogram.count}')
+        if self.errors:
+            lines.append("# TYPE bot_errors_total counter")
+            for (metric, label), count in sorted(self.errors.items()):
+                lines.append(f'bot_errors_total{{metric="{metric}",name="{label}"}} {count}')
+        lines.append("# TYPE bot_uptime_seconds gauge")
+        lines.append(f"bot_uptime_seconds {time.time() - self.started}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Local HTTP endpoint serving /metrics in Prometheus text format"""
+
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        return web.Response(text=self.metrics.prometheus(), content_type='text/plain', charset='utf-8')
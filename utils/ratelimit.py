@@ -0,0 +1,154 @@
+import time
+
+# Entry layout: [bucket counts, last tick, total in window]
+_COUNTS, _LAST, _TOTAL = 0, 1, 2
+
+
+class SlidingWindowCounter:
+    """Per-key bucketed sliding window counter.
+
+    A hit clears at most `buckets` stale buckets, so update and check are
+    constant time. Idle keys expire through a timer wheel that is advanced as
+    time passes instead of scanning every key, and the key count is capped.
+    """
+
+    def __init__(self, window, buckets=10, max_keys=200000, clock=time.monotonic):
+        self.window = window
+        self.buckets = buckets
+        self.bucket_width = window / buckets
+        self.max_keys = max_keys
+        self.clock = clock
+        self._entries = {}
+        self._zeros = [0] * buckets
+        # One wheel slot per tick; a key is due once it has been idle for a whole window
+        self._wheel_size = buckets + 1
+        self._wheel = [set() for _ in range(self._wheel_size)]
+        self._wheel_tick = None
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def hit(self, key, now=None):
+        """Record one event for key and return the number of events in the window"""
+        tick = int((self.clock() if now is None else now) / self.bucket_width)
+        if self._wheel_tick is None:
+            self._wheel_tick = tick
+        elif tick > self._wheel_tick:
+            self._advance(tick)
+
+        entry = self._entries.get(key)
+        buckets = self.buckets
+        if entry is None:
+            if len(self._entries) >= self.max_keys:
+                self._evict()
+            counts = self._zeros[:]
+            counts[tick % buckets] = 1
+            self._entries[key] = [counts, tick, 1]
+            self._wheel[(tick + buckets) % self._wheel_size].add(key)
+            return 1
+
+        counts = entry[_COUNTS]
+        gap = tick - entry[_LAST]
+        if gap >= buckets:
+            counts[:] = self._zeros
+            entry[_TOTAL] = 0
+        elif gap > 0:
+            total = entry[_TOTAL]
+            for step in range(entry[_LAST] + 1, tick + 1):
+                index = step % buckets
+                total -= counts[index]
+                counts[index] = 0
+            entry[_TOTAL] = total
+        counts[tick % buckets] += 1
+        entry[_LAST] = tick
+        entry[_TOTAL] += 1
+        return entry[_TOTAL]
+
+    def count(self, key, now=None):
+        """Get the number of events for key in the window without recording one"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0
+        tick = int((self.clock() if now is None else now) / self.bucket_width)
+        counts = entry[_COUNTS]
+        gap = tick - entry[_LAST]
+        if gap >= self.buckets:
+            return 0
+        return entry[_TOTAL] - sum(counts[(entry[_LAST] + step) % self.buckets] for step in range(1, gap + 1))
+
+    def reset(self, key):
+        """Forget a key (e.g. after punishing it)"""
+        self._entries.pop(key, None)
+
+    def _advance(self, tick):
+        """Expire keys whose wheel slots have come due"""
+        start = self._wheel_tick + 1
+        if tick - start >= self._wheel_size:
+            start = tick - self._wheel_size + 1
+        buckets = self.buckets
+        for step in range(start, tick + 1):
+            slot = self._wheel[step % self._wheel_size]
+            if not slot:
+                continue
+            due = list(slot)
+            slot.clear()
+            for key in due:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if tick - entry[_LAST] >= buckets:
+                    del self._entries[key]
+                    self.expired += 1
+                else:
+                    # Still active, check again once it has been idle a full window
+                    self._wheel[(entry[_LAST] + buckets) % self._wheel_size].add(key)
+        self._wheel_tick = tick
+
+    def _evict(self):
+        """Drop the key closest to expiring to stay under the key ceiling"""
+        for step in range(1, self._wheel_size + 1):
+            slot = self._wheel[(self._wheel_tick + step) % self._wheel_size]
+            while slot:
+                key = slot.pop()
+                if self._entries.pop(key, None) is not None:
+                    self.evicted += 1
+                    return
+        # Every slot was stale, fall back to an arbitrary key
+        self._entries.pop(next(iter(self._entries)))
+        self.evicted += 1
+
+
+class RateTracker:
+    """Antispam message rate tracking keyed by (guild_id, user_id)"""
+
+    def __init__(self, buckets=10, max_keys=200000):
+        self.buckets = buckets
+        self.max_keys = max_keys
+        self._counters = {}
+
+    def counter(self, timeframe):
+        """Get the counter for a timeframe in seconds"""
+        counter = self._counters.get(timeframe)
+        if counter is None:
+            counter = self._counters[timeframe] = SlidingWindowCounter(
+                timeframe, buckets=self.buckets, max_keys=self.max_keys
+            )
+        return counter
+
+    def hit(self, guild_id, user_id, limit, timeframe, now=None):
+        """Record a message and return True if the user went over limit messages per timeframe"""
+        return self.counter(timeframe).hit((guild_id, user_id), now) > limit
+
+    def reset(self, guild_id, user_id):
+        """Forget a user's history in every timeframe"""
+        for counter in self._counters.values():
+            counter.reset((guild_id, user_id))
+
+    def stats(self):
+        """Get key counts and expiry counters per timeframe"""
+        return {
+            timeframe: {'keys': len(counter), 'expired': counter.expired, 'evicted': counter.evicted}
+            for timeframe, counter in self._counters.items()
+        }
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import OrderedDict
+import discord
+
+
+class PendingRoleEdit:
+    """Roles waiting to be added to/removed from one member"""
+    __slots__ = ('member', 'add', 'remove', 'reasons', 'callbacks')
+
+    def __init__(self, member):
+        self.member = member
+        self.add = {}
+        self.remove = {}
+        self.reasons = []
+        self.callbacks = {}
+
+    def discard(self, role_id):
+        """Drop any pending change for a role; returns True if there was one"""
+        self.callbacks.pop(role_id, None)
+        return self.add.pop(role_id, None) is not None or self.remove.pop(role_id, None) is not None
+
+    def __bool__(self):
+        return bool(self.add or self.remove)
+
+
+class RoleMutationQueue:
+    """Coalescing queue that applies role changes as one member edit per member.
+
+    Requests are compared against the state the member will have once the
+    edits already sent land, not just the member cache: an edit in flight,
+    or one written less than `settle` seconds ago that the gateway may not
+    have echoed yet. Edits of the same member are applied one after another.
+    """
+
+    def __init__(self, concurrency=4, max_pending=20000, settle=5.0, clock=time.monotonic):
+        # Member edits share a per-guild route bucket, a few in flight keeps us under it
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.settle = settle
+        self.clock = clock
+        self._pending = OrderedDict()
+        self._applying = {}
+        self._written = {}
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._tasks = set()
+        self._in_flight = 0
+        self.requested = 0
+        self.merged = 0
+        self.cancelled = 0
+        self.dropped = 0
+        self.applied = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the background drain task"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+
+    async def stop(self):
+        """Stop the drain task, leaving pending edits queued"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def set_role(self, member, role, wanted, reason=None, callback=None):
+        """Request that a member has (or lacks) a role; returns True if an edit is now pending.
+
+        callback is an optional coroutine function awaited once the edit is applied.
+        """
+        self.requested += 1
+        key = (member.guild.id, member.id)
+        pending = self._pending.get(key)
+        has_role = self._expected(key, member, role.id)
+
+        if wanted == has_role:
+            # Opposite of what is already queued, the two cancel out
+            if pending is not None and pending.discard(role.id):
+                self.cancelled += 1
+                if not pending:
+                    del self._pending[key]
+            return False
+
+        if pending is None:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            pending = self._pending[key] = PendingRoleEdit(member)
+        else:
+            self.merged += 1
+
+        pending.member = member
+        pending.discard(role.id)
+        if wanted:
+            pending.add[role.id] = role
+        else:
+            pending.remove[role.id] = role
+        if reason and reason not in pending.reasons:
+            pending.reasons.append(reason)
+        if callback:
+            pending.callbacks[role.id] = callback
+
+        self._wakeup.set()
+        return True
+
+    def _recent_roles(self, key):
+        """Get the roles last written for a member if the gateway may not have caught up yet"""
+        written = self._written.get(key)
+        if written is None:
+            return None
+        if self.clock() - written[1] >= self.settle:
+            del self._written[key]
+            return None
+        return written[0]
+
+    def _expected(self, key, member, role_id):
+        """Check if a member will have a role once the edits already sent are applied"""
+        applying = self._applying.get(key)
+        if applying is not None and role_id in applying[1]:
+            return applying[1][role_id]
+        written = self._recent_roles(key)
+        if written is not None:
+            return role_id in written
+        return member.get_role(role_id) is not None
+
+    async def _drain(self):
+        """Apply pending edits with a bounded number in flight"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            now = self.clock()
+            for key in [key for key, (_, written_at) in self._written.items() if now - written_at >= self.settle]:
+                del self._written[key]
+            while self._pending:
+                key = next(iter(self._pending))
+                chained = key in self._applying
+                if not chained:
+                    await semaphore.acquire()
+                    if key not in self._pending:
+                        # Cancelled out while waiting for a slot
+                        semaphore.release()
+                        continue
+                pending = self._pending.pop(key)
+                previous = self._applying.get(key)
+                desired = dict(previous[1]) if previous else {}
+                desired.update(dict.fromkeys(pending.add, True))
+                desired.update(dict.fromkeys(pending.remove, False))
+                task = asyncio.create_task(self._apply(key, pending, semaphore, previous[0] if previous else None))
+                self._applying[key] = (task, desired)
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _apply(self, key, pending, semaphore, previous=None):
+        """Send one member edit for all pending changes of a member.
+
+        A chained edit takes its semaphore slot only once the previous edit of the member is done.
+        """
+        try:
+            if previous is not None:
+                # The earlier edit of this member decides what this one starts from
+                await asyncio.wait([previous])
+                await semaphore.acquire()
+            self._in_flight += 1
+            try:
+                await self._edit(key, pending)
+            finally:
+                self._in_flight -= 1
+                semaphore.release()
+        finally:
+            applying = self._applying.get(key)
+            if applying is not None and applying[0] is asyncio.current_task():
+                del self._applying[key]
+
+    async def _edit(self, key, pending):
+        member = pending.member.guild.get_member(pending.member.id) or pending.member
+        current = self._recent_roles(key)
+        if current is None:
+            current = {role.id for role in member.roles if not role.is_default()}
+        roles = (current - pending.remove.keys()) | pending.add.keys()
+        if roles == current:
+            return
+
+        reason = ", ".join(pending.reasons) or None
+        try:
+            await member.edit(roles=[discord.Object(id=role_id) for role_id in roles], reason=reason)
+        except discord.HTTPException:
+            self.failed += 1
+            return
+
+        self._written[key] = (frozenset(roles), self.clock())
+        self.applied += 1
+        for callback in pending.callbacks.values():
+            try:
+                await callback()
+            except Exception as e:
+                print(f"Error in role queue callback: {e}")
+
+    def stats(self):
+        """Get queue depth and coalescing counters"""
+        return {
+            'depth': len(self._pending),
+            'in_flight': self._in_flight,
+            'requested': self.requested,
+            'merged': self.merged,
+            'cancelled': self.cancelled,
+            'dropped': self.dropped,
+            'applied': self.applied,
+            'failed': self.failed,
+        }
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+import aiosqlite
+from config import DATABASE_FILE
+
+
+class QueryStats:
+    """Call count and timings of one SQL statement"""
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+
+class SQLitePool:
+    """WAL-mode SQLite engine with one writer connection and a pool of reader connections"""
+
+    def __init__(self, path=DATABASE_FILE, readers=4, cached_statements=256, busy_timeout=5000):
+        self.path = path
+        self.reader_count = readers
+        self.cached_statements = cached_statements
+        self.busy_timeout = busy_timeout
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._readers = asyncio.Queue()
+        self._connections = []
+        self.query_stats = {}
+
+    async def open(self):
+        """Open the writer and reader connections"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._writer = await self._connect()
+        # WAL is persistent in the database file, readers opened afterwards inherit it
+        await self._writer.execute("PRAGMA journal_mode=WAL")
+        await self._writer.execute("PRAGMA synchronous=NORMAL")
+
+        for _ in range(self.reader_count):
+            reader = await self._connect()
+            await reader.execute("PRAGMA query_only=ON")
+            self._readers.put_nowait(reader)
+
+    async def _connect(self):
+        # sqlite3 keeps prepared statements per connection keyed by SQL text
+        connection = await aiosqlite.connect(self.path, cached_statements=self.cached_statements)
+        connection.row_factory = aiosqlite.Row
+        await connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout)}")
+        self._connections.append(connection)
+        return connection
+
+    async def close(self):
+        """Close every connection"""
+        for connection in self._connections:
+            await connection.close()
+        self._connections.clear()
+        self._writer = None
+        self._readers = asyncio.Queue()
+
+    def _record(self, sql, started):
+        stats = self.query_stats.get(sql)
+        if stats is None:
+            stats = self.query_stats[sql] = QueryStats()
+        stats.record(time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def reader(self):
+        """Borrow a reader connection (the writer when the pool has no readers)"""
+        if not self.reader_count:
+            async with self._write_lock:
+                yield self._writer
+            return
+        connection = await self._readers.get()
+        try:
+            yield connection
+        finally:
+            self._readers.put_nowait(connection)
+
+    async def fetchone(self, sql, params=()):
+        """Run a read query on a reader connection and return the first row"""
+        started = time.perf_counter()
+        async with self.reader() as connection:
+            async with connection.execute(sql, params) as cursor:
+                row = await cursor.fetchone()
+        self._record(sql, started)
+        return row
+
+    async def fetchall(self, sql, params=()):
+        """Run a read query on a reader connection and return every row"""
+        started = time.perf_counter()
+        async with self.reader() as connection:
+            async with connection.execute(sql, params) as cursor:
+                rows = await cursor.fetchall()
+        self._record(sql, started)
+        return rows
+
+    async def execute(self, sql, params=()):
+        """Run a write statement on the writer connection and commit it"""
+        started = time.perf_counter()
+        async with self._write_lock:
+            cursor = await self._writer.execute(sql, params)
+            await self._writer.commit()
+        self._record(sql, started)
+        return cursor.rowcount
+
+    async def executemany(self, sql, params_seq):
+        """Run a write statement for many parameter sets in one transaction"""
+        started = time.perf_counter()
+        async with self._write_lock:
+            cursor = await self._writer.executemany(sql, params_seq)
+            await self._writer.commit()
+        self._record(sql, started)
+        return cursor.rowcount
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Hold the writer for several statements committed together"""
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+
+    def timings(self, limit=None):
+        """Get per-query timings, slowest total first"""
+        rows = sorted(self.query_stats.items(), key=lambda item: item[1].total, reverse=True)
+        return [
+            {
+                'sql': sql,
+                'count': stats.count,
+                'total_ms': stats.total * 1000,
+                'avg_ms': stats.total / stats.count * 1000,
+                'max_ms': stats.max * 1000,
+            }
+            for sql, stats in rows[:limit]
+        ]
@@ -0,0 +1,138 @@
+import asyncio
+import contextvars
+import functools
+import importlib.util
+import inspect
+import time
+import traceback
+
+
+class CogTiming:
+    """Startup timings of one extension"""
+    __slots__ = ('name', 'compile_time', 'load_time', 'db_time', 'error')
+
+    def __init__(self, name):
+        self.name = name
+        self.compile_time = 0.0
+        self.load_time = 0.0
+        self.db_time = 0.0
+        self.error = None
+
+
+# Timing of the extension whose load is running in the current task
+_loading = contextvars.ContextVar('loading_extension', default=None)
+
+
+class DatabaseTimer:
+    """Temporarily times every coroutine method of the database, per extension being loaded"""
+
+    def __init__(self, db):
+        self.db = db
+        self._patched = {}
+
+    def __enter__(self):
+        for name in dir(self.db):
+            if name.startswith('_'):
+                continue
+            method = getattr(self.db, name, None)
+            if not inspect.iscoroutinefunction(method):
+                continue
+            self._patched[name] = self.db.__dict__.get(name)
+            setattr(self.db, name, self._wrap(method))
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._patched.items():
+            if original is None:
+                delattr(self.db, name)
+            else:
+                setattr(self.db, name, original)
+        self._patched.clear()
+
+    def _wrap(self, method):
+        @functools.wraps(method)
+        async def timed(*args, **kwargs):
+            timing = _loading.get()
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                if timing is not None:
+                    timing.db_time += time.perf_counter() - start
+        return timed
+
+
+def _compile(name):
+    """Read or compile an extension's bytecode without running it, refreshing a stale .pyc"""
+    spec = importlib.util.find_spec(name)
+    if spec is not None and hasattr(spec.loader, 'get_code'):
+        spec.loader.get_code(name)
+
+
+async def _compile_in_thread(name, timing):
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(_compile, name)
+    except Exception:
+        # load_extension will raise the real error
+        pass
+    timing.compile_time = time.perf_counter() - start
+
+
+def _groups(timings):
+    """Group extensions by package, keeping the given order inside each group"""
+    groups = {}
+    for timing in timings:
+        groups.setdefault(timing.name.rpartition('.')[0], []).append(timing)
+    return list(groups.values())
+
+
+async def _load_group(bot, group):
+    for timing in group:
+        _loading.set(timing)
+        start = time.perf_counter()
+        try:
+            await bot.load_extension(timing.name)
+        except Exception as e:
+            timing.error = e
+            print(f"❌ Failed to load {timing.name}: {e}")
+            traceback.print_exc()
+        timing.load_time = time.perf_counter() - start
+
+
+async def load_extensions(bot, names, storage_ready):
+    """Load extensions, compiling them while storage_ready finishes and running their setup concurrently.
+
+    Modules are only compiled up front, never executed, so load_extension
+    runs each module body exactly once. Extensions of the same package may
+    depend on each other and load one at a time in the given order; the
+    packages load concurrently, so awaits in one cog's setup (database
+    reads, cog_load) overlap with the others. Module bodies still execute
+    one at a time on the event loop. bot.extension_order keeps the given
+    order for anything that lists cogs, since they register in completion
+    order.
+    """
+    timings = [CogTiming(name) for name in names]
+    bot.extension_order = list(names)
+    await asyncio.gather(*(_compile_in_thread(timing.name, timing) for timing in timings))
+    await storage_ready
+
+    with DatabaseTimer(bot.db):
+        # gather runs each group in its own task, so _loading is per group
+        await asyncio.gather(*(_load_group(bot, group) for group in _groups(timings)))
+    return timings
+
+
+def format_timings(timings, extra=()):
+    """Render the startup timing table"""
+    width = max([len(timing.name) for timing in timings] + [len(label) for label, _ in extra] + [9])
+    lines = [f"{'Extension':<{width}}  {'Compile':>9}  {'Load':>9}  {'DB':>9}"]
+    for timing in sorted(timings, key=lambda t: t.compile_time + t.load_time, reverse=True):
+        status = "❌" if timing.error else "✅"
+        lines.append(
+            f"{timing.name:<{width}}  {timing.compile_time * 1000:7.1f}ms  "
+            f"{timing.load_time * 1000:7.1f}ms  {timing.db_time * 1000:7.1f}ms  {status}"
+        )
+    for label, elapsed in extra:
+        lines.append(f"{label:<{width}}  {elapsed * 1000:7.1f}ms")
+    return "\n".join(lines)
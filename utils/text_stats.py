@@ -0,0 +1,74 @@
+import unicodedata
+from collections import namedtuple
+
+# Character -> (letter, uppercase, combining mark), filled in as characters are first seen
+# so each distinct character costs one unicodedata call; cleared if it grows past the cap
+_CLASSES = {}
+_MAX_CLASSES = 8192
+
+
+def _classify(char):
+    """Get the (letter, uppercase, combining mark) flags of a character"""
+    category = unicodedata.category(char)
+    flags = (category[0] == 'L', category in ('Lu', 'Lt'), category in ('Mn', 'Me'))
+    if len(_CLASSES) >= _MAX_CLASSES:
+        _CLASSES.clear()
+    _CLASSES[char] = flags
+    return flags
+
+
+class TextStats(namedtuple('TextStats', 'length letters uppercase marks longest_run')):
+    """Character statistics of one message"""
+    __slots__ = ()
+
+    @property
+    def caps_ratio(self):
+        """Share of letters that are uppercase"""
+        return self.uppercase / self.letters if self.letters else 0.0
+
+    @property
+    def mark_density(self):
+        """Combining marks per base character"""
+        base = self.length - self.marks
+        return self.marks / base if base else float(self.marks)
+
+    def is_caps(self, ratio=0.7, min_letters=8):
+        """Check if the message is mostly capital letters"""
+        return self.letters >= min_letters and self.caps_ratio >= ratio
+
+    def is_zalgo(self, density=0.5, min_marks=6):
+        """Check if the message is stacked with combining marks"""
+        return self.marks >= min_marks and self.mark_density >= density
+
+
+def analyze(text):
+    """Compute uppercase, letter, combining mark and repeated run statistics of a message in one pass"""
+    if not text:
+        return TextStats(0, 0, 0, 0, 0)
+
+    letters = uppercase = marks = 0
+    longest_run = run = 0
+    previous = None
+    classes = _CLASSES
+    for char in text:
+        if char == previous:
+            run += 1
+            if run > longest_run:
+                longest_run = run
+        else:
+            run = 1
+            previous = char
+        letter, upper, mark = classes.get(char) or _classify(char)
+        if letter:
+            letters += 1
+            if upper:
+                uppercase += 1
+        elif mark:
+            marks += 1
+
+    return TextStats(len(text), letters, uppercase, marks, max(longest_run, 1))
+
+
+def analyze_many(texts):
+    """Analyse a batch of messages (e.g. when replaying channel history)"""
+    return [analyze(text) for text in texts]
@@ -0,0 +1,97 @@
+import asyncio
+import functools
+from utils.cache import bind_writes
+from utils.vanity_matcher import VanityMatcher
+
+
+def _activity_texts(member):
+    """Get the activity text that vanity detection looks at"""
+    return tuple(
+        (getattr(activity, 'state', None), getattr(activity, 'name', None))
+        for activity in member.activities
+    )
+
+
+class VanityRoleEngine:
+    """Vanity role assignment driven by presence updates with a slow reconciliation sweep"""
+
+    def __init__(self, bot, sweep_batch_size=250, sweep_batch_delay=2.0):
+        self.bot = bot
+        self.sweep_batch_size = sweep_batch_size
+        self.sweep_batch_delay = sweep_batch_delay
+        self.configs = {}
+        self.matcher = VanityMatcher()
+        self._signature = None
+        self.presence_checks = 0
+        self.sweep_checks = 0
+
+    async def reload(self):
+        """Reload vanity configs, rebuilding the matcher only if the vanities changed"""
+        # Only guilds on this process's shards
+        rows = [row for row in await self.bot.db.get_all_vanity_configs() if self.bot.owns_guild(row['guild_id'])]
+        configs = {}
+        for config in rows:
+            configs.setdefault(config['guild_id'], []).append(config)
+        self.configs = configs
+
+        signature = VanityMatcher.signature(rows)
+        if signature != self._signature:
+            self.matcher = VanityMatcher(rows)
+            self._signature = signature
+
+    def bind_write_methods(self):
+        """Reload configs whenever a vanity config is written"""
+        return bind_writes(self.bot.db, "vanity role configs", self._on_config_write, 'vanity')
+
+    async def _on_config_write(self, guild_id=None, *args, **kwargs):
+        await self.reload()
+        # A newly configured guild needs its members cached to see presences
+        guild = self.bot.get_guild(guild_id) if guild_id in self.configs else None
+        if guild and not self.bot.member_cache.is_chunked(guild):
+            asyncio.create_task(self.bot.member_cache.ensure(guild))
+
+    async def on_presence_update(self, before, after):
+        """Re-evaluate a single member when their activities change"""
+        if after.bot or not after.guild:
+            return
+        configs = self.configs.get(after.guild.id)
+        if not configs:
+            return
+        if _activity_texts(before) == _activity_texts(after):
+            return
+        self.presence_checks += 1
+        self.evaluate(after, configs)
+
+    async def reconcile(self):
+        """Backstop sweep over every configured guild, yielding between batches"""
+        for guild_id, configs in list(self.configs.items()):
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+            await self.bot.member_cache.ensure(guild)
+            checked = 0
+            for member in list(guild.members):
+                if member.bot:
+                    continue
+                self.evaluate(member, configs)
+                checked += 1
+                if checked % self.sweep_batch_size == 0:
+                    await asyncio.sleep(self.sweep_batch_delay)
+            self.sweep_checks += checked
+
+    def evaluate(self, member, configs):
+        """Queue vanity role changes for one member"""
+        guild = member.guild
+        codes = self.matcher.member_codes(member)
+        for config in configs:
+            role = guild.get_role(config['role_id'])
+            if not role:
+                continue
+
+            has_vanity = self.matcher.code_for(config['vanity_url']) in codes
+            action = "added" if has_vanity else "removed"
+            self.bot.role_queue.set_role(
+                member, role, has_vanity,
+                reason="Vanity URL detected" if has_vanity else "Vanity URL removed",
+                callback=functools.partial(self.bot._log_vanity_action, guild, member, config, action)
+            )
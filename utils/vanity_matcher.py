@@ -0,0 +1,66 @@
+import re
+
+# Matches discord.gg/<code>, https://discord.gg/<code> and .gg/<code> in one scan
+INVITE_CODE_PATTERN = re.compile(r"\.gg/([a-z0-9-]+)", re.IGNORECASE)
+
+
+def normalize_vanity(vanity_url):
+    """Reduce a configured vanity (code or full invite link) to its lower-case code"""
+    match = INVITE_CODE_PATTERN.search(vanity_url)
+    code = match.group(1) if match else vanity_url.strip().strip('/')
+    return code.lower()
+
+
+class VanityMatcher:
+    """Precompiled matcher mapping invite codes in activity text to configured guilds"""
+
+    def __init__(self, configs=()):
+        self.guild_codes = {}
+        self.code_guilds = {}
+        self._normalized = {}
+        for config in configs:
+            code = self.code_for(config['vanity_url'])
+            self.guild_codes.setdefault(config['guild_id'], set()).add(code)
+            self.code_guilds.setdefault(code, set()).add(config['guild_id'])
+
+    @staticmethod
+    def signature(configs):
+        """Get a hashable signature of the configs the matcher depends on"""
+        return frozenset((config['guild_id'], config['vanity_url']) for config in configs)
+
+    def code_for(self, vanity_url):
+        """Get the normalized code of a configured vanity"""
+        code = self._normalized.get(vanity_url)
+        if code is None:
+            code = self._normalized[vanity_url] = normalize_vanity(vanity_url)
+        return code
+
+    def codes_in(self, text):
+        """Get every configured invite code found in text"""
+        return {
+            code for code in (match.lower() for match in INVITE_CODE_PATTERN.findall(text))
+            if code in self.code_guilds
+        }
+
+    def member_codes(self, member):
+        """Get every configured invite code shown in a member's activities"""
+        codes = set()
+        for activity in member.activities:
+            state = getattr(activity, 'state', None)
+            if state:
+                codes |= self.codes_in(state)
+            name = getattr(activity, 'name', None)
+            if name:
+                codes |= self.codes_in(name)
+        return codes
+
+    def matching_guilds(self, member):
+        """Get the ids of guilds whose vanity the member is promoting"""
+        guilds = set()
+        for code in self.member_codes(member):
+            guilds |= self.code_guilds[code]
+        return guilds
+
+    def has_vanity(self, member, vanity_url):
+        """Check if a member shows a specific vanity"""
+        return self.code_for(vanity_url) in self.member_codes(member)
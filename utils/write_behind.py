@@ -0,0 +1,214 @@
+import asyncio
+
+# durability -> (buffer writes, PRAGMA synchronous)
+DURABILITY_LEVELS = {
+    'full': (False, 'FULL'),
+    'normal': (True, 'NORMAL'),
+    'off': (True, 'OFF'),
+}
+
+
+class _Write:
+    """One buffered statement"""
+    __slots__ = ('kind', 'key', 'sql', 'params', 'amount', 'attempts')
+
+    def __init__(self, kind, key, sql, params, amount=0):
+        self.kind = kind
+        self.key = key
+        self.sql = sql
+        self.params = params
+        self.amount = amount
+        self.attempts = 0
+
+    def bound_params(self):
+        if self.kind == 'increment':
+            return (self.amount, *self.params)
+        return self.params
+
+
+class WriteBehindQueue:
+    """Buffers high-frequency writes and commits them together in batched transactions.
+
+    Writes run in the order they were queued. upsert() replaces and
+    increment() adds to the latest buffered write of the same key when it
+    uses the same statement and nothing that could touch that row was
+    queued after it: keys name rows, so writes to other keys commute, while
+    append() is unkeyed and ends every merge. When a batch fails its
+    statements are retried one at a time. A failing statement holds back
+    the later writes that depend on it and is dropped after max_attempts
+    flushes.
+    """
+
+    def __init__(self, pool, durability='normal', interval=1.0, max_batch=500, max_attempts=3):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {durability}")
+        self.pool = pool
+        self.durability = durability
+        self.buffered, self.synchronous = DURABILITY_LEVELS[durability]
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self._log = []
+        self._tail = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self.writes = 0
+        self.merged = 0
+        self.committed = 0
+        self.batches = 0
+        self.dropped = 0
+
+    async def start(self):
+        """Apply the durability setting and start the periodic flusher"""
+        await self.pool.execute(f"PRAGMA synchronous={self.synchronous}")
+        if self.buffered and (self._worker is None or self._worker.done()):
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the flusher and commit everything still buffered"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.flush()
+
+    def pending(self):
+        """Get the number of buffered statements"""
+        return len(self._log)
+
+    async def upsert(self, key, sql, params):
+        """Buffer a write where only the latest value per key matters"""
+        self.writes += 1
+        write = self._tail.get(key)
+        if write is not None and write.kind == 'upsert' and write.sql == sql:
+            self.merged += 1
+            write.params = params
+        else:
+            self._queue(_Write('upsert', key, sql, params))
+        await self._after_write()
+
+    async def increment(self, key, sql, params, amount=1):
+        """Buffer a counter increment; sql takes the amount as its first parameter"""
+        self.writes += 1
+        params = tuple(params)
+        write = self._tail.get(key)
+        if write is not None and write.kind == 'increment' and write.sql == sql and write.params == params:
+            self.merged += 1
+            write.amount += amount
+        else:
+            self._queue(_Write('increment', key, sql, params, amount))
+        await self._after_write()
+
+    async def append(self, sql, params):
+        """Buffer a statement that cannot be merged"""
+        self.writes += 1
+        # It may touch any row, so later writes must not merge into anything before it
+        self._tail.clear()
+        self._log.append(_Write('append', None, sql, params))
+        await self._after_write()
+
+    def _queue(self, write):
+        self._log.append(write)
+        self._tail[write.key] = write
+
+    async def _after_write(self):
+        if not self.buffered:
+            await self.flush()
+        elif self.pending() >= self.max_batch:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing buffered writes: {e}")
+
+    async def flush(self):
+        """Commit every buffered write in one transaction; returns the number of statements committed"""
+        async with self._flush_lock:
+            if not self._log:
+                return 0
+
+            batch, self._log = self._log, []
+            # Writes queued from now on must not merge into statements being committed
+            self._tail.clear()
+
+            try:
+                await self._commit(batch)
+                committed = len(batch)
+            except Exception as e:
+                committed = 0
+                held = []
+                if len(batch) == 1:
+                    self._retry(batch[0], e, held)
+                else:
+                    # One bad statement fails the whole transaction, commit the others one by one
+                    print(f"Error committing {len(batch)} buffered writes, retrying one at a time: {e}")
+                    blocked_keys = set()
+                    blocked_all = False
+                    for write in batch:
+                        # Later writes of a failed key (or anything after a failed append) wait for it
+                        if blocked_all or write.key in blocked_keys or (write.kind == 'append' and blocked_keys):
+                            held.append(write)
+                            if write.kind == 'append':
+                                blocked_all = True
+                            else:
+                                blocked_keys.add(write.key)
+                            continue
+                        try:
+                            await self._commit([write])
+                            committed += 1
+                        except Exception as e:
+                            if self._retry(write, e, held):
+                                if write.kind == 'append':
+                                    blocked_all = True
+                                else:
+                                    blocked_keys.add(write.key)
+                self._log[:0] = held
+
+            self.committed += committed
+            self.batches += 1
+            return committed
+
+    async def _commit(self, batch):
+        # Consecutive writes of the same statement run as one executemany, order is kept
+        async with self.pool.transaction() as connection:
+            start = 0
+            while start < len(batch):
+                end = start + 1
+                while end < len(batch) and batch[end].sql == batch[start].sql:
+                    end += 1
+                await connection.executemany(batch[start].sql, [write.bound_params() for write in batch[start:end]])
+                start = end
+
+    def _retry(self, write, error, held):
+        """Hold a failed statement for the next flush; returns False once it was dropped after max_attempts"""
+        write.attempts += 1
+        if write.attempts >= self.max_attempts:
+            self.dropped += 1
+            print(f"Dropping buffered write after {write.attempts} failed attempts: {write.sql} {write.bound_params()!r}: {error}")
+            return False
+        held.append(write)
+        return True
+
+    def stats(self):
+        """Get buffering counters"""
+        return {
+            'durability': self.durability,
+            'pending': self.pending(),
+            'writes': self.writes,
+            'merged': self.merged,
+            'committed': self.committed,
+            'batches': self.batches,
+            'dropped': self.dropped,
+        }